@@ -0,0 +1,168 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only batch scoring needs it.
+    np = None
+
+from goal_relabeling import GoalRelabeling, goal_relabeling
+from heuristics import (
+    GridStateTuple,
+    TileTable,
+    build_heuristic,
+    manhattan_tile_costs,
+    misplaced_tile_costs,
+)
+from packed_state import BoardGeometry, geometry_for
+from solvability import validate_board
+
+NUMPY_AVAILABLE = np is not None
+
+# Heuristics that are a sum of per-tile costs, scored with one table lookup per
+# cell. Any other registered heuristic is evaluated board by board.
+TILE_COST_TABLES: Dict[str, Callable[[GridStateTuple], TileTable]] = {
+    "misplaced": misplaced_tile_costs,
+    "manhattan": manhattan_tile_costs,
+}
+
+
+def _require_numpy() -> None:
+    if not NUMPY_AVAILABLE:
+        raise ImportError("Batch heuristic scoring requires NumPy (pip install numpy).")
+
+
+@lru_cache(maxsize=None)
+def _flat_cost_table(heuristic_type: str, goal_state_tuple: GridStateTuple):
+    """
+    Returns the tile cost table of a goal flattened for fancy indexing.
+
+    The cost of tile t on cell i is at t * num_cells + i.
+    """
+    tile_costs = TILE_COST_TABLES[heuristic_type](goal_state_tuple)
+    return np.array(tile_costs, dtype=np.int32).ravel()
+
+
+@lru_cache(maxsize=None)
+def _canonical_frame_arrays(goal_state_tuple: GridStateTuple):
+    """
+    Returns (source cells, tile labels) that map boards onto a goal's canonical
+    frame: canonical[:, j] = labels[boards[:, source_cells[j]]].
+
+    This is GoalRelabeling.to_canonical() applied to a whole array at once.
+    """
+    relabeling: GoalRelabeling = goal_relabeling(goal_state_tuple)
+    cell_map = relabeling.cell_map
+    source_cells = np.empty(len(cell_map), dtype=np.intp)
+    source_cells[list(cell_map)] = np.arange(len(cell_map))
+    # The goal's tile on cell i is renamed to the canonical goal's tile on the
+    # cell that i moves to.
+    labels = np.empty(len(cell_map), dtype=np.intp)
+    labels[list(goal_state_tuple)] = [
+        relabeling.canonical_goal[cell] for cell in cell_map
+    ]
+    return source_cells, labels
+
+
+def _as_boards(boards: Any, num_cells: int) -> "np.ndarray":
+    """
+    Converts boards to an (n, num_cells) integer array and checks its shape.
+
+    Each row is assumed to be a permutation of 0 .. num_cells - 1; only the
+    shape and the value range are checked, so that a batch costs one pass.
+
+    Raises:
+        ValueError: If boards is not an (n, num_cells) array of tiles.
+    """
+    boards = np.asarray(boards)
+    if boards.ndim != 2 or boards.shape[1] != num_cells:
+        raise ValueError(f"boards must be an (n, {num_cells}) array of tiles.")
+    if not np.issubdtype(boards.dtype, np.integer):
+        raise ValueError("boards must hold integers.")
+    if boards.size and (boards.min() < 0 or boards.max() >= num_cells):
+        raise ValueError(f"Tiles must lie between 0 and {num_cells - 1}.")
+    return boards.astype(np.intp, copy=False)
+
+
+def batch_heuristic(
+    heuristic_type: str, boards: Any, goal_state_tuple: GridStateTuple
+) -> "np.ndarray":
+    """
+    Scores many boards against the same goal in one vectorized pass.
+
+    Boards are first mapped onto the goal's canonical frame, as the solvers do
+    (see goal_relabeling.py), so the values are the ones the solvers use and
+    heuristic tables are shared with them. 'misplaced' and 'manhattan' are
+    summed from their per-tile cost tables (see heuristics.py) with a single
+    lookup per cell. Other heuristics accepted by build_heuristic() give the
+    same values, but are evaluated one board at a time.
+
+    The goal is fully validated. The rows of boards are only checked for shape
+    and tile range, so a row with a repeated tile gets a meaningless score
+    instead of an error.
+
+    Args:
+        heuristic_type: Any heuristic accepted by build_heuristic().
+        boards: An (n, N*N) integer array, or a list of board lists.
+        goal_state_tuple: The goal configuration.
+
+    Returns:
+        An int32 array with the heuristic value of every board.
+
+    Raises:
+        ValueError: If the heuristic is unknown, the goal is not a valid board
+                    or the boards are malformed.
+        ImportError: If NumPy is not installed.
+    """
+    _require_numpy()
+    validate_board(list(goal_state_tuple), "goal_state")
+    num_cells = len(goal_state_tuple)
+    geometry = geometry_for(num_cells)
+    boards = _as_boards(boards, num_cells)
+    relabeling = goal_relabeling(goal_state_tuple)
+    canonical_goal = tuple(relabeling.canonical_goal)
+    if not relabeling.is_identity:
+        source_cells, labels = _canonical_frame_arrays(goal_state_tuple)
+        boards = labels[boards[:, source_cells]]
+
+    if heuristic_type in TILE_COST_TABLES:
+        flat_costs = _flat_cost_table(heuristic_type, canonical_goal)
+        return flat_costs[boards * num_cells + np.arange(num_cells)].sum(
+            axis=1, dtype=np.int32
+        )
+
+    evaluate = build_heuristic(heuristic_type, canonical_goal).evaluate
+    return np.fromiter(
+        (evaluate(geometry.pack(board)) for board in boards.tolist()),
+        dtype=np.int32,
+        count=len(boards),
+    )
+
+
+def batch_misplaced(boards: Any, goal_state_tuple: GridStateTuple) -> "np.ndarray":
+    """Counts the misplaced tiles of every board (see batch_heuristic())."""
+    return batch_heuristic("misplaced", boards, goal_state_tuple)
+
+
+def batch_manhattan(boards: Any, goal_state_tuple: GridStateTuple) -> "np.ndarray":
+    """Sums the Manhattan distances of every board (see batch_heuristic())."""
+    return batch_heuristic("manhattan", boards, goal_state_tuple)
+
+
+def unpack_array(states: "np.ndarray", geometry: BoardGeometry) -> "np.ndarray":
+    """
+    Decodes an int64 array of packed boards into an (n, num_cells) array.
+
+    This is how frontier arrays such as the layers of layer_bfs_handler.py are
+    scored with batch_heuristic().
+
+    Raises:
+        ValueError: If the geometry's packed boards do not fit in 63 bits.
+    """
+    _require_numpy()
+    if geometry.tile_bits * (geometry.num_cells + 1) > 63:
+        raise ValueError("Packed boards of this size do not fit in an int64 array.")
+    cell_shifts = np.array(geometry.cell_shifts, dtype=np.int64)
+    return (np.asarray(states, dtype=np.int64)[:, None] >> cell_shifts) & (
+        geometry.tile_mask
+    )
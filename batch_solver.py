@@ -0,0 +1,297 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from batch_heuristics import batch_heuristic
+from database_solver_handler import (
+    DatabaseSolver,
+    distance_database_path,
+    load_distance_database,
+)
+from frontier_search_handler import FrontierSearch
+from goal_relabeling import goal_relabeling
+from heuristics import build_heuristic
+from ida_star_handler import IDAStarSearch
+from layer_bfs_handler import LayerBFSSearch
+from manhattan_misplaced_handler import ManhattanMisplacedHandler
+from search_budget import SearchBudget
+from search_result import ASTAR_SHAPE, UCS_SHAPE, UNSOLVABLE, SearchResult
+from search_stats import SearchStats
+from solvability import is_solvable, validate_puzzle
+from uniform_cost_search_handler import UniformCostSearch
+
+GridState = List[int]
+
+DEFAULT_GOAL_STATE: GridState = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+
+# Algorithms that take no heuristic.
+PLAIN_ALGORITHMS = ["ucs", "bidirectional", "layer_bfs", "database", "frontier_bfs"]
+# Algorithms written as '<prefix>:<heuristic_type>', e.g. 'astar:manhattan'.
+HEURISTIC_ALGORITHM_PREFIXES = ["astar", "epea", "idastar", "frontier"]
+# Algorithms that answer from a table without searching, so they have nothing
+# to report to a SearchStats.
+NO_STATS_ALGORITHMS = ["database"]
+
+
+def _split_algorithm(algorithm: str) -> Tuple[str, Optional[str]]:
+    """
+    Splits an algorithm name into its search and its heuristic.
+
+    Raises:
+        ValueError: If the algorithm is not recognised.
+    """
+    if algorithm in PLAIN_ALGORITHMS:
+        return algorithm, None
+    prefix, _, heuristic_type = algorithm.partition(":")
+    if prefix in HEURISTIC_ALGORITHM_PREFIXES and heuristic_type:
+        return prefix, heuristic_type
+    raise ValueError(
+        f"Invalid algorithm. Choose from: {PLAIN_ALGORITHMS}, or "
+        f"'<prefix>:<heuristic_type>' with a prefix from {HEURISTIC_ALGORITHM_PREFIXES}."
+    )
+
+
+def check_stats_support(algorithm: str) -> None:
+    """
+    Checks that an algorithm's solver can report to a SearchStats.
+
+    Raises:
+        ValueError: If the algorithm is invalid or does not search.
+    """
+    search, _ = _split_algorithm(algorithm)
+    if search in NO_STATS_ALGORITHMS:
+        raise ValueError(f"'{algorithm}' does not search, so it has no search stats.")
+
+
+def unsolvable_result(algorithm: str) -> SearchResult:
+    """Returns the 'unsolvable' result an algorithm's solver would return."""
+    search, _ = _split_algorithm(algorithm)
+    shape = ASTAR_SHAPE if search in HEURISTIC_ALGORITHM_PREFIXES else UCS_SHAPE
+    return SearchResult(UNSOLVABLE, shape=shape)
+
+
+def make_solver(
+    algorithm: str,
+    start_state: GridState,
+    goal_state: GridState,
+    budget: Optional[SearchBudget] = None,
+    stats: Optional[SearchStats] = None,
+):
+    """
+    Creates the solver an algorithm name refers to.
+
+    Args:
+        algorithm: 'ucs', 'bidirectional', 'layer_bfs', 'database',
+                   'frontier_bfs', 'astar:<heuristic_type>',
+                   'epea:<heuristic_type>' (A* with partial expansion),
+                   'idastar:<heuristic_type>' or 'frontier:<heuristic_type>'
+                   (A* without a closed list).
+        start_state: The initial configuration of the puzzle.
+        goal_state: The target configuration of the puzzle.
+        budget: Limits on every search. 'database' does not search and
+                ignores it.
+        stats: Counters, timers and callbacks to report the search to (see
+               search_stats.py). 'database' does not search and rejects it.
+
+    Returns:
+        A solver whose solve() returns a SearchResult.
+
+    Raises:
+        ValueError: If the algorithm or the states are invalid, or stats are
+            given for 'database'.
+        ImportError: For 'layer_bfs' without NumPy installed.
+    """
+    search, heuristic_type = _split_algorithm(algorithm)
+    if stats is not None:
+        check_stats_support(algorithm)
+    if search == "ucs":
+        return UniformCostSearch(start_state, goal_state, budget=budget, stats=stats)
+    if search == "bidirectional":
+        return UniformCostSearch(
+            start_state, goal_state, bidirectional=True, budget=budget, stats=stats
+        )
+    if search == "layer_bfs":
+        return LayerBFSSearch(start_state, goal_state, budget, stats)
+    if search == "database":
+        return DatabaseSolver(start_state, goal_state)
+    if search == "frontier_bfs":
+        return FrontierSearch(start_state, goal_state, budget=budget, stats=stats)
+    if search == "frontier":
+        return FrontierSearch(start_state, goal_state, heuristic_type, budget, stats)
+    if search in ("astar", "epea"):
+        return ManhattanMisplacedHandler(
+            start_state,
+            goal_state,
+            heuristic_type,
+            budget=budget,
+            stats=stats,
+            partial_expansion=search == "epea",
+        )
+    return IDAStarSearch(start_state, goal_state, heuristic_type, budget, stats)
+
+
+def prepare_algorithm(algorithm: str, goal_state: GridState) -> None:
+    """
+    Loads the shared tables an algorithm needs, so that later solves reuse them.
+
+    Distance and pattern databases are cached per process once loaded. The
+    solvers look them up for the canonical goal that goal_state maps to.
+
+    Raises:
+        ValueError: If the algorithm is invalid.
+    """
+    search, heuristic_type = _split_algorithm(algorithm)
+    canonical_goal = goal_relabeling(tuple(goal_state)).canonical_goal
+    if search == "database":
+        load_distance_database(distance_database_path(canonical_goal), canonical_goal)
+    elif heuristic_type is not None:
+        build_heuristic(heuristic_type, tuple(canonical_goal))
+
+
+def score_many(
+    puzzles: Any,
+    heuristic_type: str = "manhattan",
+    goal_state: GridState = DEFAULT_GOAL_STATE,
+):
+    """
+    Scores many puzzles with a heuristic without solving them, e.g. to triage or
+    rank instances by estimated difficulty.
+
+    Args:
+        puzzles: An (n, N*N) integer array, or a list of start states.
+        heuristic_type: Any heuristic accepted by build_heuristic().
+        goal_state: The target configuration of every puzzle.
+
+    The goal is fully validated; each puzzle is only checked for its size and
+    tile range.
+
+    Returns:
+        A NumPy int32 array with the heuristic value of every puzzle, in input
+        order (see batch_heuristics.batch_heuristic()).
+
+    Raises:
+        ValueError: If the heuristic, the goal or the puzzles are invalid.
+        ImportError: If NumPy is not installed.
+    """
+    return batch_heuristic(heuristic_type, puzzles, tuple(goal_state))
+
+
+# Set in every worker process by _initialize_worker.
+_worker_algorithm: Optional[str] = None
+_worker_goal_state: Optional[GridState] = None
+_worker_budget: Optional[SearchBudget] = None
+
+
+def _initialize_worker(
+    algorithm: str, goal_state: GridState, budget: Optional[SearchBudget] = None
+) -> None:
+    global _worker_algorithm, _worker_goal_state, _worker_budget
+    _worker_algorithm = algorithm
+    _worker_goal_state = goal_state
+    _worker_budget = budget
+    prepare_algorithm(algorithm, goal_state)
+
+
+def _solve_chunk(puzzles: Sequence[GridState]) -> List[SearchResult]:
+    return [
+        make_solver(
+            _worker_algorithm, puzzle, _worker_goal_state, _worker_budget
+        ).solve()
+        for puzzle in puzzles
+    ]
+
+
+def solve_many(
+    puzzles: Iterable[GridState],
+    algorithm: str = "astar:manhattan",
+    goal_state: GridState = DEFAULT_GOAL_STATE,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    ordered: bool = True,
+    budget: Optional[SearchBudget] = None,
+) -> Union[List[SearchResult], Iterator[Tuple[int, SearchResult]]]:
+    """
+    Solves many puzzles across a pool of worker processes.
+
+    Every puzzle is validated and checked for solvability first. Unsolvable
+    ones are answered at once, and the rest are sent to the workers in chunks.
+    Each worker loads the tables the algorithm needs once, when it starts.
+
+    Args:
+        puzzles: Start states to solve, all for the same goal.
+        algorithm: Any name accepted by make_solver(). Defaults to 'astar:manhattan'.
+        goal_state: The target configuration of every puzzle.
+        workers: Number of worker processes. Defaults to the number of CPUs;
+                 1 solves in the calling process without a pool.
+        chunksize: Puzzles per task. Defaults to about four tasks per worker.
+        ordered: Return a list of results in input order (True), or an iterator
+                 of (input index, result) pairs as chunks finish (False).
+        budget: Limits on each puzzle's search, so one hard puzzle cannot hold
+                a worker for long. Puzzles that exceed it come back as CUTOFF.
+
+    Returns:
+        The SearchResult of every puzzle, as described for ordered.
+
+    Raises:
+        ValueError: If the algorithm or any of the puzzles is invalid.
+    """
+    # Fail fast, before any worker starts.
+    unsolvable_result(algorithm)
+    puzzles = list(puzzles)
+    for puzzle in puzzles:
+        validate_puzzle(puzzle, goal_state)
+    solvable_indices = [
+        index for index, puzzle in enumerate(puzzles) if is_solvable(puzzle, goal_state)
+    ]
+    unsolvable_indices = sorted(set(range(len(puzzles))) - set(solvable_indices))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(solvable_indices) // (workers * 4))
+    chunks = [
+        (
+            solvable_indices[start : start + chunksize],
+            [puzzles[index] for index in solvable_indices[start : start + chunksize]],
+        )
+        for start in range(0, len(solvable_indices), chunksize)
+    ]
+
+    def all_results() -> Iterator[Tuple[int, SearchResult]]:
+        for index in unsolvable_indices:
+            # One result each: SearchResult is mutable, and callers set fields.
+            yield index, unsolvable_result(algorithm)
+        yield from _solve_chunks(chunks, algorithm, goal_state, workers, budget)
+
+    if not ordered:
+        return all_results()
+    results: List[Optional[SearchResult]] = [None] * len(puzzles)
+    for index, result in all_results():
+        results[index] = result
+    return results
+
+
+def _solve_chunks(
+    chunks: List[Tuple[List[int], List[GridState]]],
+    algorithm: str,
+    goal_state: GridState,
+    workers: int,
+    budget: Optional[SearchBudget],
+) -> Iterator[Tuple[int, SearchResult]]:
+    """Yields (input index, result) pairs as chunks finish."""
+    if workers == 1:
+        _initialize_worker(algorithm, goal_state, budget)
+        for indices, chunk in chunks:
+            yield from zip(indices, _solve_chunk(chunk))
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_initialize_worker,
+        initargs=(algorithm, goal_state, budget),
+    ) as executor:
+        futures = {
+            executor.submit(_solve_chunk, chunk): indices for indices, chunk in chunks
+        }
+        for future in as_completed(futures):
+            yield from zip(futures[future], future.result())
@@ -0,0 +1,317 @@
+import argparse
+import csv
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from batch_solver import DEFAULT_GOAL_STATE, make_solver, prepare_algorithm
+from benchmark_history import open_history, record_run
+from database_solver_handler import UNREACHED, build_distance_database
+from layer_bfs_handler import NUMPY_AVAILABLE
+from packed_state import BLANK_MASK, MOVE_TABLE, GridState, move_blank, pack, unpack
+from permutation_rank import STATE_COUNT, rank, tile_parity, unrank
+
+DEFAULT_ALGORITHMS = [
+    "ucs",
+    "bidirectional",
+    "database",
+    "astar:misplaced",
+    "astar:manhattan",
+    "epea:manhattan",
+    "astar:linear_conflict",
+    "idastar:manhattan",
+    "frontier_bfs",
+    "frontier:manhattan",
+] + (["layer_bfs"] if NUMPY_AVAILABLE else [])
+DEFAULT_RESULTS_PATH = "benchmark_results.csv"
+DEFAULT_INSTANCES_PER_DEPTH = 2
+DEFAULT_WARMUP = 1
+DEFAULT_REPETITIONS = 3
+DEFAULT_SEED = 205
+
+# Columns of the results file, one row per (algorithm, instance).
+RESULT_FIELDS = [
+    "algorithm",
+    "depth",
+    "instance",
+    "start_state",
+    "seed",
+    "status",
+    "solution_depth",
+    "repetitions",
+    "wall_seconds_median",
+    "wall_seconds_min",
+    "expansions",
+    "max_queue_size",
+    "peak_memory_bytes",
+    "states_per_second",
+]
+
+Instance = Tuple[int, GridState]  # (exact optimal depth, start state)
+
+
+def verify_distance_oracle(distances: Sequence[int], goal_state: GridState) -> None:
+    """
+    Checks that a distance table holds the exact distance of every state.
+
+    A table is exact if and only if the goal is its only 0 and every other
+    reachable state is one more than its closest neighbor. That is checked for
+    every state, independently of how the table was built.
+
+    Raises:
+        ValueError: If the table is not the exact distance table of goal_state.
+    """
+    goal = pack(goal_state)
+    parity = tile_parity(goal)
+    if len(distances) != STATE_COUNT:
+        raise ValueError("The distance table must hold one entry per state.")
+    for state_rank in range(STATE_COUNT):
+        distance = distances[state_rank]
+        state = unrank(state_rank, parity)
+        if distance == UNREACHED:
+            raise ValueError(f"State {unpack(state)} is reachable but unreached.")
+        if distance == 0:
+            if state != goal:
+                raise ValueError(f"State {unpack(state)} is not the goal.")
+            continue
+        closest = min(
+            distances[rank(move_blank(state, target_index))]
+            for _, target_index, _, _ in MOVE_TABLE[state & BLANK_MASK]
+        )
+        if closest != distance - 1:
+            raise ValueError(f"State {unpack(state)} has a wrong distance.")
+
+
+def generate_instances(
+    per_depth: int = DEFAULT_INSTANCES_PER_DEPTH,
+    seed: int = DEFAULT_SEED,
+    goal_state: GridState = DEFAULT_GOAL_STATE,
+    depths: Optional[Sequence[int]] = None,
+) -> List[Instance]:
+    """
+    Draws start states at exact optimal depths from a verified BFS oracle.
+
+    The same seed and goal always give the same instances.
+
+    Args:
+        per_depth: Instances to draw at each depth. Depths with fewer states
+                   (depth 0 has one, depth 31 has two) contribute all of them.
+        seed: Seed of the random draw.
+        goal_state: The goal configuration (list of 9 ints).
+        depths: The depths to draw from. Defaults to every depth that occurs,
+                0 to 31 for the standard goal.
+
+    Returns:
+        (depth, start state) pairs, by increasing depth.
+    """
+    distances = build_distance_database(goal_state)
+    verify_distance_oracle(distances, goal_state)
+    parity = tile_parity(pack(goal_state))
+
+    ranks_by_depth: Dict[int, List[int]] = {}
+    for state_rank, distance in enumerate(distances):
+        ranks_by_depth.setdefault(distance, []).append(state_rank)
+    if depths is None:
+        depths = sorted(ranks_by_depth)
+
+    rng = random.Random(seed)
+    instances: List[Instance] = []
+    for depth in depths:
+        ranks = ranks_by_depth.get(depth, [])
+        for state_rank in rng.sample(ranks, min(per_depth, len(ranks))):
+            instances.append((depth, unpack(unrank(state_rank, parity))))
+    return instances
+
+
+def measure(
+    algorithm: str,
+    start_state: GridState,
+    goal_state: GridState,
+    warmup: int = DEFAULT_WARMUP,
+    repetitions: int = DEFAULT_REPETITIONS,
+    trace_memory: bool = True,
+) -> Dict[str, Any]:
+    """
+    Solves one instance repeatedly and summarises the runs.
+
+    Timed runs come after `warmup` untimed ones. Peak memory is measured in a
+    separate run, because tracing allocations slows the search down (about 30
+    times for UCS, which allocates an int per generated state).
+
+    Args:
+        trace_memory: Make the extra run that measures peak memory. Without
+                      it, peak_memory_bytes is None.
+
+    Returns:
+        The measured fields of a results row (see RESULT_FIELDS).
+    """
+    for _ in range(warmup):
+        make_solver(algorithm, start_state, goal_state).solve()
+
+    wall_times: List[float] = []
+    for _ in range(repetitions):
+        solver = make_solver(algorithm, start_state, goal_state)
+        started = time.perf_counter()
+        result = solver.solve()
+        wall_times.append(time.perf_counter() - started)
+
+    peak_memory = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            make_solver(algorithm, start_state, goal_state).solve()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    wall_median = statistics.median(wall_times)
+    return {
+        "status": result.status,
+        "solution_depth": result.depth,
+        "repetitions": repetitions,
+        "wall_seconds_median": round(wall_median, 6),
+        "wall_seconds_min": round(min(wall_times), 6),
+        "expansions": result.num_expanded_nodes,
+        "max_queue_size": result.max_queue_size,
+        "peak_memory_bytes": peak_memory,
+        "states_per_second": round(result.num_expanded_nodes / wall_median, 1)
+        if wall_median
+        else 0.0,
+    }
+
+
+def run_benchmark(
+    instances: Sequence[Instance],
+    algorithms: Sequence[str] = DEFAULT_ALGORITHMS,
+    goal_state: GridState = DEFAULT_GOAL_STATE,
+    warmup: int = DEFAULT_WARMUP,
+    repetitions: int = DEFAULT_REPETITIONS,
+    seed: Optional[int] = None,
+    progress: Optional[Any] = None,
+    trace_memory: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Measures every algorithm on every instance.
+
+    Args:
+        instances: (depth, start state) pairs, as generate_instances() returns.
+        algorithms: Names accepted by batch_solver.make_solver().
+        goal_state: The goal of every instance.
+        warmup: Untimed solves before the timed ones, per instance.
+        repetitions: Timed solves per instance.
+        seed: The seed the instances were drawn with, recorded in every row.
+        progress: A stream to report each measurement on, or None.
+        trace_memory: Measure peak memory (see measure()).
+
+    Returns:
+        One results row per (algorithm, instance), with the RESULT_FIELDS keys.
+
+    Raises:
+        ValueError: If an algorithm is invalid or a solver returns a wrong depth.
+    """
+    rows: List[Dict[str, Any]] = []
+    for algorithm in algorithms:
+        prepare_algorithm(algorithm, goal_state)  # Tables are not timed
+        for index, (depth, start_state) in enumerate(instances):
+            row = {
+                "algorithm": algorithm,
+                "depth": depth,
+                "instance": index,
+                "start_state": " ".join(str(tile) for tile in start_state),
+                "seed": seed,
+            }
+            measured = measure(
+                algorithm, start_state, goal_state, warmup, repetitions, trace_memory
+            )
+            row.update(measured)
+            if row["solution_depth"] != depth:
+                raise ValueError(
+                    f"{algorithm} solved {start_state} in {row['solution_depth']} "
+                    f"moves, but its optimal depth is {depth}."
+                )
+            rows.append(row)
+            if progress is not None:
+                print(
+                    f"{algorithm:>24} depth {depth:>2}: "
+                    f"{row['wall_seconds_median'] * 1000:9.2f} ms, "
+                    f"{row['expansions']:>7} expansions",
+                    file=progress,
+                    flush=True,
+                )
+    return rows
+
+
+def write_results(rows: Sequence[Dict[str, Any]], path: str) -> None:
+    """Writes results rows as CSV with the RESULT_FIELDS columns."""
+    with open(path, "w", newline="") as results_file:
+        writer = csv.DictWriter(results_file, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the 8-puzzle solvers on instances of every depth."
+    )
+    parser.add_argument("-o", "--output", default=DEFAULT_RESULTS_PATH)
+    parser.add_argument(
+        "-a",
+        "--algorithms",
+        default=",".join(DEFAULT_ALGORITHMS),
+        help="Comma-separated algorithm names (default: all of them).",
+    )
+    parser.add_argument(
+        "-n", "--per-depth", type=int, default=DEFAULT_INSTANCES_PER_DEPTH
+    )
+    parser.add_argument(
+        "--depths",
+        default=None,
+        help="Comma-separated depths (default: every depth, 0 to 31).",
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("-r", "--repetitions", type=int, default=DEFAULT_REPETITIONS)
+    parser.add_argument(
+        "--history",
+        default=None,
+        help="Also record the run in this benchmark_history.py database.",
+    )
+    parser.add_argument(
+        "--skip-memory",
+        action="store_true",
+        help="Skip the tracemalloc run that measures peak memory (it is slow).",
+    )
+    args = parser.parse_args(argv)
+    if args.repetitions < 1 or args.warmup < 0 or args.per_depth < 1:
+        parser.error("repetitions and per-depth must be positive, warmup non-negative.")
+
+    depths = None
+    if args.depths:
+        depths = [int(depth) for depth in args.depths.split(",")]
+    instances = generate_instances(args.per_depth, args.seed, depths=depths)
+    print(f"{len(instances)} instances, seed {args.seed}", file=sys.stderr)
+    try:
+        rows = run_benchmark(
+            instances,
+            args.algorithms.split(","),
+            warmup=args.warmup,
+            repetitions=args.repetitions,
+            seed=args.seed,
+            progress=sys.stderr,
+            trace_memory=not args.skip_memory,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    write_results(rows, args.output)
+    print(f"Wrote {len(rows)} rows to {args.output}", file=sys.stderr)
+    if args.history:
+        run_id = record_run(open_history(args.history), rows, seed=args.seed)
+        print(f"Recorded run {run_id} in {args.history}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,442 @@
+import argparse
+import csv
+import datetime
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+DEFAULT_HISTORY_PATH = "benchmark_history.sqlite"
+DEFAULT_BUCKET_WIDTH = 4
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_CHANGE = 0.05  # Smallest relative slowdown worth reporting
+
+# Metrics compared between runs; larger is worse for all of them.
+REGRESSION_METRICS = ["wall_seconds_median", "expansions", "peak_memory_bytes"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    commit_hash TEXT NOT NULL,
+    dirty INTEGER NOT NULL,
+    recorded_at TEXT NOT NULL,
+    seed INTEGER,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    commit_hash TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    heuristic TEXT NOT NULL,
+    depth_bucket INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    start_state TEXT NOT NULL,
+    status TEXT NOT NULL,
+    repetitions INTEGER,
+    wall_seconds_median REAL,
+    wall_seconds_min REAL,
+    expansions INTEGER,
+    max_queue_size INTEGER,
+    peak_memory_bytes INTEGER,
+    states_per_second REAL
+);
+CREATE INDEX IF NOT EXISTS measurements_by_key
+    ON measurements (commit_hash, algorithm, heuristic, depth_bucket);
+CREATE INDEX IF NOT EXISTS measurements_by_run ON measurements (run_id);
+"""
+
+# Results-file columns stored per measurement, with their types.
+_MEASUREMENT_COLUMNS = {
+    "repetitions": int,
+    "wall_seconds_median": float,
+    "wall_seconds_min": float,
+    "expansions": int,
+    "max_queue_size": int,
+    "peak_memory_bytes": int,
+    "states_per_second": float,
+}
+
+# (algorithm, heuristic, depth bucket)
+GroupKey = Tuple[str, str, int]
+
+
+class Comparison(NamedTuple):
+    """
+    One metric of one (algorithm, heuristic, depth bucket) in two runs.
+
+    median_ratio is the median over instances of candidate / baseline, and
+    p_value the one-sided probability of a change this large if the candidate
+    were no worse (see signed_rank_p_value()).
+    """
+
+    algorithm: str
+    heuristic: str
+    depth_bucket: int
+    metric: str
+    num_pairs: int
+    median_ratio: float
+    p_value: float
+    regression: bool
+
+
+def current_commit(path: Optional[str] = None) -> Tuple[str, bool]:
+    """
+    Returns the git commit of the solvers' source tree and whether it has
+    uncommitted changes, or ("unknown", False) outside a git checkout.
+
+    Args:
+        path: A directory inside the checkout. Defaults to this module's.
+    """
+    path = path or os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit_hash = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=path,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        changes = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=path,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit_hash, bool(changes.strip())
+
+
+def split_algorithm(name: str) -> Tuple[str, str]:
+    """Splits a make_solver() name such as 'astar:manhattan' into its parts."""
+    algorithm, _, heuristic = name.partition(":")
+    return algorithm, heuristic
+
+
+def depth_bucket(depth: int, width: int = DEFAULT_BUCKET_WIDTH) -> int:
+    """Returns the smallest depth of the bucket a depth falls into."""
+    return depth - depth % width
+
+
+def open_history(path: str = DEFAULT_HISTORY_PATH) -> sqlite3.Connection:
+    """Opens (creating if needed) a benchmark history database."""
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def read_results(path: str) -> List[Dict[str, Any]]:
+    """Reads the rows of a results file written by benchmark.py."""
+    with open(path, newline="") as results_file:
+        return list(csv.DictReader(results_file))
+
+
+def _typed(value: Any, kind: type) -> Any:
+    # Results read back from CSV hold strings, and "" for missing values.
+    if value is None or value == "":
+        return None
+    return kind(value)
+
+
+def record_run(
+    connection: sqlite3.Connection,
+    rows: Iterable[Dict[str, Any]],
+    commit_hash: Optional[str] = None,
+    dirty: bool = False,
+    seed: Optional[int] = None,
+    source: Optional[str] = None,
+    bucket_width: int = DEFAULT_BUCKET_WIDTH,
+) -> int:
+    """
+    Stores one benchmark run.
+
+    Args:
+        connection: A database from open_history().
+        rows: Results rows, as benchmark.run_benchmark() returns them or as
+              read_results() reads them back.
+        commit_hash: The commit that was measured. Defaults to the current
+                     commit and its dirty flag (see current_commit()).
+        dirty: Whether the measured tree had uncommitted changes.
+        seed: The seed of the instances. Defaults to the rows' seed.
+        source: Where the rows came from, for reference.
+        bucket_width: Number of depths per depth bucket.
+
+    Returns:
+        The id of the new run.
+    """
+    rows = list(rows)
+    if commit_hash is None:
+        commit_hash, dirty = current_commit()
+    if seed is None and rows:
+        seed = _typed(rows[0].get("seed"), int)
+
+    with connection:
+        run_id = connection.execute(
+            "INSERT INTO runs (commit_hash, dirty, recorded_at, seed, source) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                commit_hash,
+                int(dirty),
+                datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                seed,
+                source,
+            ),
+        ).lastrowid
+        types = list(_MEASUREMENT_COLUMNS.items())
+        columns = [column for column, _ in types]
+        connection.executemany(
+            "INSERT INTO measurements (run_id, commit_hash, algorithm, heuristic, "
+            "depth_bucket, depth, start_state, status, "
+            f"{', '.join(columns)}) VALUES ({', '.join('?' * (8 + len(columns)))})",
+            [
+                (
+                    run_id,
+                    commit_hash,
+                    *split_algorithm(row["algorithm"]),
+                    depth_bucket(int(row["depth"]), bucket_width),
+                    int(row["depth"]),
+                    row["start_state"],
+                    row["status"],
+                    *(_typed(row[column], kind) for column, kind in types),
+                )
+                for row in rows
+            ],
+        )
+    return run_id
+
+
+def resolve_run(connection: sqlite3.Connection, spec: str) -> int:
+    """
+    Finds a run from a run id, a commit hash prefix or 'latest'.
+
+    A commit that was measured several times resolves to its latest run.
+
+    Raises:
+        ValueError: If no run matches.
+    """
+    if spec == "latest":
+        row = connection.execute("SELECT MAX(run_id) FROM runs").fetchone()
+    elif spec.isdigit():
+        row = connection.execute(
+            "SELECT run_id FROM runs WHERE run_id = ?", (int(spec),)
+        ).fetchone()
+    else:
+        row = connection.execute(
+            "SELECT MAX(run_id) FROM runs WHERE commit_hash LIKE ?", (spec + "%",)
+        ).fetchone()
+    if row is None or row[0] is None:
+        raise ValueError(f"No benchmark run matches '{spec}'.")
+    return row[0]
+
+
+def signed_rank_p_value(differences: Sequence[float]) -> float:
+    """
+    One-sided Wilcoxon signed-rank test that the differences tend to be positive.
+
+    Zero differences are dropped and tied magnitudes share their mean rank.
+    The p-value is exact: the null distribution of the positive rank sum is
+    counted over every sign assignment, so it is valid for the handful of
+    instances a depth bucket holds.
+
+    Returns:
+        The probability, if signs were random, of a positive rank sum at least
+        as large as the observed one. 1.0 when every difference is zero.
+    """
+    magnitudes = sorted(abs(value) for value in differences if value != 0)
+    if not magnitudes:
+        return 1.0
+
+    # Doubled mid-ranks, so that ties keep integer ranks.
+    doubled_ranks: Dict[float, int] = {}
+    index = 0
+    while index < len(magnitudes):
+        end = index
+        while end + 1 < len(magnitudes) and magnitudes[end + 1] == magnitudes[index]:
+            end += 1
+        doubled_ranks[magnitudes[index]] = index + end + 2
+        index = end + 1
+
+    observed = sum(doubled_ranks[value] for value in differences if value > 0)
+    # counts[s] = number of sign assignments whose positive doubled ranks sum to s
+    counts = [1]
+    for value in differences:
+        if value == 0:
+            continue
+        doubled_rank = doubled_ranks[abs(value)]
+        shifted = [0] * doubled_rank + counts
+        counts = [
+            (counts[total] if total < len(counts) else 0) + shifted[total]
+            for total in range(len(shifted))
+        ]
+    return sum(counts[observed:]) / 2 ** len(magnitudes)
+
+
+def _ratio(old: float, new: float) -> float:
+    if old:
+        return new / old
+    return 1.0 if new == old else float("inf")
+
+
+def _run_measurements(
+    connection: sqlite3.Connection, run_id: int
+) -> Dict[GroupKey, Dict[str, sqlite3.Row]]:
+    # Solved measurements of a run, by group and then by start state.
+    groups: Dict[GroupKey, Dict[str, sqlite3.Row]] = {}
+    for row in connection.execute(
+        "SELECT * FROM measurements WHERE run_id = ? AND status = 'solved'", (run_id,)
+    ):
+        key = (row["algorithm"], row["heuristic"], row["depth_bucket"])
+        groups.setdefault(key, {})[row["start_state"]] = row
+    return groups
+
+
+def compare_runs(
+    connection: sqlite3.Connection,
+    baseline_run: int,
+    candidate_run: int,
+    alpha: float = DEFAULT_ALPHA,
+    min_change: float = DEFAULT_MIN_CHANGE,
+    metrics: Sequence[str] = REGRESSION_METRICS,
+) -> List[Comparison]:
+    """
+    Compares two runs per algorithm, heuristic, depth bucket and metric.
+
+    Instances are paired by start state, so both runs should use the same
+    seed; groups without common instances are skipped. A metric regresses
+    when the signed-rank test finds it larger at level alpha and the median
+    ratio is at least 1 + min_change. A bucket needs about five instances
+    before any change can be significant at alpha = 0.05.
+
+    Returns:
+        One Comparison per group and metric with paired values.
+    """
+    baseline = _run_measurements(connection, baseline_run)
+    candidate = _run_measurements(connection, candidate_run)
+    comparisons: List[Comparison] = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        common = sorted(baseline[key].keys() & candidate[key].keys())
+        for metric in metrics:
+            pairs = [
+                (baseline[key][state][metric], candidate[key][state][metric])
+                for state in common
+            ]
+            pairs = [
+                (old, new) for old, new in pairs if old is not None and new is not None
+            ]
+            if not pairs:
+                continue
+            median_ratio = statistics.median(_ratio(old, new) for old, new in pairs)
+            p_value = signed_rank_p_value([new - old for old, new in pairs])
+            comparisons.append(
+                Comparison(
+                    *key,
+                    metric=metric,
+                    num_pairs=len(pairs),
+                    median_ratio=median_ratio,
+                    p_value=p_value,
+                    regression=p_value < alpha and median_ratio >= 1 + min_change,
+                )
+            )
+    return comparisons
+
+
+def _describe_run(connection: sqlite3.Connection, run_id: int) -> str:
+    run = connection.execute(
+        "SELECT * FROM runs WHERE run_id = ?", (run_id,)
+    ).fetchone()
+    dirty = "+dirty" if run["dirty"] else ""
+    recorded_at = run["recorded_at"][:19]
+    return f"run {run_id} ({run['commit_hash'][:10]}{dirty}, {recorded_at})"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Keep a history of benchmark.py results and detect regressions."
+    )
+    parser.add_argument("--db", default=DEFAULT_HISTORY_PATH, help="History database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Store a results file as a run.")
+    record.add_argument("results", help="Results CSV written by benchmark.py.")
+    record.add_argument("--commit", default=None, help="Default: the current commit.")
+    record.add_argument("--bucket-width", type=int, default=DEFAULT_BUCKET_WIDTH)
+
+    commands.add_parser("list", help="List the recorded runs.")
+
+    compare = commands.add_parser(
+        "compare", help="Flag regressions of a run against a baseline run."
+    )
+    compare.add_argument("baseline", help="Run id, commit hash prefix or 'latest'.")
+    compare.add_argument("candidate", nargs="?", default="latest")
+    compare.add_argument("--alpha", type=float, default=DEFAULT_ALPHA)
+    compare.add_argument(
+        "--min-change",
+        type=float,
+        default=DEFAULT_MIN_CHANGE,
+        help="Smallest relative increase reported (default: 0.05, i.e. 5%%).",
+    )
+    compare.add_argument(
+        "--all",
+        action="store_true",
+        help="Show every comparison, not only regressions.",
+    )
+    args = parser.parse_args(argv)
+
+    connection = open_history(args.db)
+    if args.command == "record":
+        if args.bucket_width < 1:
+            parser.error("--bucket-width must be positive.")
+        commit_hash, dirty = current_commit()
+        if args.commit is not None:
+            commit_hash, dirty = args.commit, False
+        run_id = record_run(
+            connection,
+            read_results(args.results),
+            commit_hash,
+            dirty,
+            source=args.results,
+            bucket_width=args.bucket_width,
+        )
+        print(f"Recorded {_describe_run(connection, run_id)}")
+        return 0
+
+    if args.command == "list":
+        for run in connection.execute("SELECT run_id FROM runs ORDER BY run_id"):
+            print(_describe_run(connection, run["run_id"]))
+        return 0
+
+    try:
+        baseline_run = resolve_run(connection, args.baseline)
+        candidate_run = resolve_run(connection, args.candidate)
+    except ValueError as error:
+        parser.error(str(error))
+    comparisons = compare_runs(
+        connection, baseline_run, candidate_run, args.alpha, args.min_change
+    )
+    print(
+        f"Baseline {_describe_run(connection, baseline_run)}, "
+        f"candidate {_describe_run(connection, candidate_run)}"
+    )
+    if not comparisons:
+        print("The runs have no instances in common (were they run with one seed?).")
+    regressions = [comparison for comparison in comparisons if comparison.regression]
+    for comparison in comparisons if args.all else regressions:
+        name = comparison.algorithm
+        if comparison.heuristic:
+            name += ":" + comparison.heuristic
+        label = "REGRESSION" if comparison.regression else "ok"
+        print(
+            f"{label:>10}  {name:<22} depth {comparison.depth_bucket:>2}+ "
+            f"{comparison.metric:<20} x{comparison.median_ratio:.3f} "
+            f"(p = {comparison.p_value:.4f}, {comparison.num_pairs} instances)"
+        )
+    print(f"{len(regressions)} regressions in {len(comparisons)} comparisons")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
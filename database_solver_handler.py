@@ -0,0 +1,226 @@
+import mmap
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from goal_relabeling import GoalRelabeling, goal_relabeling
+from layer_bfs_handler import NUMPY_AVAILABLE, layer_distances
+from packed_state import (
+    BLANK_MASK,
+    MOVE_TABLE,
+    TILE_MASK,
+    GridState,
+    PackedState,
+    move_blank,
+    pack,
+)
+from permutation_rank import STATE_COUNT, rank
+from search_result import SOLVED, UNSOLVABLE, SearchResult
+from solution_path import SolutionPath, encode_moves
+from solvability import is_solvable, validate_puzzle
+
+# The default database stores distances to this goal. Other goals are relabeled
+# onto one of the canonical goals (see goal_relabeling.py), and each canonical
+# goal other than this one gets its own file next to the default one.
+DATABASE_GOAL_STATE: GridState = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+DEFAULT_DATABASE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "eight_puzzle_distances.bin"
+)
+UNREACHED = 0xFF  # Distance byte of states in the other parity class
+
+# Open databases, shared by every solver in the process.
+_loaded_databases: Dict[str, mmap.mmap] = {}
+
+
+def build_distance_database(
+    goal_state: GridState = DATABASE_GOAL_STATE,
+) -> bytearray:
+    """
+    Runs a breadth-first search backwards from the goal over every reachable state.
+
+    Moves are reversible, so the BFS depth of a state is its exact distance to
+    the goal. Uses the NumPy layer BFS (see layer_bfs_handler.py) when NumPy is
+    installed, and a plain queue otherwise.
+
+    Args:
+        goal_state: The goal configuration (list of 9 ints).
+
+    Returns:
+        One distance byte per permutation rank (see permutation_rank.py).
+    """
+    if NUMPY_AVAILABLE:
+        return layer_distances(goal_state)
+
+    goal = pack(goal_state)
+    distances = bytearray([UNREACHED]) * STATE_COUNT
+    distances[rank(goal)] = 0
+
+    queue: Deque[Tuple[PackedState, int]] = deque([(goal, 0)])
+    while queue:
+        state, depth = queue.popleft()
+        blank = state & BLANK_MASK
+        for _, target_index, blank_shift, target_shift in MOVE_TABLE[blank]:
+            tile = (state >> target_shift) & TILE_MASK
+            neighbor_state = (
+                state
+                + (tile << blank_shift)
+                - (tile << target_shift)
+                - blank
+                + target_index
+            )
+            neighbor_rank = rank(neighbor_state)
+            if distances[neighbor_rank] == UNREACHED:
+                distances[neighbor_rank] = depth + 1
+                queue.append((neighbor_state, depth + 1))
+    return distances
+
+
+def distance_database_path(goal_state: GridState) -> str:
+    """Returns where the database of a canonical goal is stored."""
+    if goal_state == DATABASE_GOAL_STATE:
+        return DEFAULT_DATABASE_PATH
+    root, extension = os.path.splitext(DEFAULT_DATABASE_PATH)
+    return "{}_{}{}".format(root, "-".join(str(tile) for tile in goal_state), extension)
+
+
+def load_distance_database(
+    path: str = DEFAULT_DATABASE_PATH,
+    goal_state: GridState = DATABASE_GOAL_STATE,
+) -> mmap.mmap:
+    """
+    Memory-maps the distance database, generating the file first if needed.
+
+    The mapping is opened once per path and shared by later calls.
+
+    Args:
+        path: Location of the 1-byte-per-state database file.
+        goal_state: The goal the database holds distances to, used to build it.
+
+    Returns:
+        A read-only mapping indexed by permutation rank.
+
+    Raises:
+        ValueError: If the file exists but does not hold one byte per state.
+    """
+    database = _loaded_databases.get(path)
+    if database is not None:
+        return database
+
+    if not os.path.exists(path):
+        distances = build_distance_database(goal_state)
+        # Write to a temporary name first so readers never see a partial file.
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as database_file:
+            database_file.write(distances)
+        os.replace(temporary_path, path)
+
+    with open(path, "rb") as database_file:
+        database = mmap.mmap(database_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(database) != STATE_COUNT:
+        database.close()
+        raise ValueError(
+            f"{path} holds {len(database)} bytes, expected one per state ({STATE_COUNT})."
+        )
+
+    _loaded_databases[path] = database
+    return database
+
+
+class DatabaseSolver:
+    """
+    Solves the 8-puzzle problem by looking up a precomputed distance database.
+
+    The depth of the solution is read directly from the database, and an optimal
+    path is rebuilt by repeatedly moving to any neighbor one step closer to the goal.
+    """
+
+    def __init__(
+        self,
+        start_state: GridState,
+        goal_state: GridState,
+        database_path: Optional[str] = None,
+    ):
+        """
+        Initializes the search problem.
+
+        Args:
+            start_state: The initial configuration of the puzzle (list of 9 ints, 0 represents blank).
+            goal_state: The target configuration of the puzzle (list of 9 ints).
+            database_path: Location of the distance database file of the
+                           canonical goal goal_state maps to. Defaults to
+                           distance_database_path() of that goal.
+
+        Raises:
+            ValueError: If the states are not boards of 9 cells holding 0 to 8
+                once each.
+        """
+        validate_puzzle(start_state, goal_state, 9)
+
+        self.start_state: GridState = start_state
+        self.goal_state: GridState = goal_state
+        # Look up distances to a canonical goal (see goal_relabeling.py), so
+        # three database files serve every goal.
+        self.relabeling: GoalRelabeling = goal_relabeling(tuple(goal_state))
+        self.canonical_start_state: GridState = self.relabeling.to_canonical(
+            start_state
+        )
+        self.canonical_goal_state: GridState = self.relabeling.canonical_goal
+        self.database_path: str = database_path or distance_database_path(
+            self.canonical_goal_state
+        )
+
+        self.solution_path: Optional[SolutionPath] = None
+        self.solution_depth: Optional[int] = None
+        self.max_queue_size: int = 0
+        self.num_expanded_nodes: int = 0
+
+    def solve(self) -> SearchResult:
+        """
+        Looks up the solution depth and rebuilds an optimal path by greedy descent.
+
+        Returns:
+            A SearchResult that unpacks as the tuple:
+            - The solution path (a SolutionPath of states from start to goal) or None if no solution.
+            - The depth of the solution (number of moves) or None.
+            - The maximum queue size, always 0 since no queue is used.
+            - The number of states whose neighbors were looked up during the descent.
+        """
+        start_time = time.perf_counter()
+        if not is_solvable(self.start_state, self.goal_state):
+            # Boards of the other parity class cannot reach the goal.
+            return SearchResult(
+                UNSOLVABLE, elapsed_seconds=time.perf_counter() - start_time
+            )
+
+        distances = load_distance_database(
+            self.database_path, self.canonical_goal_state
+        )
+        start_state = pack(self.canonical_start_state)
+
+        state = start_state
+        distance = distances[rank(state)]
+        self.solution_depth = distance
+        moves: List[int] = []
+
+        while distance:
+            for move, target_index, _, _ in MOVE_TABLE[state & BLANK_MASK]:
+                neighbor_state = move_blank(state, target_index)
+                if distances[rank(neighbor_state)] == distance - 1:
+                    break
+            state = neighbor_state
+            distance -= 1
+            moves.append(move)
+            self.num_expanded_nodes += 1
+
+        self.solution_path = self.relabeling.path_from_canonical(
+            self.start_state,
+            SolutionPath(self.canonical_start_state, encode_moves(moves)),
+        )
+        return SearchResult(
+            SOLVED,
+            path=self.solution_path,
+            max_queue_size=self.max_queue_size,
+            num_expanded_nodes=self.num_expanded_nodes,
+            elapsed_seconds=time.perf_counter() - start_time,
+        )
@@ -1,5 +1,7 @@
 from uniform_cost_search_handler import UniformCostSearch
 from manhattan_misplaced_handler import ManhattanMisplacedHandler
+from database_solver_handler import DatabaseSolver
+from solvability import validate_board
 
 
 def print_state(state):
@@ -29,11 +31,12 @@ if __name__ == "__main__":
                 print(
                     "Invalid row. Each row must consist of exactly three numbers, all between 0 and 8."
                 )
-            if len(start_state) == 9 and len(set(start_state)) != 9:
-                print(
-                    "Invalid puzzle. Ensure all numbers from 0 to 8 are present and unique."
-                )
-                start_state.clear()
+            if len(start_state) == 9:
+                try:
+                    validate_board(start_state, "The puzzle", 9)
+                except ValueError as error:
+                    print(f"Invalid puzzle. {error}")
+                    start_state.clear()
     elif customized_input_choice == "2":
         start_state = [2, 4, 3, 5, 1, 8, 7, 6, 0]
 
@@ -41,14 +44,25 @@ if __name__ == "__main__":
         "Enter \n"
         "1 for Uniform Cost Search, \n"
         "2 for Misplaced Tile Heuristic, \n"
-        "3 for Manhattan Distance Heuristic: \n"
+        "3 for Manhattan Distance Heuristic, \n"
+        "4 for Distance Database Lookup, \n"
+        "5 for Bidirectional Breadth-First Search: \n"
         "Your choice: "
     )
 
-    if algorithm_choice == "1":
-        print("Using Uniform Cost Search")
-        print()
-        solver = UniformCostSearch(start_state, goal_state)
+    if algorithm_choice in ("1", "4", "5"):
+        if algorithm_choice == "1":
+            print("Using Uniform Cost Search")
+            print()
+            solver = UniformCostSearch(start_state, goal_state)
+        elif algorithm_choice == "4":
+            print("Using Distance Database Lookup")
+            print()
+            solver = DatabaseSolver(start_state, goal_state)
+        elif algorithm_choice == "5":
+            print("Using Bidirectional Breadth-First Search")
+            print()
+            solver = UniformCostSearch(start_state, goal_state, bidirectional=True)
         results = solver.solve()
         (
             path,
@@ -64,6 +78,7 @@ if __name__ == "__main__":
                 print(f"Step: {i + 1}")
                 print_state(path[i])  # Print the state grid
             print(f"Depth for the Solution Was: {depth}")
+            print(f"Blank Moves: {path.moves}")
             print(f"Number of Nodes Expanded: {expanded_nodes}")
             print(f"Max Queue Size: {max_queue}")
             print()
@@ -100,6 +115,7 @@ if __name__ == "__main__":
                 print("h(n) values: ", h_n_values_path[i])
                 print_state(path[i])  # Print the state grid
             print(f"Depth for the Solution Was: {depth}")
+            print(f"Blank Moves: {path.moves}")
             print(f"Number of Nodes Expanded: {expanded_nodes}")
             print(f"Max Queue Size: {max_queue}")
         else:
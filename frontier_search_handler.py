@@ -0,0 +1,446 @@
+import heapq
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from goal_relabeling import goal_relabeling
+from heuristics import build_heuristic
+from packed_state import BoardGeometry, GridState, PackedState, geometry_for
+from search_budget import SearchBudget
+from search_result import (
+    ASTAR_SHAPE,
+    CUTOFF,
+    SOLVED,
+    UCS_SHAPE,
+    UNSOLVABLE,
+    SearchResult,
+)
+from search_stats import SearchStats
+from solution_path import MOVE_LETTERS, SolutionPath
+from solvability import is_solvable, validate_puzzle
+
+# A state on a shortest path between two states, with its distances to both.
+Midpoint = Tuple[PackedState, int, int]
+
+
+def next_layer(
+    layer: Set[PackedState], previous: Set[PackedState], geometry: BoardGeometry
+) -> Set[PackedState]:
+    """
+    Generates the breadth-first layer after `layer` without a closed list.
+
+    Every move shifts the blank to a cell of the other colour on a chessboard,
+    so the puzzle graph is bipartite and undirected: the neighbors of layer d
+    lie in layer d - 1 or d + 1. Checking them against the previous layer is
+    therefore enough to drop every state reached before.
+
+    Args:
+        layer: The packed boards at depth d.
+        previous: The packed boards at depth d - 1 (empty for the root).
+        geometry: The geometry of the boards.
+
+    Returns:
+        The packed boards at depth d + 1.
+    """
+    move_table = geometry.move_table
+    blank_mask, tile_mask = geometry.blank_mask, geometry.tile_mask
+    layer_after: Set[PackedState] = set()
+    add = layer_after.add
+    for state in layer:
+        blank = state & blank_mask
+        for _, target_index, blank_shift, target_shift in move_table[blank]:
+            tile = (state >> target_shift) & tile_mask
+            neighbor = (
+                state
+                + (tile << blank_shift)
+                - (tile << target_shift)
+                - blank
+                + target_index
+            )
+            if neighbor not in previous:
+                add(neighbor)
+    return layer_after
+
+
+def frontier_layers(
+    root: PackedState, geometry: BoardGeometry
+) -> Iterator[Set[PackedState]]:
+    """
+    Runs a breadth-first search that keeps only its last two layers.
+
+    Memory is bounded by the two widest consecutive layers instead of every
+    state reached, so boards whose state space does not fit in a visited table
+    can still be explored layer by layer (see next_layer()).
+
+    Args:
+        root: The packed board to search from.
+        geometry: The geometry of the board.
+
+    Yields:
+        Each layer as a set of packed boards, starting with {root}. A layer is
+        only generated when the next one is requested, so callers can stop early.
+    """
+    previous: Set[PackedState] = set()
+    layer = {root}
+    while layer:
+        yield layer
+        previous, layer = layer, next_layer(layer, previous, geometry)
+
+
+class FrontierSearch:
+    """
+    Solves sliding-tile puzzles of any square size without a closed list.
+
+    Frontier search stores only the states that can still be generated again:
+    the last two layers of a bidirectional breadth-first search, or the open
+    list of A*, where each open state remembers which of its moves lead back to
+    states already reached ("used operators"), so expanded states can be
+    dropped. Without a parent map, a search only returns a state in the middle
+    of a shortest path, and the path is rebuilt by solving the two halves the
+    same way (divide-and-conquer), which costs a fraction of the first search.
+    """
+
+    def __init__(
+        self,
+        start_state: GridState,
+        goal_state: GridState,
+        heuristic_type: Optional[str] = None,
+        budget: Optional[SearchBudget] = None,
+        stats: Optional[SearchStats] = None,
+    ):
+        """
+        Initializes the search problem.
+
+        Args:
+            start_state: The initial puzzle configuration (list of width * width ints).
+            goal_state: The target configuration of the puzzle (same size as start_state).
+            heuristic_type: None for breadth-first frontier search, or any
+                            heuristic accepted by IDAStarSearch for frontier
+                            A*. The path is only shortest if the heuristic is
+                            consistent (no move lowers h by more than 1).
+            budget: Limits on the search, checked before each breadth-first
+                    layer (which counts as the open list, so the limits can be
+                    passed by up to one layer) or A* expansion.
+            stats: Counters, phase timers and callbacks to report the search
+                   to (see search_stats.py), path-rebuilding searches
+                   included. Breadth-first layers are counted whole.
+
+        Raises:
+            ValueError: If states are invalid or heuristic_type is unknown.
+        """
+        validate_puzzle(start_state, goal_state)
+
+        self.geometry: BoardGeometry = geometry_for(len(goal_state))
+        self.start_state: GridState = start_state
+        self.goal_state: GridState = goal_state
+        self.heuristic_type: Optional[str] = heuristic_type
+        self.budget: Optional[SearchBudget] = budget
+        self.stats: Optional[SearchStats] = stats
+        if heuristic_type is not None:
+            # Fails early on unknown heuristics; sub-searches look it up again.
+            canonical_goal = goal_relabeling(tuple(goal_state)).canonical_goal
+            build_heuristic(heuristic_type, tuple(canonical_goal))
+
+        self.max_queue_size: int = 0
+        self.num_expanded_nodes: int = 0
+        self._start_time: float = 0.0
+        self._next_check: float = float("inf")
+        self._cutoff_reason: Optional[str] = None
+        self._f_bound: Optional[int] = None
+
+    def solve(self) -> SearchResult:
+        """
+        Finds a shortest path with frontier search and divide-and-conquer.
+
+        Returns:
+            A SearchResult that unpacks as the UniformCostSearch tuple, or as
+            the ManhattanMisplacedHandler tuple (without a gh_map, as no
+            explored states are kept) when a heuristic is used.
+            max_queue_size is the most states held at once and
+            num_expanded_nodes counts the expansions of every search, the
+            path-rebuilding ones included. If the budget runs out first, the
+            status is CUTOFF and f_bound is a lower bound on the depth.
+        """
+        if self.stats is not None:
+            return self.stats.measure(self._solve)
+        return self._solve()
+
+    def _solve(self) -> SearchResult:
+        """Runs the searches that solve() reports on."""
+        self._start_time = time.perf_counter()
+        self.max_queue_size = 0
+        self.num_expanded_nodes = 0
+        self._cutoff_reason = None
+        self._f_bound = None
+        if self.budget is not None:
+            self._next_check = self.budget.next_check(0, 1)
+        shape = UCS_SHAPE if self.heuristic_type is None else ASTAR_SHAPE
+
+        if not is_solvable(self.start_state, self.goal_state):
+            return SearchResult(
+                UNSOLVABLE,
+                elapsed_seconds=time.perf_counter() - self._start_time,
+                shape=shape,
+            )
+
+        geometry = self.geometry
+        moves = self._moves_between(
+            geometry.pack(self.start_state), geometry.pack(self.goal_state)
+        )
+        if moves is None:
+            return SearchResult(
+                CUTOFF,
+                max_queue_size=self.max_queue_size,
+                num_expanded_nodes=self.num_expanded_nodes,
+                elapsed_seconds=time.perf_counter() - self._start_time,
+                shape=shape,
+                cutoff_reason=self._cutoff_reason,
+                f_bound=self._f_bound,
+            )
+
+        solution_path = SolutionPath(self.start_state, moves)
+        if self.stats is not None:
+            self.stats.record_improvement(len(moves), self.num_expanded_nodes)
+        g_values = h_values = None
+        if self.heuristic_type is not None:
+            relabeling = goal_relabeling(tuple(self.goal_state))
+            evaluate = build_heuristic(
+                self.heuristic_type, tuple(relabeling.canonical_goal)
+            ).evaluate
+            g_values = list(range(len(solution_path)))
+            h_values = [
+                evaluate(geometry.pack(relabeling.to_canonical(state)))
+                for state in solution_path
+            ]
+        return SearchResult(
+            SOLVED,
+            path=solution_path,
+            max_queue_size=self.max_queue_size,
+            num_expanded_nodes=self.num_expanded_nodes,
+            elapsed_seconds=time.perf_counter() - self._start_time,
+            g_values=g_values,
+            h_values=h_values,
+            shape=shape,
+        )
+
+    def _moves_between(
+        self, start: PackedState, goal: PackedState, depth: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Returns the blank moves of a shortest path from start to goal.
+
+        Args:
+            depth: The length of that path, if a previous search found it.
+
+        Returns:
+            A move string (see solution_path.py), or None if the budget ran out.
+        """
+        if depth == 0:
+            return ""
+        if depth == 1:
+            geometry = self.geometry
+            for move, target_index, _, _ in geometry.move_table[
+                start & geometry.blank_mask
+            ]:
+                if geometry.move_blank(start, target_index) == goal:
+                    return MOVE_LETTERS[move]
+
+        if self.heuristic_type is None:
+            midpoint = self._meet_in_middle(start, goal)
+        else:
+            midpoint = self._frontier_astar(start, goal)
+        if midpoint is None:
+            return None
+        middle, to_middle, from_middle = midpoint
+        if depth is None:
+            # Found by the first search; any later cutoff is bounded by it.
+            self._f_bound = to_middle + from_middle
+        if to_middle + from_middle <= 1:
+            return self._moves_between(start, goal, to_middle + from_middle)
+
+        first_half = self._moves_between(start, middle, to_middle)
+        if first_half is None:
+            return None
+        second_half = self._moves_between(middle, goal, from_middle)
+        if second_half is None:
+            return None
+        return first_half + second_half
+
+    def _check_budget(self, open_size: int, f_bound: Optional[int]) -> bool:
+        """Returns True, recording why, if the budget has run out."""
+        if self.num_expanded_nodes < self._next_check:
+            return False
+        budget = self.budget
+        cutoff_reason = budget.check(
+            self.num_expanded_nodes, open_size, self._start_time
+        )
+        if cutoff_reason is not None:
+            self._cutoff_reason = cutoff_reason
+            if self._f_bound is None:
+                self._f_bound = f_bound
+            return True
+        self._next_check = budget.next_check(self.num_expanded_nodes, open_size)
+        return False
+
+    def _meet_in_middle(
+        self, start: PackedState, goal: PackedState
+    ) -> Optional[Midpoint]:
+        """
+        Runs a bidirectional breadth-first frontier search until the sides meet.
+
+        Each side keeps its last two layers (see next_layer()) and the smaller
+        side is expanded next, so they meet near the middle of the path. The
+        first layer to share a state with the other side's newest layer gives
+        a shortest path: any shorter one would have met a layer earlier.
+
+        Returns:
+            The state where the sides met and its distances to start and goal,
+            or None if the budget ran out.
+        """
+        if start == goal:
+            return start, 0, 0
+        geometry = self.geometry
+        move_table = geometry.move_table
+        stats = self.stats
+        # Per side: (previous layer, newest layer, depth of the newest layer)
+        sides: List[Tuple[Set[PackedState], Set[PackedState], int]] = [
+            (set(), {start}, 0),
+            (set(), {goal}, 0),
+        ]
+        while True:
+            side = 0 if len(sides[0][1]) <= len(sides[1][1]) else 1
+            previous, layer, depth = sides[side]
+            other_layer, other_depth = sides[1 - side][1], sides[1 - side][2]
+            open_size = sum(
+                len(held) for side_layers in sides for held in side_layers[:2]
+            )
+            self.max_queue_size = max(open_size, self.max_queue_size)
+            if self._check_budget(open_size, depth + other_depth + 1):
+                return None
+
+            self.num_expanded_nodes += len(layer)
+            layer_after = next_layer(layer, previous, geometry)
+            if stats is not None:
+                blank_mask = geometry.blank_mask
+                stats.record_layer(
+                    layer,
+                    sum(len(move_table[state & blank_mask]) for state in layer),
+                    len(layer_after),
+                )
+            sides[side] = (layer, layer_after, depth + 1)
+            meeting = layer_after & other_layer
+            if meeting:
+                middle = min(meeting)  # Any of them; the smallest is reproducible
+                if side == 0:
+                    return middle, depth + 1, other_depth
+                return middle, other_depth, depth + 1
+            if not layer_after:
+                raise ValueError("The goal is not reachable from the start.")
+
+    def _frontier_astar(
+        self, start: PackedState, goal: PackedState
+    ) -> Optional[Midpoint]:
+        """
+        Runs A* from start to goal, keeping only the open list.
+
+        An open state is stored as [g, h, used moves, midpoint, midpoint g],
+        with a midpoint of 0 (never a packed board) until the path has one.
+        Generating a state from its neighbor marks the move back to that
+        neighbor as used, and used moves are never generated. With a
+        consistent heuristic, every expanded state has already marked the
+        moves that lead back to it, so it can be dropped without ever being
+        generated again. The midpoint is the first state of the path whose g
+        is at least its h, which is about halfway for a good heuristic.
+
+        Returns:
+            The midpoint of a shortest path and its distances to start and
+            goal, or None if the budget ran out.
+        """
+        geometry = self.geometry
+        # Search in the canonical frame of this goal, so heuristic tables are
+        # shared by every sub-search whose goal is in the same class.
+        relabeling = goal_relabeling(tuple(geometry.unpack(goal)))
+        canonical_goal = geometry.pack(relabeling.canonical_goal)
+        heuristic = build_heuristic(
+            self.heuristic_type, tuple(relabeling.canonical_goal)
+        )
+        evaluate, update = heuristic.evaluate, heuristic.update
+        heappush, heappop = heapq.heappush, heapq.heappop
+        stats = self.stats
+        if stats is not None:
+            evaluate = stats.wrap_heuristic(evaluate)
+            update = stats.wrap_heuristic(update)
+            heappush, heappop = stats.wrap_push(heappush), stats.wrap_pop(heappop)
+        move_table = geometry.move_table
+        blank_mask, tile_mask = geometry.blank_mask, geometry.tile_mask
+
+        root = geometry.pack(relabeling.to_canonical(geometry.unpack(start)))
+        h_root = evaluate(root)
+        open_states: Dict[PackedState, List[int]] = {
+            root: [0, h_root, 0, root if h_root == 0 else 0, 0],
+        }
+        # (f, -g, state): ties go to the deeper state, closest to the goal.
+        heap = [(h_root, 0, root)]
+        while heap:
+            self.max_queue_size = max(len(open_states), self.max_queue_size)
+            f_current, negative_g, state = heappop(heap)
+            node = open_states.get(state)
+            if node is None or node[0] != -negative_g:
+                # Already expanded, or a cheaper path was pushed
+                if stats is not None:
+                    stats.stale_pops += 1
+                continue
+            if self._check_budget(len(open_states), f_current):
+                return None
+            g_n, h_n, used, middle, middle_g = open_states.pop(state)
+            self.num_expanded_nodes += 1
+
+            if state == canonical_goal:
+                middle = geometry.pack(
+                    relabeling.from_canonical(geometry.unpack(middle))
+                )
+                return middle, middle_g, g_n - middle_g
+
+            blank = state & blank_mask
+            child_g = g_n + 1
+            if stats is not None:
+                stats.record_expansion(
+                    state,
+                    g_n,
+                    h_n,
+                    sum(not used >> entry[0] & 1 for entry in move_table[blank]),
+                )
+            for move, target_index, blank_shift, target_shift in move_table[blank]:
+                if used >> move & 1:
+                    continue
+                tile = (state >> target_shift) & tile_mask
+                child = (
+                    state
+                    + (tile << blank_shift)
+                    - (tile << target_shift)
+                    - blank
+                    + target_index
+                )
+                back = 1 << (move ^ 1)
+                child_node = open_states.get(child)
+                if child_node is not None:
+                    child_node[2] |= back
+                    if child_g >= child_node[0]:
+                        continue
+                    child_h = child_node[1]
+                    child_node[0] = child_g
+                else:
+                    if update is not None:
+                        child_h = update(h_n, tile, target_index, blank)
+                    else:
+                        child_h = evaluate(child)
+                    child_node = [child_g, child_h, back, 0, 0]
+                    open_states[child] = child_node
+                if middle:
+                    child_node[3], child_node[4] = middle, middle_g
+                elif child_g >= child_h:
+                    child_node[3], child_node[4] = child, child_g
+                else:
+                    child_node[3], child_node[4] = 0, 0
+                heappush(heap, (child_g + child_h, -child_g, child))
+
+        raise ValueError("The goal is not reachable from the start.")
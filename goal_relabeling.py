@@ -0,0 +1,163 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from packed_state import GridState, geometry_for
+from solution_path import MOVE_LETTERS, SolutionPath
+
+GridStateTuple = Tuple[int, ...]
+CellMap = Tuple[int, ...]  # cell_map[i] is the cell that cell i moves to
+
+# Unit vectors (row, col) of the blank moves, in MOVE_UP..MOVE_RIGHT order.
+_MOVE_VECTORS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def _symmetries(width: int) -> List[Tuple[CellMap, Tuple[int, ...]]]:
+    """
+    Lists the 8 symmetries of a width x width board, identity first.
+
+    Returns:
+        (cell map, move map) pairs, where move_map[move] is the blank move that
+        move becomes on the transformed board.
+    """
+    last = width - 1
+    transforms = (
+        lambda r, c: (r, c),
+        lambda r, c: (c, last - r),
+        lambda r, c: (last - r, last - c),
+        lambda r, c: (last - c, r),
+        lambda r, c: (r, last - c),
+        lambda r, c: (last - r, c),
+        lambda r, c: (c, r),
+        lambda r, c: (last - c, last - r),
+    )
+    symmetries = []
+    for transform in transforms:
+        cell_map = tuple(
+            row * width + col
+            for row, col in (transform(*divmod(i, width)) for i in range(width * width))
+        )
+        origin = transform(0, 0)
+        move_map = []
+        for d_row, d_col in _MOVE_VECTORS:
+            target = transform(d_row, d_col)
+            vector = (target[0] - origin[0], target[1] - origin[1])
+            move_map.append(_MOVE_VECTORS.index(vector))
+        symmetries.append((cell_map, tuple(move_map)))
+    return symmetries
+
+
+def canonical_blank_cell(width: int, blank_index: int) -> int:
+    """
+    Returns the cell that stands for blank_index under the board's symmetries.
+
+    It is the highest-numbered cell the blank can be moved to by a symmetry, so
+    for goals with the blank in a corner it is the bottom-right corner.
+    """
+    return max(cell_map[blank_index] for cell_map, _ in _symmetries(width))
+
+
+class GoalRelabeling:
+    """
+    Maps puzzles for any goal onto one of a few canonical goals.
+
+    A symmetry of the board (rotation or reflection) first moves the goal's
+    blank to a canonical cell. The tiles are then renamed so that the goal reads
+    1, 2, 3, ... in cell order around that blank. Applying the same mapping to a
+    start board gives an equivalent puzzle whose solution, with its moves mapped
+    back, solves the original one. Renaming tiles cannot move the blank, so each
+    board size has one canonical goal per class of blank cells: corner, edge and
+    centre (or inner) cells. The corner goal is the usual [1, ..., n, 0].
+    """
+
+    def __init__(self, goal_state: GridStateTuple):
+        """
+        Args:
+            goal_state: The goal to normalize.
+
+        Raises:
+            ValueError: If goal_state is not a square board.
+        """
+        geometry = geometry_for(len(goal_state))
+        width = geometry.width
+        blank_index = goal_state.index(0)
+        target_cell = canonical_blank_cell(width, blank_index)
+
+        # The first symmetry that moves the blank there; identity when possible.
+        for cell_map, move_map in _symmetries(width):
+            if cell_map[blank_index] == target_cell:
+                break
+        self.cell_map: CellMap = cell_map
+        self.move_map: Tuple[int, ...] = move_map
+        self._inverse_move_map: Tuple[int, ...] = tuple(
+            move_map.index(move) for move in range(len(move_map))
+        )
+
+        canonical_goal = [0] * geometry.num_cells
+        next_tile = 1
+        for cell in range(geometry.num_cells):
+            if cell != target_cell:
+                canonical_goal[cell] = next_tile
+                next_tile += 1
+        self.canonical_goal: GridState = canonical_goal
+
+        moved_goal = self._move_cells(list(goal_state))
+        # labels[original tile] -> canonical tile, and back.
+        self._labels: Dict[int, int] = dict(zip(moved_goal, canonical_goal))
+        self._original_labels: Dict[int, int] = dict(zip(canonical_goal, moved_goal))
+        self.is_identity: bool = self.canonical_goal == list(goal_state)
+
+    def _move_cells(self, state: GridState) -> GridState:
+        moved = [0] * len(state)
+        for index, cell in enumerate(self.cell_map):
+            moved[cell] = state[index]
+        return moved
+
+    def to_canonical(self, state: GridState) -> GridState:
+        """Maps a board onto the canonical goal's frame."""
+        if self.is_identity:
+            return state
+        labels = self._labels
+        return [labels[tile] for tile in self._move_cells(state)]
+
+    def from_canonical(self, state: GridState) -> GridState:
+        """Maps a board from the canonical goal's frame back to the original one."""
+        if self.is_identity:
+            return state
+        original_labels = self._original_labels
+        cell_map = self.cell_map
+        return [original_labels[state[cell_map[index]]] for index in range(len(state))]
+
+    def moves_from_canonical(self, moves: str) -> str:
+        """Maps a move string found in the canonical frame back to the original one."""
+        if self.is_identity:
+            return moves
+        inverse_move_map = self._inverse_move_map
+        return "".join(
+            MOVE_LETTERS[inverse_move_map[MOVE_LETTERS.index(letter)]]
+            for letter in moves
+        )
+
+    def path_from_canonical(
+        self, start_state: GridState, path: Optional[SolutionPath]
+    ) -> Optional[SolutionPath]:
+        """
+        Rebuilds a solution found in the canonical frame for the original start.
+
+        Args:
+            start_state: The original, un-normalized start board.
+            path: A path from to_canonical(start_state) to the canonical goal.
+
+        Returns:
+            The same solution as a path from start_state, or None if path is None.
+        """
+        if path is None:
+            return None
+        if self.is_identity:
+            return path
+        return SolutionPath(start_state, self.moves_from_canonical(path.moves))
+
+
+@lru_cache(maxsize=None)
+def goal_relabeling(goal_state: GridStateTuple) -> GoalRelabeling:
+    """Returns the shared GoalRelabeling of a goal."""
+    return GoalRelabeling(goal_state)
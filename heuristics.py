@@ -0,0 +1,406 @@
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from packed_state import PackedState, geometry_for
+from pattern_database import Pattern, load_pattern_database
+from permutation_rank import rank_positions
+
+GridStateTuple = Tuple[int, ...]
+TileTable = Tuple[Tuple[int, ...], ...]  # Indexed [tile][cell]
+
+
+class PackedHeuristic(NamedTuple):
+    """
+    A heuristic evaluated on packed states (see packed_state.py).
+
+    evaluate computes h from scratch. update, when present, derives a child's h
+    from its parent's as update(parent h, moved tile, from index, to index);
+    heuristics that cannot be updated that way leave it as None.
+    """
+
+    evaluate: Callable[[PackedState], int]
+    update: Optional[Callable[[int, int, int, int], int]]
+
+
+def _goal_positions(goal_state_tuple: GridStateTuple) -> Dict[int, int]:
+    return {tile: index for index, tile in enumerate(goal_state_tuple)}
+
+
+@lru_cache(maxsize=None)
+def misplaced_tile_costs(goal_state_tuple: GridStateTuple) -> TileTable:
+    """Cost of each tile on each cell: 1 if it is not the tile the goal puts there."""
+    num_cells = len(goal_state_tuple)
+    tile_costs: List[Tuple[int, ...]] = [(0,) * num_cells]  # Blank is free
+    for tile in range(1, num_cells):
+        tile_costs.append(
+            tuple(int(goal_state_tuple[index] != tile) for index in range(num_cells))
+        )
+    return tuple(tile_costs)
+
+
+@lru_cache(maxsize=None)
+def manhattan_tile_costs(goal_state_tuple: GridStateTuple) -> TileTable:
+    """Cost of each tile on each cell: its grid distance to the tile's goal cell."""
+    width = geometry_for(len(goal_state_tuple)).width
+    num_cells = len(goal_state_tuple)
+    goal_positions = _goal_positions(goal_state_tuple)
+    tile_costs: List[Tuple[int, ...]] = [(0,) * num_cells]  # Blank is free
+    for tile in range(1, num_cells):
+        goal_row, goal_col = divmod(goal_positions[tile], width)
+        costs: List[int] = []
+        for index in range(num_cells):
+            row, col = divmod(index, width)
+            costs.append(abs(row - goal_row) + abs(col - goal_col))
+        tile_costs.append(tuple(costs))
+    return tuple(tile_costs)
+
+
+def _tile_sum_heuristic(
+    goal_state_tuple: GridStateTuple, tile_costs: TileTable
+) -> PackedHeuristic:
+    """Builds a heuristic that sums a per-tile cost over the board."""
+    geometry = geometry_for(len(goal_state_tuple))
+    cell_shifts = geometry.cell_shifts
+    tile_mask = geometry.tile_mask
+
+    def evaluate(state: PackedState) -> int:
+        h_cost = 0
+        for index, shift in enumerate(cell_shifts):
+            h_cost += tile_costs[(state >> shift) & tile_mask][index]
+        return h_cost
+
+    def update(parent_h: int, tile: int, from_index: int, to_index: int) -> int:
+        # A move slides a single tile, so only that tile's term of the sum changes.
+        costs = tile_costs[tile]
+        return parent_h - costs[from_index] + costs[to_index]
+
+    return PackedHeuristic(evaluate, update)
+
+
+@lru_cache(maxsize=None)
+def build_misplaced(goal_state_tuple: GridStateTuple) -> PackedHeuristic:
+    return _tile_sum_heuristic(
+        goal_state_tuple, misplaced_tile_costs(goal_state_tuple)
+    )
+
+
+@lru_cache(maxsize=None)
+def build_manhattan(goal_state_tuple: GridStateTuple) -> PackedHeuristic:
+    return _tile_sum_heuristic(
+        goal_state_tuple, manhattan_tile_costs(goal_state_tuple)
+    )
+
+
+# --- Linear conflict ---------------------------------------------------------
+#
+# Two tiles that sit in their goal row, in the wrong order, cannot pass each
+# other without one leaving the row, which costs two moves beyond Manhattan
+# distance. The same holds for columns. Each line is summarised as a code with
+# one base-(W + 1) digit per cell: the goal offset along the line of the tile
+# there, or W when the tile does not belong to this line. A table maps each
+# code to 2 * (tiles in the line - longest increasing run of goal offsets).
+
+
+def _line_conflict_cost(code: int, width: int) -> int:
+    offsets: List[int] = []
+    for _ in range(width):
+        code, digit = divmod(code, width + 1)
+        if digit != width:
+            offsets.append(digit)
+    # Longest increasing subsequence; lines hold at most a handful of tiles.
+    longest: List[int] = []
+    for i, offset in enumerate(offsets):
+        longest.append(
+            1 + max((longest[j] for j in range(i) if offsets[j] < offset), default=0)
+        )
+    return 2 * (len(offsets) - max(longest, default=0))
+
+
+@lru_cache(maxsize=None)
+def _line_conflict_costs(width: int) -> Tuple[int, ...]:
+    return tuple(
+        _line_conflict_cost(code, width) for code in range((width + 1) ** width)
+    )
+
+
+@lru_cache(maxsize=None)
+def build_linear_conflict(goal_state_tuple: GridStateTuple) -> PackedHeuristic:
+    geometry = geometry_for(len(goal_state_tuple))
+    width, num_cells = geometry.width, geometry.num_cells
+    tile_mask = geometry.tile_mask
+    line_base = width + 1
+    goal_positions = _goal_positions(goal_state_tuple)
+    tile_costs = manhattan_tile_costs(goal_state_tuple)
+
+    # Digit each tile contributes to the code of the row / column of a cell.
+    row_digits: List[Tuple[int, ...]] = []
+    col_digits: List[Tuple[int, ...]] = []
+    for tile in range(num_cells):
+        goal_row, goal_col = divmod(goal_positions[tile], width)
+        row_contributions: List[int] = []
+        col_contributions: List[int] = []
+        for index in range(num_cells):
+            row, col = divmod(index, width)
+            row_digit = goal_col if tile and goal_row == row else width
+            col_digit = goal_row if tile and goal_col == col else width
+            row_contributions.append(row_digit * line_base**col)
+            col_contributions.append(col_digit * line_base**row)
+        row_digits.append(tuple(row_contributions))
+        col_digits.append(tuple(col_contributions))
+
+    cells = tuple(
+        (index, shift, *divmod(index, width))
+        for index, shift in enumerate(geometry.cell_shifts)
+    )
+    conflict_costs = _line_conflict_costs(width)
+
+    def evaluate(state: PackedState) -> int:
+        h_cost = 0
+        row_codes = [0] * width
+        col_codes = [0] * width
+        for index, shift, row, col in cells:
+            tile = (state >> shift) & tile_mask
+            h_cost += tile_costs[tile][index]
+            row_codes[row] += row_digits[tile][index]
+            col_codes[col] += col_digits[tile][index]
+        for code in row_codes:
+            h_cost += conflict_costs[code]
+        for code in col_codes:
+            h_cost += conflict_costs[code]
+        return h_cost
+
+    return PackedHeuristic(evaluate, None)
+
+
+# --- Walking distance --------------------------------------------------------
+#
+# Project the board onto its rows: count, for each row, how many of its tiles
+# belong to each goal row, and note the row of the blank. A move swaps the blank
+# with one tile of an adjacent row, so a BFS over these count matrices gives the
+# exact number of vertical moves the projection needs. Doing the same for
+# columns and adding both gives an admissible bound that dominates Manhattan
+# distance. Matrices are encoded as base-(W + 1) ints so a board's key is a sum
+# of per-(tile, cell) contributions.
+
+
+def _blank_line_unit(width: int) -> int:
+    """Place value of the blank's line in an encoded count matrix."""
+    return (width + 1) ** (width * width)
+
+
+@lru_cache(maxsize=None)
+def _walking_distance_table(width: int, goal_blank_line: int) -> Dict[int, int]:
+    """BFS distances of every count matrix from the goal's, for one axis."""
+    count_base = width + 1
+    blank_line_unit = _blank_line_unit(width)
+    goal_counts = [0] * (width * width)
+    for line in range(width):
+        goal_counts[line * width + line] = width - (line == goal_blank_line)
+
+    def encode(counts: List[int], blank_line: int) -> int:
+        key = blank_line * blank_line_unit
+        for position, count in enumerate(counts):
+            key += count * count_base**position
+        return key
+
+    distances: Dict[int, int] = {encode(goal_counts, goal_blank_line): 0}
+    queue: Deque[Tuple[List[int], int, int]] = deque(
+        [(goal_counts, goal_blank_line, 0)]
+    )
+    while queue:
+        counts, blank_line, distance = queue.popleft()
+        for next_line in (blank_line - 1, blank_line + 1):
+            if not 0 <= next_line < width:
+                continue
+            for goal_line in range(width):
+                if counts[next_line * width + goal_line]:
+                    next_counts = list(counts)
+                    next_counts[next_line * width + goal_line] -= 1
+                    next_counts[blank_line * width + goal_line] += 1
+                    key = encode(next_counts, next_line)
+                    if key not in distances:
+                        distances[key] = distance + 1
+                        queue.append((next_counts, next_line, distance + 1))
+    return distances
+
+
+@lru_cache(maxsize=None)
+def build_walking_distance(goal_state_tuple: GridStateTuple) -> PackedHeuristic:
+    geometry = geometry_for(len(goal_state_tuple))
+    width, num_cells = geometry.width, geometry.num_cells
+    tile_mask = geometry.tile_mask
+    count_base = width + 1
+    blank_line_unit = _blank_line_unit(width)
+    goal_positions = _goal_positions(goal_state_tuple)
+    goal_blank_row, goal_blank_col = divmod(goal_positions[0], width)
+    vertical_distances = _walking_distance_table(width, goal_blank_row)
+    horizontal_distances = _walking_distance_table(width, goal_blank_col)
+
+    vertical_keys: List[Tuple[int, ...]] = []
+    horizontal_keys: List[Tuple[int, ...]] = []
+    for tile in range(num_cells):
+        goal_row, goal_col = divmod(goal_positions[tile], width)
+        vertical_contributions: List[int] = []
+        horizontal_contributions: List[int] = []
+        for index in range(num_cells):
+            row, col = divmod(index, width)
+            if tile:
+                vertical_contributions.append(count_base ** (row * width + goal_row))
+                horizontal_contributions.append(
+                    count_base ** (col * width + goal_col)
+                )
+            else:
+                vertical_contributions.append(row * blank_line_unit)
+                horizontal_contributions.append(col * blank_line_unit)
+        vertical_keys.append(tuple(vertical_contributions))
+        horizontal_keys.append(tuple(horizontal_contributions))
+
+    def evaluate(state: PackedState) -> int:
+        vertical_key = 0
+        horizontal_key = 0
+        for index, shift in enumerate(geometry.cell_shifts):
+            tile = (state >> shift) & tile_mask
+            vertical_key += vertical_keys[tile][index]
+            horizontal_key += horizontal_keys[tile][index]
+        return vertical_distances[vertical_key] + horizontal_distances[horizontal_key]
+
+    return PackedHeuristic(evaluate, None)
+
+
+# --- Additive pattern databases ----------------------------------------------
+#
+# The tiles are split into disjoint patterns. Each pattern database counts only
+# moves of its own tiles, so their values add up to an admissible estimate. The
+# databases are built or read from disk the first time a solver asks for them.
+
+PATTERN_PARTITIONS: Dict[str, Tuple[Pattern, ...]] = {
+    # 3x3 boards
+    "pdb_4_4": ((1, 2, 3, 4), (5, 6, 7, 8)),
+    "pdb_5_3": ((1, 2, 3, 4, 5), (6, 7, 8)),
+    # 4x4 boards
+    "pdb_4_4_4_3": ((1, 2, 3, 4), (5, 6, 7, 8), (9, 10, 11, 12), (13, 14, 15)),
+}
+
+
+@lru_cache(maxsize=None)
+def build_pattern_databases(
+    goal_state_tuple: GridStateTuple, partition: Tuple[Pattern, ...]
+) -> PackedHeuristic:
+    """Builds the additive heuristic for a partition of the tiles into patterns."""
+    geometry = geometry_for(len(goal_state_tuple))
+    num_cells = geometry.num_cells
+    tile_mask = geometry.tile_mask
+    partition_tiles = sorted(tile for pattern in partition for tile in pattern)
+    if partition_tiles != list(range(1, num_cells)):
+        raise ValueError(
+            f"The pattern partition {partition} does not cover the tiles of a "
+            f"{geometry.width}x{geometry.width} board exactly once."
+        )
+
+    tables = tuple(
+        load_pattern_database(goal_state_tuple, pattern) for pattern in partition
+    )
+    # (pattern, slot within the pattern) of every tile; the blank has none.
+    tile_slots: Dict[int, Tuple[int, int]] = {
+        tile: (pattern_index, slot)
+        for pattern_index, pattern in enumerate(partition)
+        for slot, tile in enumerate(pattern)
+    }
+    cell_slots = tuple(tile_slots.get(tile) for tile in range(num_cells))
+    pattern_sizes = tuple(len(pattern) for pattern in partition)
+
+    def evaluate(state: PackedState) -> int:
+        positions = [[0] * size for size in pattern_sizes]
+        for index, shift in enumerate(geometry.cell_shifts):
+            slot = cell_slots[(state >> shift) & tile_mask]
+            if slot is not None:
+                positions[slot[0]][slot[1]] = index
+        h_cost = 0
+        for table, pattern_positions in zip(tables, positions):
+            h_cost += table[rank_positions(pattern_positions, num_cells)]
+        return h_cost
+
+    return PackedHeuristic(evaluate, None)
+
+
+def build_pdb_4_4(goal_state_tuple: GridStateTuple) -> PackedHeuristic:
+    return build_pattern_databases(goal_state_tuple, PATTERN_PARTITIONS["pdb_4_4"])
+
+
+def build_pdb_5_3(goal_state_tuple: GridStateTuple) -> PackedHeuristic:
+    return build_pattern_databases(goal_state_tuple, PATTERN_PARTITIONS["pdb_5_3"])
+
+
+def build_pdb_4_4_4_3(goal_state_tuple: GridStateTuple) -> PackedHeuristic:
+    return build_pattern_databases(
+        goal_state_tuple, PATTERN_PARTITIONS["pdb_4_4_4_3"]
+    )
+
+
+# --- Registry ----------------------------------------------------------------
+
+HEURISTIC_BUILDERS: Dict[str, Callable[[GridStateTuple], PackedHeuristic]] = {
+    "misplaced": build_misplaced,
+    "manhattan": build_manhattan,
+    "linear_conflict": build_linear_conflict,
+    "walking_distance": build_walking_distance,
+    "pdb_4_4": build_pdb_4_4,
+    "pdb_5_3": build_pdb_5_3,
+    "pdb_4_4_4_3": build_pdb_4_4_4_3,
+}
+
+# 'max:<name>,<name>,...' takes the maximum of several registered heuristics.
+MAX_PREFIX = "max:"
+
+
+def _build_max(
+    heuristic_types: Tuple[str, ...], goal_state_tuple: GridStateTuple
+) -> PackedHeuristic:
+    evaluators = tuple(
+        HEURISTIC_BUILDERS[heuristic_type](goal_state_tuple).evaluate
+        for heuristic_type in heuristic_types
+    )
+
+    def evaluate(state: PackedState) -> int:
+        return max(evaluator(state) for evaluator in evaluators)
+
+    return PackedHeuristic(evaluate, None)
+
+
+def build_heuristic(
+    heuristic_type: str, goal_state_tuple: GridStateTuple
+) -> PackedHeuristic:
+    """
+    Looks up a registered heuristic, or a max-combination of them, for a goal.
+
+    Tables behind each heuristic are built once per goal and then reused. The
+    board size is taken from the length of the goal.
+
+    Args:
+        heuristic_type: A key of HEURISTIC_BUILDERS, or 'max:' followed by a
+                        comma-separated list of keys.
+        goal_state_tuple: The goal configuration.
+
+    Returns:
+        The heuristic as a PackedHeuristic.
+
+    Raises:
+        ValueError: If heuristic_type names an unknown heuristic, or one that
+                    does not apply to the board size.
+    """
+    if heuristic_type.startswith(MAX_PREFIX):
+        heuristic_types = tuple(heuristic_type[len(MAX_PREFIX) :].split(","))
+    else:
+        heuristic_types = (heuristic_type,)
+
+    for name in heuristic_types:
+        if name not in HEURISTIC_BUILDERS:
+            raise ValueError(
+                f"Invalid heuristic_type. Choose from: {list(HEURISTIC_BUILDERS)}, "
+                f"or '{MAX_PREFIX}' followed by a comma-separated list of them."
+            )
+
+    if len(heuristic_types) == 1:
+        return HEURISTIC_BUILDERS[heuristic_types[0]](goal_state_tuple)
+    return _build_max(heuristic_types, goal_state_tuple)
@@ -0,0 +1,214 @@
+import time
+from typing import Callable, List, Optional, Tuple
+
+from goal_relabeling import GoalRelabeling, goal_relabeling
+from heuristics import PackedHeuristic, build_heuristic
+from packed_state import NO_MOVE, BoardGeometry, GridState, PackedState, geometry_for
+from search_budget import SearchBudget
+from search_result import ASTAR_SHAPE, CUTOFF, SOLVED, UNSOLVABLE, SearchResult
+from search_stats import SearchStats
+from solution_path import SolutionPath, encode_moves
+from solvability import is_solvable, validate_puzzle
+
+GridStateTuple = Tuple[int, ...]
+
+
+class IDAStarSearch:
+    """
+    Solves sliding-tile puzzles of any square size with Iterative Deepening A*.
+
+    Each iteration is a depth-first search bounded by f = g + h, and the next
+    bound is the smallest f that exceeded the current one. The board is a single
+    list updated and restored in place, with no transposition table, so memory
+    grows only with the depth of the solution. Heuristics come from the same
+    registry as ManhattanMisplacedHandler (see heuristics.py).
+    """
+
+    def __init__(
+        self,
+        start_state: GridState,
+        goal_state: GridState,
+        heuristic_type: str = "manhattan",
+        budget: Optional[SearchBudget] = None,
+        stats: Optional[SearchStats] = None,
+    ):
+        """
+        Initializes the solver with start/goal states and selects the heuristic.
+
+        Args:
+            start_state: The initial puzzle configuration (list of width * width ints).
+            goal_state: The target configuration of the puzzle (same size as start_state).
+            heuristic_type: Any heuristic accepted by ManhattanMisplacedHandler
+                            that applies to the board size. Defaults to 'manhattan'.
+            budget: Limits on the search; the stack depth counts as its open
+                    list. When one runs out, solve() returns a CUTOFF result.
+            stats: Counters, phase timers and callbacks to report the search
+                   to (see search_stats.py).
+
+        Raises:
+            ValueError: If states are invalid or heuristic_type is unknown.
+        """
+        validate_puzzle(start_state, goal_state)
+
+        self.geometry: BoardGeometry = geometry_for(len(goal_state))
+        self.start_state: GridState = start_state
+        self.goal_state: GridState = goal_state
+        self.goal_state_tuple: GridStateTuple = tuple(goal_state)
+        self.heuristic_type: str = heuristic_type
+        self.budget: Optional[SearchBudget] = budget
+        self.stats: Optional[SearchStats] = stats
+        # Search towards a canonical goal so heuristic tables are shared by
+        # every goal in the same class (see goal_relabeling.py).
+        self.relabeling: GoalRelabeling = goal_relabeling(self.goal_state_tuple)
+        self.canonical_start_state: GridState = self.relabeling.to_canonical(
+            start_state
+        )
+        self.canonical_goal_state: GridState = self.relabeling.canonical_goal
+        self._heuristic: PackedHeuristic = build_heuristic(
+            heuristic_type, tuple(self.canonical_goal_state)
+        )
+
+    def solve(self) -> SearchResult:
+        """
+        Performs IDA* search using the heuristic selected during initialization.
+
+        Returns the same SearchResult as ManhattanMisplacedHandler.solve().
+        max_queue_size is the deepest the search stack grew, and there is never
+        an explored-state map since IDA* keeps no record of visited states.
+        If the budget runs out first, the status is CUTOFF and f_bound is the
+        bound of the unfinished iteration: no path with a lower f exists.
+        """
+        if self.stats is not None:
+            return self.stats.measure(self._solve)
+        return self._solve()
+
+    def _solve(self) -> SearchResult:
+        """Runs the search that solve() reports on."""
+        geometry = self.geometry
+        child_move_table = geometry.child_move_table
+        evaluate = self._heuristic.evaluate
+        update: Optional[Callable[[int, int, int, int], int]] = self._heuristic.update
+        goal_state = self.canonical_goal_state
+        stats = self.stats
+        if stats is not None:
+            evaluate = stats.wrap_heuristic(evaluate)
+            update = stats.wrap_heuristic(update)
+        start_time = time.perf_counter()
+
+        if not is_solvable(self.start_state, self.goal_state):
+            return SearchResult(
+                UNSOLVABLE,
+                elapsed_seconds=time.perf_counter() - start_time,
+                shape=ASTAR_SHAPE,
+            )
+
+        board = list(self.canonical_start_state)  # Moved and restored in place
+        moves: List[int] = []  # Blank moves from the start to the current node
+        num_expanded_nodes = 0
+        max_stack_size = 0
+        next_bound = 0
+        budget = self.budget
+        next_check = budget.next_check(0, 1) if budget is not None else float("inf")
+        cutoff_reason: Optional[str] = None
+
+        def search(
+            g_n: int, h_n: int, blank: int, packed: PackedState, previous_move: int
+        ) -> bool:
+            """Returns True once the goal is found or the budget runs out."""
+            nonlocal num_expanded_nodes, max_stack_size, next_bound
+            nonlocal next_check, cutoff_reason
+
+            f_n = g_n + h_n
+            if f_n > bound:
+                if f_n < next_bound:
+                    next_bound = f_n
+                return False
+            if h_n == 0 and board == goal_state:
+                return True
+            if num_expanded_nodes >= next_check:
+                cutoff_reason = budget.check(num_expanded_nodes, g_n + 1, start_time)
+                if cutoff_reason is not None:
+                    return True
+                next_check = budget.next_check(num_expanded_nodes, g_n + 1)
+
+            num_expanded_nodes += 1
+            if g_n + 1 > max_stack_size:
+                max_stack_size = g_n + 1
+            if stats is not None:
+                num_children = len(child_move_table[blank][previous_move])
+                if not packed and stats.on_expand is not None:
+                    packed = geometry.pack(board)  # Unset with incremental h
+                stats.record_expansion(packed, g_n, h_n, num_children)
+                stats.pushed += num_children  # No duplicate detection
+
+            # Without the move that undoes the previous one
+            for move, target_index, blank_shift, target_shift in child_move_table[
+                blank
+            ][previous_move]:
+                tile = board[target_index]
+                board[blank] = tile
+                board[target_index] = 0
+                if update is not None:
+                    child_packed = 0  # Not needed by incremental heuristics
+                    child_h = update(h_n, tile, target_index, blank)
+                else:
+                    child_packed = (
+                        packed
+                        + (tile << blank_shift)
+                        - (tile << target_shift)
+                        - blank
+                        + target_index
+                    )
+                    child_h = evaluate(child_packed)
+                moves.append(move)
+
+                if search(g_n + 1, child_h, target_index, child_packed, move):
+                    return True
+
+                moves.pop()
+                board[target_index] = tile
+                board[blank] = 0
+            return False
+
+        start_packed = geometry.pack(board)
+        h_n_start = evaluate(start_packed)
+        bound = h_n_start
+        while True:
+            next_bound = float("inf")
+            if search(0, h_n_start, board.index(0), start_packed, NO_MOVE):
+                break
+            bound = next_bound
+
+        elapsed_seconds = time.perf_counter() - start_time
+        if cutoff_reason is not None:
+            return SearchResult(
+                CUTOFF,
+                max_queue_size=max_stack_size,
+                num_expanded_nodes=num_expanded_nodes,
+                elapsed_seconds=elapsed_seconds,
+                shape=ASTAR_SHAPE,
+                cutoff_reason=cutoff_reason,
+                f_bound=bound,
+            )
+
+        if stats is not None:
+            stats.record_improvement(len(moves), num_expanded_nodes)
+
+        # --- Replay the moves for the g(n) / h(n) values along the path ---
+        solution_path = SolutionPath(self.canonical_start_state, encode_moves(moves))
+        g_n_values_path = list(range(len(solution_path)))
+        h_n_values_path = [evaluate(state) for state in solution_path.packed_states()]
+        solution_path = self.relabeling.path_from_canonical(
+            self.start_state, solution_path
+        )
+
+        return SearchResult(
+            SOLVED,
+            path=solution_path,
+            max_queue_size=max_stack_size,
+            num_expanded_nodes=num_expanded_nodes,
+            elapsed_seconds=elapsed_seconds,
+            g_values=g_n_values_path,
+            h_values=h_n_values_path,
+            shape=ASTAR_SHAPE,
+        )
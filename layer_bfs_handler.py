@@ -0,0 +1,299 @@
+import time
+from typing import Iterator, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only this engine needs it.
+    np = None
+
+from goal_relabeling import GoalRelabeling, goal_relabeling
+from packed_state import (
+    BLANK_MASK,
+    CELL_SHIFTS,
+    MOVE_DELTAS,
+    MOVE_TABLE,
+    NO_MOVE,
+    NUM_CELLS,
+    TILE_MASK,
+    GridState,
+    PackedState,
+    pack,
+)
+from permutation_rank import HALF_TILE_ORDERS, NUM_TILES, STATE_COUNT, trace_to_root
+from search_budget import SearchBudget
+from search_result import CUTOFF, SOLVED, UNSOLVABLE, SearchResult
+from search_stats import SearchStats
+from solution_path import SolutionPath, encode_moves
+from solvability import is_solvable, validate_puzzle
+
+NUMPY_AVAILABLE = np is not None
+
+if NUMPY_AVAILABLE:
+    # Lookup tables for whole arrays of packed 3x3 boards (40 bits fit in int64).
+    _CELL_SHIFTS = np.array(CELL_SHIFTS, dtype=np.int64)
+    # _MOVE_IS_LEGAL[move, blank index] tells whether the blank can move that way.
+    _MOVE_IS_LEGAL = np.array(
+        [
+            [
+                any(entry[0] == move for entry in MOVE_TABLE[blank])
+                for blank in range(NUM_CELLS)
+            ]
+            for move in range(len(MOVE_DELTAS))
+        ]
+    )
+
+
+def _require_numpy() -> None:
+    if not NUMPY_AVAILABLE:
+        raise ImportError("The layer BFS engine requires NumPy (pip install numpy).")
+
+
+def rank_array(states: "np.ndarray") -> "np.ndarray":
+    """
+    Ranks a whole array of packed boards at once.
+
+    Computes exactly what permutation_rank.rank() computes for each element.
+
+    Args:
+        states: An int64 array of packed 3x3 boards.
+
+    Returns:
+        An int64 array of dense indices.
+    """
+    cells = (states[:, None] >> _CELL_SHIFTS) & TILE_MASK
+    # The tiles of every board in row-major order, without the blank.
+    tiles = cells[cells != 0].reshape(-1, NUM_TILES)
+
+    # Lehmer digits in Horner form, as in rank(): the last digit is always 0
+    # and the one before it is dropped by the halving.
+    lehmer_rank = tiles[:, 0] - 1
+    for index in range(1, NUM_TILES - 1):
+        tile = tiles[:, index]
+        smaller_before = (tiles[:, :index] < tile[:, None]).sum(axis=1)
+        lehmer_rank = lehmer_rank * (NUM_TILES - index) + tile - 1 - smaller_before
+    return (states & BLANK_MASK) * HALF_TILE_ORDERS + (lehmer_rank >> 1)
+
+
+def expand_layer(states: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Generates every neighbor of every board in an array.
+
+    Args:
+        states: An int64 array of packed 3x3 boards.
+
+    Returns:
+        (neighbors, moves): the packed neighbors and the blank move that
+        produced each one, grouped by move.
+    """
+    blanks = states & BLANK_MASK
+    neighbor_arrays = []
+    move_arrays = []
+    for move, delta_index in enumerate(MOVE_DELTAS):
+        legal = _MOVE_IS_LEGAL[move, blanks]
+        sources = states[legal]
+        source_blanks = blanks[legal]
+        targets = source_blanks + delta_index
+        target_shifts = _CELL_SHIFTS[targets]
+        tiles = (sources >> target_shifts) & TILE_MASK
+        neighbor_arrays.append(
+            sources
+            + (tiles << _CELL_SHIFTS[source_blanks])
+            - (tiles << target_shifts)
+            - source_blanks
+            + targets
+        )
+        move_arrays.append(np.full(len(sources), move, dtype=np.uint8))
+    return np.concatenate(neighbor_arrays), np.concatenate(move_arrays)
+
+
+def bfs_layers(
+    root: PackedState,
+    parent_moves: Optional["np.ndarray"] = None,
+    stats: Optional[SearchStats] = None,
+) -> Iterator[Tuple["np.ndarray", "np.ndarray"]]:
+    """
+    Runs a layer-synchronous BFS over the states reachable from root.
+
+    Each layer is held as one array and expanded with whole-array operations;
+    new states are found against a rank-indexed visited bitmap. A layer is only
+    expanded when the next one is requested, so callers can stop early.
+
+    Args:
+        root: The packed board to search from.
+        parent_moves: An optional rank-indexed uint8 array. The blank move that
+                      first reached each state is written into it, and NO_MOVE
+                      for the root.
+        stats: Counters to report each expanded layer to: its states, the
+               neighbors generated, and those left after dropping visited
+               states and duplicates within the layer.
+
+    Yields:
+        (states, ranks) int64 arrays of each layer, starting with the root's.
+    """
+    _require_numpy()
+    visited = np.zeros(STATE_COUNT, dtype=bool)
+    states = np.array([root], dtype=np.int64)
+    ranks = rank_array(states)
+    visited[ranks] = True
+    if parent_moves is not None:
+        parent_moves[ranks] = NO_MOVE
+
+    while len(states):
+        yield states, ranks
+        neighbors, moves = expand_layer(states)
+        neighbor_ranks = rank_array(neighbors)
+
+        unvisited = ~visited[neighbor_ranks]
+        neighbor_ranks = neighbor_ranks[unvisited]
+        # Several states of a layer can reach the same neighbor; keep the first.
+        ranks, first = np.unique(neighbor_ranks, return_index=True)
+        first = np.flatnonzero(unvisited)[first]
+        visited[ranks] = True
+        if parent_moves is not None:
+            parent_moves[ranks] = moves[first]
+        if stats is not None:
+            stats.record_layer(states, len(neighbors), len(ranks))
+        states = neighbors[first]
+
+
+def layer_distances(goal_state: GridState) -> bytearray:
+    """
+    Builds the table of exact distances to a goal with the layer BFS.
+
+    Args:
+        goal_state: The goal configuration (list of 9 ints).
+
+    Returns:
+        One distance byte per permutation rank, 0xFF for states of the other
+        parity class, as database_solver_handler.build_distance_database()
+        returns.
+    """
+    _require_numpy()
+    distances = np.full(STATE_COUNT, 0xFF, dtype=np.uint8)
+    for depth, (_, ranks) in enumerate(bfs_layers(pack(goal_state))):
+        distances[ranks] = depth
+    return bytearray(distances.tobytes())
+
+
+class LayerBFSSearch:
+    """
+    Solves the 8-puzzle problem with a NumPy breadth-first search.
+
+    It finds the same depth as UniformCostSearch, but expands a whole BFS layer
+    per step with array operations instead of one state per Python iteration.
+    Requires NumPy.
+    """
+
+    def __init__(
+        self,
+        start_state: GridState,
+        goal_state: GridState,
+        budget: Optional[SearchBudget] = None,
+        stats: Optional[SearchStats] = None,
+    ):
+        """
+        Initializes the search problem.
+
+        Args:
+            start_state: The initial configuration of the puzzle (list of 9 ints, 0 represents blank).
+            goal_state: The target configuration of the puzzle (list of 9 ints).
+            budget: Limits on the search, checked before each layer is
+                    expanded. A whole layer counts as the open list, so the
+                    limits can be passed by up to one layer.
+            stats: Counters, phase timers and callbacks to report the search
+                   to (see search_stats.py). Layers are counted whole, and
+                   all of the time goes to the expand phase.
+
+        Raises:
+            ValueError: If start_state or goal_state are not boards of 9 cells
+                holding 0 to 8 once each.
+            ImportError: If NumPy is not installed.
+        """
+        _require_numpy()
+        validate_puzzle(start_state, goal_state, 9)
+
+        self.start_state: GridState = start_state
+        self.goal_state: GridState = goal_state
+        self.relabeling: GoalRelabeling = goal_relabeling(tuple(goal_state))
+        self.canonical_start_state: GridState = self.relabeling.to_canonical(
+            start_state
+        )
+        self.canonical_goal_state: GridState = self.relabeling.canonical_goal
+        self.budget: Optional[SearchBudget] = budget
+        self.stats: Optional[SearchStats] = stats
+
+        # Indexed by permutation rank; filled by bfs_layers() through a NumPy view.
+        self.parent_map: bytearray = bytearray(STATE_COUNT)
+
+        self.solution_path: Optional[SolutionPath] = None
+        self.solution_depth: Optional[int] = None
+        self.max_queue_size: int = 0
+        self.num_expanded_nodes: int = 0
+
+    def solve(self) -> SearchResult:
+        """
+        Expands BFS layers from the start until one contains the goal.
+
+        Returns:
+            A SearchResult that unpacks as the tuple:
+            - The solution path (a SolutionPath of states from start to goal) or None if no solution.
+            - The depth of the solution (number of moves) or None.
+            - The size of the largest layer.
+            - The number of states in the layers that were expanded.
+            If the budget runs out first, the status is CUTOFF and f_bound is
+            one more than the depth of the last layer checked for the goal.
+        """
+        if self.stats is not None:
+            return self.stats.measure(self._solve)
+        return self._solve()
+
+    def _solve(self) -> SearchResult:
+        """Runs the search that solve() reports on."""
+        start_time = time.perf_counter()
+        cutoff_reason: Optional[str] = None
+        depth = 0
+        if is_solvable(self.start_state, self.goal_state):
+            goal_state = pack(self.canonical_goal_state)
+            goal_rank = int(rank_array(np.array([goal_state], dtype=np.int64))[0])
+            parent_moves = np.frombuffer(self.parent_map, dtype=np.uint8)
+            for depth, (states, ranks) in enumerate(
+                bfs_layers(
+                    pack(self.canonical_start_state), parent_moves, self.stats
+                )
+            ):
+                self.max_queue_size = max(len(states), self.max_queue_size)
+                if (ranks == goal_rank).any():
+                    moves = trace_to_root(goal_state, self.parent_map)[::-1]
+                    self.solution_path = self.relabeling.path_from_canonical(
+                        self.start_state,
+                        SolutionPath(self.canonical_start_state, encode_moves(moves)),
+                    )
+                    self.solution_depth = len(moves)
+                    if self.stats is not None:
+                        self.stats.record_improvement(
+                            len(moves), self.num_expanded_nodes
+                        )
+                    break
+                if self.budget is not None:
+                    cutoff_reason = self.budget.check(
+                        self.num_expanded_nodes, len(states), start_time
+                    )
+                    if cutoff_reason is not None:
+                        break
+                self.num_expanded_nodes += len(states)
+
+        if self.solution_path is not None:
+            status = SOLVED
+        elif cutoff_reason is not None:
+            status = CUTOFF
+        else:
+            status = UNSOLVABLE
+        return SearchResult(
+            status,
+            path=self.solution_path,
+            max_queue_size=self.max_queue_size,
+            num_expanded_nodes=self.num_expanded_nodes,
+            elapsed_seconds=time.perf_counter() - start_time,
+            cutoff_reason=cutoff_reason,
+            f_bound=depth + 1 if cutoff_reason is not None else None,
+        )
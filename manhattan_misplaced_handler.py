@@ -1,16 +1,88 @@
-import time
 import heapq
-from typing import List, Tuple, Optional, Set, Dict, Callable  # Added Callable
+import time
+from array import array
+from fractions import Fraction
+from functools import lru_cache
+from typing import List, Tuple, Optional, Dict, Callable, Iterator, Sequence
+
+from packed_state import (
+    BLANK_MASK,
+    CHILD_MOVE_TABLE,
+    EIGHT_PUZZLE,
+    NO_MOVE,
+    TILE_MASK,
+    GridState,
+    PackedState,
+    pack,
+    undo_move,
+    unpack,
+)
+from goal_relabeling import GoalRelabeling, goal_relabeling
+from heuristics import PackedHeuristic, build_heuristic
+from open_list import BucketOpenList, HeapOpenList
+from permutation_rank import (
+    RANK_BITS,
+    RANK_MASK,
+    SIDEWAYS_RANK_DELTAS,
+    STATE_COUNT,
+    rank,
+    tile_parity,
+    unrank,
+)
+from search_budget import SearchBudget
+from search_result import ASTAR_SHAPE, CUTOFF, SOLVED, UNSOLVABLE, SearchResult
+from search_stats import SearchStats
+from solution_cache import SolutionCache
+from solution_path import SolutionPath, encode_moves
+from solvability import is_solvable, validate_puzzle
 
-GridState = List[int]
 GridStateTuple = Tuple[int, ...]
 Position = Tuple[int, int]  # (row, col)
 
+UNSEEN_COST = 0x7FFFFFFF  # g(n) of states the search has not reached
+FULLY_EXPANDED = -1  # Stored F of states with no children left to generate
+
+# Weights of the successive ARA* searches run by solve_anytime().
+DEFAULT_ANYTIME_WEIGHTS: Tuple[float, ...] = (3.0, 2.0, 1.5, 1.25, 1.0)
+MAX_WEIGHT_DENOMINATOR = 1000
+
+
+def _weight_scales(weight: float) -> Tuple[int, int]:
+    """
+    Returns integers (g scale, h scale) whose ratio h / g is the weight.
+
+    Open lists are ordered by g scale * g + h scale * h, which orders nodes like
+    g + weight * h but stays an integer, as the bucket open list requires. A
+    weight of 1 gives (1, 1), so optimal A* keeps its exact f-values.
+
+    Raises:
+        ValueError: If weight is smaller than 1.
+    """
+    if weight < 1:
+        raise ValueError("weight must be at least 1.")
+    ratio = Fraction(weight).limit_denominator(MAX_WEIGHT_DENOMINATOR)
+    return ratio.denominator, ratio.numerator
+
+
+def _calculate_positions(state_tuple: GridStateTuple) -> Dict[int, Position]:
+    pos_map: Dict[int, Position] = {}
+    for i, tile in enumerate(state_tuple):
+        if tile != 0:
+            pos_map[tile] = divmod(i, 3)
+    return pos_map
+
+
+@lru_cache(maxsize=None)
+def _goal_positions(goal_state_tuple: GridStateTuple) -> Dict[int, Position]:
+    """Tile positions of a goal, computed once per goal. Callers must not modify it."""
+    return _calculate_positions(goal_state_tuple)
+
 
 class ManhattanMisplacedHandler:
     """
-    Calculates heuristics (Misplaced Tile, Manhattan Distance) and performs
-    A* search using a selected heuristic for the 8-puzzle problem.
+    Calculates heuristics (Misplaced Tile, Manhattan Distance, and the others
+    registered in heuristics.py) and performs A* search using a selected
+    heuristic for the 8-puzzle problem.
     Returns detailed metrics including lists of g(n) and h(n) for the solution path.
     """
 
@@ -19,6 +91,13 @@ class ManhattanMisplacedHandler:
         start_state: GridState,
         goal_state: GridState,
         heuristic_type: str = "misplaced",
+        open_list: str = "heap",
+        keep_explored: bool = False,
+        solution_cache: Optional[SolutionCache] = None,
+        weight: float = 1.0,
+        budget: Optional[SearchBudget] = None,
+        stats: Optional[SearchStats] = None,
+        partial_expansion: bool = False,
     ):
         """
         Initializes the solver with start/goal states and selects the heuristic.
@@ -26,44 +105,92 @@ class ManhattanMisplacedHandler:
         Args:
             start_state: The initial puzzle configuration (list of 9 ints).
             goal_state: The target configuration of the puzzle (list of 9 ints).
-            heuristic_type: The heuristic to use ('misplaced' or 'manhattan').
+            heuristic_type: The heuristic to use ('misplaced', 'manhattan',
+                            'linear_conflict', 'walking_distance', 'pdb_4_4',
+                            'pdb_5_3', or 'max:' followed by a comma-separated
+                            list of those).
                             Defaults to 'misplaced'.
+            open_list: The open list to use: 'heap' (binary heap, ties broken by
+                       state) or 'bucket' (stacks indexed by f, preferring higher
+                       g, LIFO within). Defaults to 'heap'.
+            keep_explored: Return the (g, h) map of every explored state in the
+                           result. It is large, so it is off by default.
+            solution_cache: A SolutionCache shared across queries. Cached starts
+                            are answered without searching, the search stops
+                            early once it reaches a cached path and can prove
+                            it shortest, and every solution is recorded.
+                            Weighted searches only read from it.
+            weight: Run weighted A*, ordering nodes by g + weight * h. Paths
+                    are at most weight times longer than the shortest, and
+                    found with far fewer expansions. Defaults to 1 (optimal A*).
+            budget: Limits on the search. When one runs out, solve() returns
+                    a CUTOFF result and solve_anytime() ends with one.
+            stats: Counters, phase timers and callbacks to report every search
+                   to (see search_stats.py).
+            partial_expansion: Make solve() run Enhanced Partial Expansion A*
+                               (EPEA*), which stores far fewer nodes for the
+                               same depth (see _search_partial()). It only
+                               reads whole paths from the solution cache, and
+                               solve_anytime() does not use it.
 
         Raises:
-            ValueError: If states are invalid or heuristic_type is unknown.
+            ValueError: If states are invalid, heuristic_type or open_list is
+                unknown, or weight is smaller than 1.
         """
-        if not isinstance(start_state, list) or len(start_state) != 9:
-            raise ValueError("start_state must be a list of 9 integers.")
-        if not isinstance(goal_state, list) or len(goal_state) != 9:
-            raise ValueError("goal_state must be a list of 9 integers.")
+        validate_puzzle(start_state, goal_state, 9)
+        self._g_scale, self._h_scale = _weight_scales(weight)
 
-        valid_heuristics = ["misplaced", "manhattan"]
-        if heuristic_type not in valid_heuristics:
-            raise ValueError(f"Invalid heuristic_type. Choose from: {valid_heuristics}")
+        valid_open_lists = ["heap", "bucket"]
+        if open_list not in valid_open_lists:
+            raise ValueError(f"Invalid open_list. Choose from: {valid_open_lists}")
 
         self.start_state: GridState = start_state
         self.goal_state: GridState = goal_state
         self.goal_state_tuple: GridStateTuple = tuple(goal_state)
         self.heuristic_type: str = heuristic_type
+        self.open_list_type: str = open_list
+        self.keep_explored: bool = keep_explored
+        self.solution_cache: Optional[SolutionCache] = solution_cache
+        self.weight: float = weight
+        self.budget: Optional[SearchBudget] = budget
+        self.stats: Optional[SearchStats] = stats
+        self.partial_expansion: bool = partial_expansion
 
         # Pre-calculate goal positions for Manhattan distance efficiency
-        self._goal_pos_map: Dict[int, Position] = self._calculate_positions(
-            self.goal_state_tuple
+        self._goal_pos_map: Dict[int, Position] = _goal_positions(self.goal_state_tuple)
+
+        # The search runs towards a canonical goal (see goal_relabeling.py), so
+        # heuristic tables and cache entries are shared by every goal in the
+        # same class; the solution is mapped back to the original boards.
+        self.relabeling: GoalRelabeling = goal_relabeling(self.goal_state_tuple)
+        self.canonical_start_state: GridState = self.relabeling.to_canonical(
+            start_state
+        )
+        self.canonical_goal_state: GridState = self.relabeling.canonical_goal
+
+        # Heuristic evaluated by the search on packed states; its tables are
+        # built once per goal and shared by every solver (see heuristics.py).
+        self._heuristic: PackedHeuristic = build_heuristic(
+            heuristic_type, tuple(self.canonical_goal_state)
         )
+        self._packed_heuristic: Callable[[PackedState], int] = self._heuristic.evaluate
+
+        # Incremental form used during expansion, when the heuristic has one:
+        # (parent h, moved tile, from index, to index) -> child h
+        self.incremental_heuristic_func: Optional[
+            Callable[[int, int, int, int], int]
+        ] = self._heuristic.update
 
         # Assign the chosen heuristic function
         if self.heuristic_type == "misplaced":
             self.heuristic_func: Callable[[GridState], int] = self.calculate_misplaced
         elif self.heuristic_type == "manhattan":
             self.heuristic_func: Callable[[GridState], int] = self.calculate_manhattan
-        # No else needed due to validation above
+        else:
+            self.heuristic_func: Callable[[GridState], int] = self.calculate_selected
 
     def _calculate_positions(self, state_tuple: GridStateTuple) -> Dict[int, Position]:
-        pos_map: Dict[int, Position] = {}
-        for i, tile in enumerate(state_tuple):
-            if tile != 0:
-                pos_map[tile] = divmod(i, 3)
-        return pos_map
+        return _calculate_positions(state_tuple)
 
     def calculate_misplaced(self, current_state: GridState) -> int:
         if not isinstance(current_state, list) or len(current_state) != 9:
@@ -93,161 +220,790 @@ class ManhattanMisplacedHandler:
             )
         return h_cost
 
+    def calculate_selected(self, current_state: GridState) -> int:
+        """Evaluates the heuristic chosen at initialization on a board list."""
+        if not isinstance(current_state, list) or len(current_state) != 9:
+            raise ValueError("current_state must be a list of 9 integers.")
+
+        return self._packed_heuristic(
+            pack(self.relabeling.to_canonical(current_state))
+        )
+
     def __call__(self, current_state: GridState) -> int:
         """Calls the selected heuristic function."""
         return self.heuristic_func(current_state)
 
-    def _get_neighbors(self, state: GridState) -> List[GridState]:
-        neighbors: List[GridState] = []
-        try:
-            zero_index = state.index(0)
-        except ValueError:
-            return []
-
-        row, col = divmod(zero_index, 3)
-        potential_moves = [(-3, row > 0), (3, row < 2), (-1, col > 0), (1, col < 2)]
-        for delta_index, is_valid_move in potential_moves:
-            if is_valid_move:
-                neighbor_index = zero_index + delta_index
-                next_state = list(state)
-                next_state[zero_index], next_state[neighbor_index] = (
-                    next_state[neighbor_index],
-                    next_state[zero_index],
-                )
-                neighbors.append(next_state)
-        return neighbors
-
     def _reconstruct_path(
         self,
-        parent_map: Dict[GridStateTuple, Optional[GridState]],
-        current_state: GridState,
-    ) -> List[GridState]:
-        path: List[GridState] = []
-        state_list: Optional[GridState] = current_state
-        while state_list is not None:
-            path.append(state_list)
-            state_tuple = tuple(state_list)
-            state_list = parent_map.get(state_tuple)
-        return path[::-1]
-
-    def solve(
-        self,
-    ) -> Tuple[
-        Optional[List[GridState]],
-        Optional[int],
-        int,
-        int,
-        str,
-        Dict[GridStateTuple, Tuple[int, int]],
-        List[int],
-        List[int],
-    ]:
+        parent_map: bytearray,
+        current_state: PackedState,
+        suffix_moves: str = "",
+    ) -> SolutionPath:
+        moves: List[int] = []
+        state = current_state
+        move = parent_map[rank(state)]
+        while move != NO_MOVE:
+            moves.append(move)
+            state = undo_move(state, move)
+            move = parent_map[rank(state)]
+        return SolutionPath(
+            self.canonical_start_state, encode_moves(reversed(moves)) + suffix_moves
+        )
+
+    def solve(self) -> SearchResult:
         """
         Performs A* search using the heuristic selected during initialization.
-        Returns the path, metrics, the full gh_map, and lists of g(n) and h(n)
-        values specifically for the states in the solution path.
+        Returns a SearchResult with the path, metrics, and lists of g(n) and h(n)
+        values specifically for the states in the solution path. It unpacks as
+        (path, depth, max_queue, expanded, time_cost, gh_map, g values, h values);
+        gh_map is empty unless keep_explored was set. With a weight above 1 the
+        result's suboptimality_bound is the weight. If the budget runs out
+        first, the status is CUTOFF and f_bound is the lowest f left open (None
+        for weighted searches, whose f is not a bound on the depth).
+        """
+        if self.stats is not None:
+            return self.stats.measure(self._solve)
+        return self._solve()
+
+    def _solve(self) -> SearchResult:
+        """Runs the search that solve() reports on."""
+        if not is_solvable(self.start_state, self.goal_state):
+            # Rejected in microseconds instead of exhausting the reachable states.
+            return SearchResult(UNSOLVABLE, shape=ASTAR_SHAPE)
+
+        if self.partial_expansion:
+            return self._to_original_frame(self._search_partial())
+        return self._to_original_frame(self._search())
+
+    def _to_original_frame(self, result: SearchResult) -> SearchResult:
+        """Maps the path and explored states of a canonical search back."""
+        relabeling = self.relabeling
+        result.path = relabeling.path_from_canonical(self.start_state, result.path)
+        if result.explored and not relabeling.is_identity:
+            result.explored = {
+                tuple(relabeling.from_canonical(list(state))): gh_values
+                for state, gh_values in result.explored.items()
+            }
+        return result
+
+    def solve_anytime(
+        self, weights: Sequence[float] = DEFAULT_ANYTIME_WEIGHTS
+    ) -> Iterator[SearchResult]:
         """
-        start_state = self.start_state
-        start_state_tuple = tuple(start_state)
+        Runs Anytime Repairing A* (ARA*), yielding better solutions as it goes.
+
+        The first search uses the largest weight and finds a path quickly. Each
+        later search lowers the weight and continues from the previous one's
+        open list and g-values instead of starting over, so the stream can be
+        abandoned whenever the caller runs out of time. A search with weight 1
+        proves the last path shortest.
+
+        Args:
+            weights: Decreasing weights, one per search, each at least 1.
+                     Defaults to DEFAULT_ANYTIME_WEIGHTS, ending with 1.
 
-        pq: List[Tuple[int, GridState]] = []
-        visited_set: Set[GridStateTuple] = set()
-        parent_map: Dict[GridStateTuple, Optional[GridState]] = {}
-        cost_map: Dict[GridStateTuple, int] = {}  # Stores g(n) cost
-        # Stores (g(n), h(n))
-        gh_map: Dict[GridStateTuple, Tuple[int, int]] = {}
+        Yields:
+            A SearchResult for every improved solution (shorter, or with a
+            tighter proven bound), as solve() returns it. suboptimality_bound
+            is a proven bound on depth / optimal depth. Counters and
+            elapsed_seconds are cumulative. An unsolvable puzzle yields a
+            single UNSOLVABLE result, and a search that runs out of budget
+            ends the stream with a CUTOFF result.
+
+        Raises:
+            ValueError: If weights is empty, not decreasing, or has a weight
+                smaller than 1.
+        """
+        if not weights or any(
+            later > earlier for earlier, later in zip(weights, weights[1:])
+        ):
+            raise ValueError("weights must be a non-empty, decreasing sequence.")
+        scales = [_weight_scales(weight) for weight in weights]
+
+        if not is_solvable(self.start_state, self.goal_state):
+            yield SearchResult(UNSOLVABLE, shape=ASTAR_SHAPE)
+            return
+
+        results = self._search_anytime(weights, scales)
+        if self.stats is not None:
+            results = self.stats.measure_anytime(results)
+        for result in results:
+            yield self._to_original_frame(result)
+
+    def _search_anytime(
+        self, weights: Sequence[float], scales: List[Tuple[int, int]]
+    ) -> Iterator[SearchResult]:
+        """Runs ARA* from the canonical start to the canonical goal."""
+        start_state = pack(self.canonical_start_state)
+        goal_state = pack(self.canonical_goal_state)
+        goal_rank = rank(goal_state)
+        heuristic = self._packed_heuristic
+        update_heuristic = self.incremental_heuristic_func
+        heappush, heappop = heapq.heappush, heapq.heappop
+        start_time = time.perf_counter()
+
+        cache = self.solution_cache
+        stats = self.stats
+        if cache is not None:
+            cached_path = cache.lookup(
+                self.canonical_start_state, self.canonical_goal_state
+            )
+            if cached_path is not None:
+                if stats is not None:
+                    stats.record_improvement(len(cached_path) - 1, 0)
+                yield self._path_result(cached_path, 0, 0, start_time)
+                return
+        if stats is not None:
+            heuristic = stats.wrap_heuristic(heuristic)
+            update_heuristic = stats.wrap_heuristic(update_heuristic)
+            heappush, heappop = stats.wrap_push(heappush), stats.wrap_pop(heappop)
+            # Expanded by any of the searches, to count reopenings.
+            expanded_states = bytearray(STATE_COUNT)
+
+        # The tables persist across searches; that is what ARA* reuses.
+        parent_map = bytearray(STATE_COUNT)
+        cost_map = array("i", [UNSEEN_COST]) * STATE_COUNT
+        h_map = bytearray(STATE_COUNT)
+
+        h_n_start = heuristic(start_state)
+        start_rank = rank(start_state)
+        parent_map[start_rank] = NO_MOVE
+        cost_map[start_rank] = 0
+        h_map[start_rank] = h_n_start
+        # States to expand, as rank -> (open-list state entry, h).
+        waiting: Dict[int, Tuple[int, int]] = {
+            start_rank: ((start_state << RANK_BITS) | start_rank, h_n_start)
+        }
+
+        max_q_size = 1
+        num_expanded_nodes = 0
+        best_depth = UNSEEN_COST
+        best_bound = float("inf")
+        budget = self.budget
+        next_check = budget.next_check(0, 1) if budget is not None else float("inf")
+
+        for weight, (g_scale, h_scale) in zip(weights, scales):
+            # Each search orders the states left by the previous one by its own
+            # weight. Open-list entries are (f, state, h), as in _search().
+            open_heap = [
+                (g_scale * cost_map[entry_rank] + h_scale * h_n, entry, h_n)
+                for entry_rank, (entry, h_n) in waiting.items()
+            ]
+            heapq.heapify(open_heap)
+            # States expanded by this search. One whose g improves after that
+            # waits in `inconsistent` until the next search.
+            closed = bytearray(STATE_COUNT)
+            inconsistent: Dict[int, int] = {}  # rank -> open-list state entry
+
+            # Expand while some open node may still lead to a better path
+            # than the goal's current g under this weight.
+            while open_heap:
+                max_q_size = max(len(open_heap), max_q_size)
+                goal_f = g_scale * cost_map[goal_rank]
+                if open_heap[0][0] >= goal_f:
+                    break
+                f_current, current_entry, h_n_current = heappop(open_heap)
+                current_state = current_entry >> RANK_BITS
+                current_rank = current_entry & RANK_MASK
+                g_n_current = cost_map[current_rank]
+                if closed[current_rank] or (
+                    f_current > g_scale * g_n_current + h_scale * h_n_current
+                ):
+                    # Already expanded, or a cheaper path was pushed
+                    if stats is not None:
+                        stats.stale_pops += 1
+                    continue
+                if num_expanded_nodes >= next_check:
+                    cutoff_reason = budget.check(
+                        num_expanded_nodes, len(open_heap), start_time
+                    )
+                    if cutoff_reason is not None:
+                        yield SearchResult(
+                            CUTOFF,
+                            max_queue_size=max_q_size,
+                            num_expanded_nodes=num_expanded_nodes,
+                            elapsed_seconds=time.perf_counter() - start_time,
+                            shape=ASTAR_SHAPE,
+                            cutoff_reason=cutoff_reason,
+                        )
+                        return
+                    next_check = budget.next_check(num_expanded_nodes, len(open_heap))
+                closed[current_rank] = 1
+                num_expanded_nodes += 1
+
+                blank = current_state & BLANK_MASK
+                tentative_g_n = g_n_current + 1
+                child_moves = CHILD_MOVE_TABLE[blank][parent_map[current_rank]]
+                if stats is not None:
+                    if expanded_states[current_rank]:
+                        stats.reopened += 1
+                    expanded_states[current_rank] = 1
+                    stats.record_expansion(
+                        current_state, g_n_current, h_n_current, len(child_moves)
+                    )
+                for move, target_index, blank_shift, target_shift in child_moves:
+                    tile = (current_state >> target_shift) & TILE_MASK
+                    neighbor_state = (
+                        current_state
+                        + (tile << blank_shift)
+                        - (tile << target_shift)
+                        - blank
+                        + target_index
+                    )
+                    rank_delta = SIDEWAYS_RANK_DELTAS[move]
+                    if rank_delta:
+                        neighbor_rank = current_rank + rank_delta
+                    else:
+                        neighbor_rank = rank(neighbor_state)
+
+                    if tentative_g_n < cost_map[neighbor_rank]:
+                        if update_heuristic is not None:
+                            h_n_neighbor = update_heuristic(
+                                h_n_current, tile, target_index, blank
+                            )
+                        else:
+                            h_n_neighbor = heuristic(neighbor_state)
+                        cost_map[neighbor_rank] = tentative_g_n
+                        parent_map[neighbor_rank] = move
+                        h_map[neighbor_rank] = h_n_neighbor
+
+                        neighbor_entry = (
+                            neighbor_state << RANK_BITS
+                        ) | neighbor_rank
+                        if closed[neighbor_rank]:
+                            inconsistent[neighbor_rank] = neighbor_entry
+                            if stats is not None:
+                                stats.pushed += 1  # Queued for the next search
+                        else:
+                            heappush(
+                                open_heap,
+                                (
+                                    g_scale * tentative_g_n + h_scale * h_n_neighbor,
+                                    neighbor_entry,
+                                    h_n_neighbor,
+                                ),
+                            )
+
+            # The states left for the next search, once each.
+            waiting = {}
+            for _, entry, h_n in open_heap:
+                entry_rank = entry & RANK_MASK
+                if not closed[entry_rank]:
+                    waiting[entry_rank] = (entry, h_n)
+            for entry_rank, entry in inconsistent.items():
+                waiting[entry_rank] = (entry, h_map[entry_rank])
+
+            goal_g = cost_map[goal_rank]
+            if goal_g == UNSEEN_COST:
+                continue
+            # Every optimal path passes through a waiting state that has its
+            # optimal g, so the smallest g + h among them bounds the depth.
+            lower_bound = min(
+                (
+                    cost_map[entry_rank] + h_n
+                    for entry_rank, (_, h_n) in waiting.items()
+                ),
+                default=goal_g,
+            )
+            solution_path = self._reconstruct_path(parent_map, goal_state)
+            depth = len(solution_path) - 1
+            bound = float(weight)
+            if depth <= lower_bound:
+                bound = 1.0
+            elif lower_bound:
+                bound = min(bound, depth / lower_bound)
+
+            if depth < best_depth or bound < best_bound:
+                best_depth, best_bound = depth, bound
+                if cache is not None and bound == 1.0:
+                    cache.record(solution_path, self.canonical_goal_state)
+                result = self._path_result(
+                    solution_path,
+                    max_q_size,
+                    num_expanded_nodes,
+                    start_time,
+                    self._explored(start_state, cost_map, h_map),
+                )
+                result.suboptimality_bound = bound
+                if stats is not None:
+                    stats.record_improvement(depth, num_expanded_nodes)
+                yield result
+            if bound == 1.0:
+                return
+
+    def _search(self) -> SearchResult:
+        """Runs A* from the canonical start to the canonical goal."""
+        start_state = pack(self.canonical_start_state)
+        goal_state = pack(self.canonical_goal_state)
+        heuristic = self._packed_heuristic
+        update_heuristic = self.incremental_heuristic_func
+        stats = self.stats
+        if stats is not None:
+            heuristic = stats.wrap_heuristic(heuristic)
+            update_heuristic = stats.wrap_heuristic(update_heuristic)
+        # f is g + h, or g_scale * g + h_scale * h for weighted A*.
+        g_scale, h_scale = self._g_scale, self._h_scale
+        weighted = h_scale != g_scale
+
+        # Open-list entries are (f, state, h). The state carries its rank in
+        # the low bits and sits above it, so heap ties still break exactly as
+        # they did on board lists; h rides along so nothing is recomputed on pop.
+        if self.open_list_type == "bucket":
+            pq = BucketOpenList()
+        else:
+            pq = HeapOpenList()
+        push, pop = pq.push, pq.pop
+        # Flat tables indexed by permutation rank (see permutation_rank.py).
+        parent_map = bytearray(STATE_COUNT)  # Move that reached each state
+        cost_map = array("i", [UNSEEN_COST]) * STATE_COUNT  # Stores g(n) cost
+        h_map = bytearray(STATE_COUNT)  # Stores h(n) for the gh_map
 
-        solution_depth: Optional[int] = None
         max_q_size: int = 0
         num_expanded_nodes: int = 0
-        start_time = time.time()
+        start_time = time.perf_counter()
+
+        # With a solution cache, reaching a cached state gives a complete path
+        # (the incumbent) of cost g + its cached distance. Once no open node can
+        # beat it (f >= incumbent, as h is admissible), it is a shortest path.
+        # Weighted searches neither join nor record: their paths are not exact.
+        cache = self.solution_cache
+        cached_entry = None
+        if cache is not None:
+            cached_path = cache.lookup(
+                self.canonical_start_state, self.canonical_goal_state
+            )
+            if cached_path is not None:
+                if stats is not None:
+                    stats.record_improvement(len(cached_path) - 1, 0)
+                return self._path_result(cached_path, 0, 0, start_time)
+            if cache.entries and not weighted:
+                cached_entry = cache.entries.get
+        incumbent_cost = UNSEEN_COST
+        incumbent_state: Optional[PackedState] = None
+        incumbent_suffix = ""
+        budget = self.budget
+        next_check = budget.next_check(0, 1) if budget is not None else float("inf")
 
         g_n_start = 0
-        h_n_start = self.heuristic_func(start_state)
-        f_n_start = g_n_start + h_n_start
-
-        heapq.heappush(pq, (f_n_start, start_state))
-        visited_set.add(start_state_tuple)
-        parent_map[start_state_tuple] = None
-        cost_map[start_state_tuple] = g_n_start
-        gh_map[start_state_tuple] = (g_n_start, h_n_start)
+        h_n_start = heuristic(start_state)
+        f_n_start = g_scale * g_n_start + h_scale * h_n_start
+
+        start_rank = rank(start_state)
+        push(f_n_start, g_n_start, (start_state << RANK_BITS) | start_rank, h_n_start)
+        parent_map[start_rank] = NO_MOVE
+        cost_map[start_rank] = g_n_start
+        h_map[start_rank] = h_n_start
         max_q_size = 1
+        if stats is not None:
+            push, pop = stats.wrap_push(push), stats.wrap_pop(pop)
+            expanded_states = bytearray(STATE_COUNT)  # To count reopenings
 
         while pq:
             max_q_size = max(len(pq), max_q_size)
 
-            f_current, current_state = heapq.heappop(pq)
-            current_state_tuple = tuple(current_state)
+            f_current, current_entry, h_n_current = pop()
+            current_state = current_entry >> RANK_BITS
+            current_rank = current_entry & RANK_MASK
+            g_n_current = cost_map[current_rank]
 
-            if current_state_tuple in cost_map and f_current > cost_map[
-                current_state_tuple
-            ] + self.heuristic_func(current_state):
+            if f_current > g_scale * g_n_current + h_scale * h_n_current:
+                # A cheaper path to this state was pushed later
+                if stats is not None:
+                    stats.stale_pops += 1
                 continue
+            if f_current >= incumbent_cost:
+                break  # Nothing left in the open list can beat the cached path
+            if num_expanded_nodes >= next_check:
+                cutoff_reason = budget.check(num_expanded_nodes, len(pq), start_time)
+                if cutoff_reason is not None:
+                    # The open list pops the lowest f first, and with weight 1
+                    # some state on a shortest path is still open.
+                    return SearchResult(
+                        CUTOFF,
+                        max_queue_size=max_q_size,
+                        num_expanded_nodes=num_expanded_nodes,
+                        elapsed_seconds=time.perf_counter() - start_time,
+                        explored=self._explored(start_state, cost_map, h_map),
+                        shape=ASTAR_SHAPE,
+                        cutoff_reason=cutoff_reason,
+                        f_bound=None if weighted else f_current,
+                    )
+                next_check = budget.next_check(num_expanded_nodes, len(pq))
 
-            g_n_current = cost_map.get(current_state_tuple, 0)
             num_expanded_nodes += 1
 
-            if current_state_tuple == self.goal_state_tuple:
-                solution_path = self._reconstruct_path(parent_map, current_state)
-                solution_depth = len(solution_path) - 1
-                end_time = time.time()
-                time_cost = f"{(end_time - start_time):.4f}"
-
-                # --- Extract g(n) and h(n) for the solution path ---
-                g_n_values_path: List[int] = []
-                h_n_values_path: List[int] = []
-                if solution_path:
-                    for state in solution_path:
-                        state_tuple_path = tuple(state)
-                        g_val, h_val = gh_map.get(
-                            state_tuple_path, (-1, -1)
-                        )  # Get g,h from map
-                        g_n_values_path.append(g_val)
-                        h_n_values_path.append(h_val)
-                # ----------------------------------------------------
-
-                return (
-                    solution_path,
-                    solution_depth,
+            if current_state == goal_state:
+                return self._goal_result(
+                    start_state,
+                    goal_state,
+                    parent_map,
+                    cost_map,
+                    h_map,
                     max_q_size,
                     num_expanded_nodes,
-                    time_cost,
-                    gh_map,  # Return the full map
-                    g_n_values_path,  # Return list of g(n) for the path
-                    h_n_values_path,  # Return list of h(n) for the path
+                    start_time,
                 )
 
-            neighbors = self._get_neighbors(current_state)
+            blank = current_state & BLANK_MASK
             move_cost = 1
+            tentative_g_n = g_n_current + move_cost
+            # The move back to the parent is never generated: the parent's g is
+            # already lower than it could get through this state.
+            child_moves = CHILD_MOVE_TABLE[blank][parent_map[current_rank]]
+            if stats is not None:
+                if expanded_states[current_rank]:
+                    stats.reopened += 1
+                expanded_states[current_rank] = 1
+                stats.record_expansion(
+                    current_state, g_n_current, h_n_current, len(child_moves)
+                )
+
+            for move, target_index, blank_shift, target_shift in child_moves:
+                tile = (current_state >> target_shift) & TILE_MASK
+                neighbor_state = (
+                    current_state
+                    + (tile << blank_shift)
+                    - (tile << target_shift)
+                    - blank
+                    + target_index
+                )
+                rank_delta = SIDEWAYS_RANK_DELTAS[move]
+                if rank_delta:
+                    neighbor_rank = current_rank + rank_delta
+                else:
+                    neighbor_rank = rank(neighbor_state)
+
+                if tentative_g_n < cost_map[neighbor_rank]:
+                    if update_heuristic is not None:
+                        h_n_neighbor = update_heuristic(
+                            h_n_current, tile, target_index, blank
+                        )
+                    else:
+                        h_n_neighbor = heuristic(neighbor_state)
+                    f_n_neighbor = g_scale * tentative_g_n + h_scale * h_n_neighbor
+
+                    cost_map[neighbor_rank] = tentative_g_n
+                    parent_map[neighbor_rank] = move
+                    h_map[neighbor_rank] = h_n_neighbor
+
+                    if cached_entry is not None:
+                        entry = cached_entry((goal_state, neighbor_state))
+                        if (
+                            entry is not None
+                            and tentative_g_n + entry[0] < incumbent_cost
+                        ):
+                            suffix = cache.suffix_moves(
+                                neighbor_state, goal_state, EIGHT_PUZZLE
+                            )
+                            if suffix is not None:
+                                incumbent_cost = tentative_g_n + entry[0]
+                                incumbent_state = neighbor_state
+                                incumbent_suffix = suffix
+                                if stats is not None:
+                                    stats.record_improvement(
+                                        incumbent_cost, num_expanded_nodes
+                                    )
+
+                    push(
+                        f_n_neighbor,
+                        tentative_g_n,
+                        (neighbor_state << RANK_BITS) | neighbor_rank,
+                        h_n_neighbor,
+                    )
+
+        if incumbent_state is not None:
+            cache.joins += 1
+            solution_path = self._reconstruct_path(
+                parent_map, incumbent_state, incumbent_suffix
+            )
+            cache.record(solution_path, self.canonical_goal_state)
+            return self._path_result(
+                solution_path,
+                max_q_size,
+                num_expanded_nodes,
+                start_time,
+                self._explored(start_state, cost_map, h_map),
+            )
+
+        # --- No Solution Found ---
+        return SearchResult(
+            UNSOLVABLE,
+            max_queue_size=max_q_size,
+            num_expanded_nodes=num_expanded_nodes,
+            elapsed_seconds=time.perf_counter() - start_time,
+            explored=self._explored(start_state, cost_map, h_map),
+            shape=ASTAR_SHAPE,
+        )
+
+    def _search_partial(self) -> SearchResult:
+        """
+        Runs EPEA* from the canonical start to the canonical goal.
+
+        Every open-list entry carries a stored F, at first the state's f.
+        Popping a state generates only its children whose f equals that F
+        (every child with f <= F the first time), and puts the state back with
+        the smallest child f above F, if any is left. A child's f is known
+        from the tile it moves before the child is built, when the heuristic
+        has an incremental update. Children that A* would store and never
+        expand are thus not stored at all, which shrinks the open list and
+        the generated nodes. Each partial expansion counts as an expansion.
+        """
+        start_state = pack(self.canonical_start_state)
+        goal_state = pack(self.canonical_goal_state)
+        heuristic = self._packed_heuristic
+        update_heuristic = self.incremental_heuristic_func
+        stats = self.stats
+        if stats is not None:
+            heuristic = stats.wrap_heuristic(heuristic)
+            update_heuristic = stats.wrap_heuristic(update_heuristic)
+        g_scale, h_scale = self._g_scale, self._h_scale
+        weighted = h_scale != g_scale
+
+        # Open-list entries are (F, state, h), as in _search().
+        if self.open_list_type == "bucket":
+            pq = BucketOpenList()
+        else:
+            pq = HeapOpenList()
+        push, pop, requeue = pq.push, pq.pop, pq.push
+        parent_map = bytearray(STATE_COUNT)
+        cost_map = array("i", [UNSEEN_COST]) * STATE_COUNT
+        h_map = bytearray(STATE_COUNT)
+        # The stored F of each state's live entry. Any other entry of the state
+        # was replaced by a cheaper path or a later partial expansion; entries
+        # carry no path, so two live ones with the same F would be equivalent.
+        stored_f = array("i", [FULLY_EXPANDED]) * STATE_COUNT
+
+        max_q_size: int = 0
+        num_expanded_nodes: int = 0
+        start_time = time.perf_counter()
+
+        cache = self.solution_cache
+        if cache is not None:
+            cached_path = cache.lookup(
+                self.canonical_start_state, self.canonical_goal_state
+            )
+            if cached_path is not None:
+                if stats is not None:
+                    stats.record_improvement(len(cached_path) - 1, 0)
+                return self._path_result(cached_path, 0, 0, start_time)
+        budget = self.budget
+        next_check = budget.next_check(0, 1) if budget is not None else float("inf")
+
+        h_n_start = heuristic(start_state)
+        f_n_start = h_scale * h_n_start
+        start_rank = rank(start_state)
+        push(f_n_start, 0, (start_state << RANK_BITS) | start_rank, h_n_start)
+        parent_map[start_rank] = NO_MOVE
+        cost_map[start_rank] = 0
+        h_map[start_rank] = h_n_start
+        stored_f[start_rank] = f_n_start
+        max_q_size = 1
+        if stats is not None:
+            push, pop = stats.wrap_push(push), stats.wrap_pop(pop)
+            requeue = stats.wrap_push(requeue, "requeued")
+            expanded_states = bytearray(STATE_COUNT)  # To count reopenings
+
+        while pq:
+            max_q_size = max(len(pq), max_q_size)
 
-            for neighbor_state in neighbors:
-                neighbor_state_tuple = tuple(neighbor_state)
-                tentative_g_n = g_n_current + move_cost
+            f_current, current_entry, h_n_current = pop()
+            current_state = current_entry >> RANK_BITS
+            current_rank = current_entry & RANK_MASK
+            if f_current != stored_f[current_rank]:
+                if stats is not None:
+                    stats.stale_pops += 1
+                continue
+            if num_expanded_nodes >= next_check:
+                cutoff_reason = budget.check(num_expanded_nodes, len(pq), start_time)
+                if cutoff_reason is not None:
+                    return SearchResult(
+                        CUTOFF,
+                        max_queue_size=max_q_size,
+                        num_expanded_nodes=num_expanded_nodes,
+                        elapsed_seconds=time.perf_counter() - start_time,
+                        explored=self._explored(start_state, cost_map, h_map),
+                        shape=ASTAR_SHAPE,
+                        cutoff_reason=cutoff_reason,
+                        f_bound=None if weighted else f_current,
+                    )
+                next_check = budget.next_check(num_expanded_nodes, len(pq))
 
-                if tentative_g_n < cost_map.get(neighbor_state_tuple, float("inf")):
-                    h_n_neighbor = self.heuristic_func(neighbor_state)
-                    f_n_neighbor = tentative_g_n + h_n_neighbor
+            num_expanded_nodes += 1
+            g_n_current = cost_map[current_rank]
+
+            if current_state == goal_state:
+                return self._goal_result(
+                    start_state,
+                    goal_state,
+                    parent_map,
+                    cost_map,
+                    h_map,
+                    max_q_size,
+                    num_expanded_nodes,
+                    start_time,
+                )
 
-                    cost_map[neighbor_state_tuple] = tentative_g_n
-                    parent_map[neighbor_state_tuple] = current_state
-                    gh_map[neighbor_state_tuple] = (
+            blank = current_state & BLANK_MASK
+            tentative_g_n = g_n_current + 1
+            # Children with a lower f were generated by the earlier partial
+            # expansions, except on the first one (weighted f can decrease).
+            first_expansion = f_current == g_scale * g_n_current + h_scale * h_n_current
+            next_f = FULLY_EXPANDED
+            num_children = 0
+
+            for move, target_index, blank_shift, target_shift in CHILD_MOVE_TABLE[
+                blank
+            ][parent_map[current_rank]]:
+                tile = (current_state >> target_shift) & TILE_MASK
+                neighbor_state = 0  # Only built for the selected children
+                if update_heuristic is not None:
+                    h_n_neighbor = update_heuristic(
+                        h_n_current, tile, target_index, blank
+                    )
+                else:
+                    neighbor_state = (
+                        current_state
+                        + (tile << blank_shift)
+                        - (tile << target_shift)
+                        - blank
+                        + target_index
+                    )
+                    h_n_neighbor = heuristic(neighbor_state)
+                f_n_neighbor = g_scale * tentative_g_n + h_scale * h_n_neighbor
+                if f_n_neighbor > f_current:
+                    if next_f == FULLY_EXPANDED or f_n_neighbor < next_f:
+                        next_f = f_n_neighbor
+                    continue
+                if f_n_neighbor < f_current and not first_expansion:
+                    continue
+
+                num_children += 1
+                if not neighbor_state:
+                    neighbor_state = (
+                        current_state
+                        + (tile << blank_shift)
+                        - (tile << target_shift)
+                        - blank
+                        + target_index
+                    )
+                rank_delta = SIDEWAYS_RANK_DELTAS[move]
+                if rank_delta:
+                    neighbor_rank = current_rank + rank_delta
+                else:
+                    neighbor_rank = rank(neighbor_state)
+
+                if tentative_g_n < cost_map[neighbor_rank]:
+                    cost_map[neighbor_rank] = tentative_g_n
+                    parent_map[neighbor_rank] = move
+                    h_map[neighbor_rank] = h_n_neighbor
+                    stored_f[neighbor_rank] = f_n_neighbor
+                    push(
+                        f_n_neighbor,
                         tentative_g_n,
+                        (neighbor_state << RANK_BITS) | neighbor_rank,
                         h_n_neighbor,
-                    )  # Store g and h
-                    visited_set.add(neighbor_state_tuple)
+                    )
+
+            stored_f[current_rank] = next_f
+            if next_f != FULLY_EXPANDED:
+                requeue(next_f, g_n_current, current_entry, h_n_current)
+            if stats is not None:
+                if first_expansion:
+                    if expanded_states[current_rank]:
+                        stats.reopened += 1
+                    expanded_states[current_rank] = 1
+                stats.record_expansion(
+                    current_state, g_n_current, h_n_current, num_children
+                )
 
-                    heapq.heappush(pq, (f_n_neighbor, neighbor_state))
+        return SearchResult(
+            UNSOLVABLE,
+            max_queue_size=max_q_size,
+            num_expanded_nodes=num_expanded_nodes,
+            elapsed_seconds=time.perf_counter() - start_time,
+            explored=self._explored(start_state, cost_map, h_map),
+            shape=ASTAR_SHAPE,
+        )
 
-        # --- No Solution Found ---
-        end_time = time.time()
-        time_cost = f"{(end_time - start_time):.4f}"
-        return (
-            None,  # No path
-            None,  # No depth
-            max_q_size,
-            num_expanded_nodes,
-            time_cost,
-            gh_map,  # Still return the map of explored states
-            [],  # Empty list for g(n) path values
-            [],  # Empty list for h(n) path values
+    def _goal_result(
+        self,
+        start_state: PackedState,
+        goal_state: PackedState,
+        parent_map: bytearray,
+        cost_map: array,
+        h_map: bytearray,
+        max_q_size: int,
+        num_expanded_nodes: int,
+        start_time: float,
+    ) -> SearchResult:
+        """Builds the result for a search that expanded the goal."""
+        solution_path = self._reconstruct_path(parent_map, goal_state)
+        elapsed_seconds = time.perf_counter() - start_time
+
+        # --- Extract g(n) and h(n) for the solution path ---
+        g_n_values_path: List[int] = []
+        h_n_values_path: List[int] = []
+        for state in solution_path.packed_states():
+            state_rank = rank(state)
+            g_n_values_path.append(cost_map[state_rank])
+            h_n_values_path.append(h_map[state_rank])
+        # ----------------------------------------------------
+
+        if self.solution_cache is not None and self._h_scale == self._g_scale:
+            self.solution_cache.record(solution_path, self.canonical_goal_state)
+        if self.stats is not None:
+            self.stats.record_improvement(len(solution_path) - 1, num_expanded_nodes)
+        return SearchResult(
+            SOLVED,
+            path=solution_path,
+            max_queue_size=max_q_size,
+            num_expanded_nodes=num_expanded_nodes,
+            elapsed_seconds=elapsed_seconds,
+            g_values=g_n_values_path,
+            h_values=h_n_values_path,
+            explored=self._explored(start_state, cost_map, h_map),
+            shape=ASTAR_SHAPE,
+            suboptimality_bound=float(self.weight),
         )
+
+    def _path_result(
+        self,
+        solution_path: SolutionPath,
+        max_q_size: int,
+        num_expanded_nodes: int,
+        start_time: float,
+        explored: Optional[Dict[GridStateTuple, Tuple[int, int]]] = None,
+    ) -> SearchResult:
+        """Builds the result for a path completed from the solution cache."""
+        heuristic = self._packed_heuristic
+        return SearchResult(
+            SOLVED,
+            path=solution_path,
+            max_queue_size=max_q_size,
+            num_expanded_nodes=num_expanded_nodes,
+            elapsed_seconds=time.perf_counter() - start_time,
+            g_values=list(range(len(solution_path))),
+            h_values=[heuristic(state) for state in solution_path.packed_states()],
+            explored=explored,
+            shape=ASTAR_SHAPE,
+        )
+
+    def _explored(
+        self, start_state: PackedState, cost_map: array, h_map: bytearray
+    ) -> Optional[Dict[GridStateTuple, Tuple[int, int]]]:
+        """Builds the gh_map if the caller asked to keep it, else returns None."""
+        if not self.keep_explored:
+            return None
+        return self._build_gh_map(start_state, cost_map, h_map)
+
+    @staticmethod
+    def _build_gh_map(
+        start_state: PackedState, cost_map: array, h_map: bytearray
+    ) -> Dict[GridStateTuple, Tuple[int, int]]:
+        """Expands the rank-indexed g/h tables into the (g, h) map callers expect."""
+        parity = tile_parity(start_state)
+        return {
+            tuple(unpack(unrank(state_rank, parity))): (g_n, h_map[state_rank])
+            for state_rank, g_n in enumerate(cost_map)
+            if g_n != UNSEEN_COST
+        }
@@ -0,0 +1,87 @@
+import heapq
+from typing import List, Tuple
+
+# An open-list entry is (f, state, h); see ManhattanMisplacedHandler.solve.
+OpenEntry = Tuple[int, int, int]
+
+
+class HeapOpenList:
+    """
+    Binary-heap open list ordered by (f, state).
+
+    Ties on f fall through to the packed state, which orders boards exactly
+    like comparing their lists.
+    """
+
+    def __init__(self):
+        self._heap: List[OpenEntry] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, f: int, g: int, state: int, h: int) -> None:
+        heapq.heappush(self._heap, (f, state, h))
+
+    def pop(self) -> OpenEntry:
+        return heapq.heappop(self._heap)
+
+
+class BucketOpenList:
+    """
+    Open list of stacks indexed by f and then g, for integer f-values.
+
+    Pops come from the lowest f, preferring the highest g within it and the most
+    recently pushed entry within that. Deep nodes of the final f-layer are
+    therefore expanded first, which reaches the goal with fewer expansions than
+    arbitrary tie-breaking. Push and pop are O(1) amortized.
+    """
+
+    def __init__(self):
+        # _buckets[f][g] is a stack of (state, h) pairs.
+        self._buckets: List[List[List[Tuple[int, int]]]] = []
+        self._bucket_sizes: List[int] = []
+        self._max_g: List[int] = []  # Highest possibly non-empty g per f
+        self._min_f: int = 0  # Lowest possibly non-empty f
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, f: int, g: int, state: int, h: int) -> None:
+        buckets = self._buckets
+        while len(buckets) <= f:
+            buckets.append([])
+            self._bucket_sizes.append(0)
+            self._max_g.append(-1)
+        stacks = buckets[f]
+        while len(stacks) <= g:
+            stacks.append([])
+        stacks[g].append((state, h))
+
+        self._bucket_sizes[f] += 1
+        if g > self._max_g[f]:
+            self._max_g[f] = g
+        if f < self._min_f:
+            self._min_f = f
+        self._size += 1
+
+    def pop(self) -> OpenEntry:
+        if not self._size:
+            raise IndexError("pop from an empty open list")
+
+        f = self._min_f
+        bucket_sizes = self._bucket_sizes
+        while not bucket_sizes[f]:
+            f += 1
+        self._min_f = f
+
+        stacks = self._buckets[f]
+        g = self._max_g[f]
+        while not stacks[g]:
+            g -= 1
+        self._max_g[f] = g
+
+        state, h = stacks[g].pop()
+        bucket_sizes[f] -= 1
+        self._size -= 1
+        return (f, state, h)
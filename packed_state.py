@@ -0,0 +1,218 @@
+from functools import lru_cache
+from math import isqrt
+from typing import List, Tuple
+
+# Type aliases for clarity
+GridState = List[int]
+PackedState = int
+MoveTable = Tuple[Tuple[Tuple[int, int, int, int], ...], ...]
+# Indexed [blank index][previous move]; see BoardGeometry.child_move_table.
+ChildMoveTable = Tuple[Tuple[Tuple[Tuple[int, int, int, int], ...], ...], ...]
+
+# A board is packed into a single int: a fixed number of bits per tile, with
+# cell 0 in the highest field and the last cell in the lowest tile field,
+# followed by a field that holds the index of the blank. Keeping cell 0 most
+# significant means comparing two packed ints orders boards exactly like
+# comparing their lists. The 3x3 board uses 4 bits per field.
+
+# Blank moves, in the same order the solvers have always generated them.
+MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT = range(4)
+NO_MOVE = 0xFF  # Marks the start state in byte-sized parent-move tables
+
+
+class BoardGeometry:
+    """
+    Packing layout and blank move tables for a width x width board.
+    """
+
+    def __init__(self, width: int):
+        """
+        Precomputes the layout of a board.
+
+        Args:
+            width: The number of rows and columns (3 for the 8-puzzle).
+
+        Raises:
+            ValueError: If width is smaller than 2.
+        """
+        if width < 2:
+            raise ValueError("width must be at least 2.")
+
+        self.width: int = width
+        self.num_cells: int = width * width
+        largest_value = self.num_cells - 1  # Highest tile and highest blank index
+        self.tile_bits: int = max(4, largest_value.bit_length())
+        self.tile_mask: int = (1 << self.tile_bits) - 1
+        self.blank_mask: int = self.tile_mask
+
+        # Bit offset of every cell inside a packed state.
+        self.cell_shifts: Tuple[int, ...] = tuple(
+            self.tile_bits * (self.num_cells - i) for i in range(self.num_cells)
+        )
+        self.move_deltas: Tuple[int, ...] = (-width, width, -1, 1)
+        self.move_table: MoveTable = self._build_move_table()
+        self.child_move_table: ChildMoveTable = self._build_child_move_table()
+
+    def _build_move_table(self) -> MoveTable:
+        """
+        For every blank index, lists the legal blank moves as
+        (move, target index, shift of the blank cell, shift of the target cell).
+        """
+        width = self.width
+        table = []
+        for blank_index in range(self.num_cells):
+            row, col = divmod(blank_index, width)
+            is_valid = (row > 0, row < width - 1, col > 0, col < width - 1)
+            moves = []
+            for move, delta_index in enumerate(self.move_deltas):
+                if is_valid[move]:
+                    target_index = blank_index + delta_index
+                    moves.append(
+                        (
+                            move,
+                            target_index,
+                            self.cell_shifts[blank_index],
+                            self.cell_shifts[target_index],
+                        )
+                    )
+            table.append(tuple(moves))
+        return tuple(table)
+
+    def _build_child_move_table(self) -> ChildMoveTable:
+        """
+        For every blank index and every previous blank move, lists the move
+        table entries without the move that would undo it.
+
+        The inner index is any byte, so a parent-move table can be read
+        straight into it: NO_MOVE (the start state) and other values above 3
+        keep every move. Searches use it to skip the move back to the parent,
+        which can never be on a shortest path, without generating it.
+        """
+        table = []
+        for moves in self.move_table:
+            pruned = [
+                tuple(entry for entry in moves if entry[0] != previous_move ^ 1)
+                for previous_move in range(len(self.move_deltas))
+            ]
+            table.append(tuple(pruned) + (moves,) * (NO_MOVE + 1 - len(pruned)))
+        return tuple(table)
+
+    def pack(self, state: GridState) -> PackedState:
+        """
+        Encodes a board list into a packed int.
+
+        Args:
+            state: The board as a list of ints, 0 represents blank.
+
+        Returns:
+            The packed representation of the board.
+        """
+        tile_bits = self.tile_bits
+        packed = 0
+        for tile in state:
+            packed = (packed << tile_bits) | tile
+        return (packed << tile_bits) | state.index(0)
+
+    def unpack(self, packed: PackedState) -> GridState:
+        """
+        Decodes a packed int back into a board list.
+
+        Args:
+            packed: A board produced by pack() or move_blank().
+
+        Returns:
+            The board as a list of ints.
+        """
+        tile_mask = self.tile_mask
+        return [(packed >> shift) & tile_mask for shift in self.cell_shifts]
+
+    def blank_index(self, packed: PackedState) -> int:
+        """Returns the index of the blank cell of a packed board."""
+        return packed & self.blank_mask
+
+    def tile_at(self, packed: PackedState, index: int) -> int:
+        """Returns the tile stored at a cell of a packed board."""
+        return (packed >> self.cell_shifts[index]) & self.tile_mask
+
+    def move_blank(self, packed: PackedState, target_index: int) -> PackedState:
+        """
+        Slides the tile at target_index into the blank cell.
+
+        The caller is responsible for target_index being adjacent to the blank;
+        the solvers only ever pass targets taken from the move table.
+
+        Args:
+            packed: The current packed board.
+            target_index: The cell the blank moves to.
+
+        Returns:
+            The packed board after the move.
+        """
+        cell_shifts = self.cell_shifts
+        blank = packed & self.blank_mask
+        tile = (packed >> cell_shifts[target_index]) & self.tile_mask
+        return (
+            packed
+            + (tile << cell_shifts[blank])
+            - (tile << cell_shifts[target_index])
+            - blank
+            + target_index
+        )
+
+    def undo_move(self, packed: PackedState, move: int) -> PackedState:
+        """
+        Reverts the blank move that produced a packed board.
+
+        Args:
+            packed: A packed board reached by sliding the blank in direction move.
+            move: One of MOVE_UP, MOVE_DOWN, MOVE_LEFT or MOVE_RIGHT.
+
+        Returns:
+            The packed board before the move.
+        """
+        return self.move_blank(
+            packed, (packed & self.blank_mask) - self.move_deltas[move]
+        )
+
+
+@lru_cache(maxsize=None)
+def board_geometry(width: int) -> BoardGeometry:
+    """Returns the shared BoardGeometry of a width x width board."""
+    return BoardGeometry(width)
+
+
+def geometry_for(num_cells: int) -> BoardGeometry:
+    """
+    Returns the BoardGeometry of a square board with num_cells cells.
+
+    Raises:
+        ValueError: If num_cells is not the size of a square board.
+    """
+    width = isqrt(num_cells)
+    if width * width != num_cells or width < 2:
+        raise ValueError("A board must have width * width cells, with width >= 2.")
+    return board_geometry(width)
+
+
+# --- The 3x3 board -----------------------------------------------------------
+#
+# The 8-puzzle solvers use these module-level names directly.
+
+EIGHT_PUZZLE = board_geometry(3)
+
+BOARD_WIDTH = EIGHT_PUZZLE.width
+NUM_CELLS = EIGHT_PUZZLE.num_cells
+TILE_BITS = EIGHT_PUZZLE.tile_bits
+TILE_MASK = EIGHT_PUZZLE.tile_mask
+BLANK_MASK = EIGHT_PUZZLE.blank_mask
+CELL_SHIFTS = EIGHT_PUZZLE.cell_shifts
+MOVE_DELTAS = EIGHT_PUZZLE.move_deltas
+MOVE_TABLE = EIGHT_PUZZLE.move_table
+CHILD_MOVE_TABLE = EIGHT_PUZZLE.child_move_table
+
+pack = EIGHT_PUZZLE.pack
+unpack = EIGHT_PUZZLE.unpack
+blank_index = EIGHT_PUZZLE.blank_index
+tile_at = EIGHT_PUZZLE.tile_at
+move_blank = EIGHT_PUZZLE.move_blank
+undo_move = EIGHT_PUZZLE.undo_move
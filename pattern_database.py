@@ -0,0 +1,127 @@
+import os
+from collections import deque
+from typing import Deque, Tuple
+
+from packed_state import geometry_for
+from permutation_rank import partial_permutation_count, rank_positions
+
+GridStateTuple = Tuple[int, ...]
+Pattern = Tuple[int, ...]  # The tiles tracked by one pattern database
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "pattern_databases"
+)
+UNREACHED = 0xFF
+
+
+def build_pattern_database(
+    goal_state_tuple: GridStateTuple, pattern: Pattern
+) -> bytearray:
+    """
+    Computes how many moves of the pattern tiles each placement of them needs.
+
+    The search runs backwards from the goal over abstract states made of the
+    pattern tiles' cells and the blank's cell. Moving a pattern tile costs 1 and
+    moving any other tile costs 0, so databases built for disjoint patterns can
+    be added together and remain admissible. Each entry keeps the cheapest cost
+    over all blank cells.
+
+    Args:
+        goal_state_tuple: The goal configuration.
+        pattern: The tiles to track, in the order used to rank their cells.
+
+    Returns:
+        One byte per placement, indexed by rank_positions() of the tiles' cells.
+    """
+    geometry = geometry_for(len(goal_state_tuple))
+    num_cells = geometry.num_cells
+    move_table = geometry.move_table
+    goal_positions = {tile: index for index, tile in enumerate(goal_state_tuple)}
+    placement_count = partial_permutation_count(len(pattern), num_cells)
+
+    table = bytearray([UNREACHED]) * placement_count
+    # Best known cost of every (placement, blank cell) abstract state.
+    costs = bytearray([UNREACHED]) * (placement_count * num_cells)
+
+    start_positions = tuple(goal_positions[tile] for tile in pattern)
+    start_blank = goal_positions[0]
+    costs[rank_positions(start_positions, num_cells) * num_cells + start_blank] = 0
+
+    # 0-1 BFS: free moves go to the front of the deque, paid moves to the back.
+    queue: Deque[Tuple[Tuple[int, ...], int, int]] = deque(
+        [(start_positions, start_blank, 0)]
+    )
+    while queue:
+        positions, blank, cost = queue.popleft()
+        placement_rank = rank_positions(positions, num_cells)
+        if cost > costs[placement_rank * num_cells + blank]:
+            continue  # A cheaper route to this state was found later
+        if cost < table[placement_rank]:
+            table[placement_rank] = cost
+
+        for _, target_index, _, _ in move_table[blank]:
+            if target_index in positions:
+                next_positions = tuple(
+                    blank if position == target_index else position
+                    for position in positions
+                )
+                next_rank = rank_positions(next_positions, num_cells)
+                next_cost = cost + 1
+            else:
+                next_positions = positions
+                next_rank = placement_rank
+                next_cost = cost
+
+            key = next_rank * num_cells + target_index
+            if next_cost < costs[key]:
+                costs[key] = next_cost
+                if next_cost == cost:
+                    queue.appendleft((next_positions, target_index, next_cost))
+                else:
+                    queue.append((next_positions, target_index, next_cost))
+    return table
+
+
+def load_pattern_database(
+    goal_state_tuple: GridStateTuple,
+    pattern: Pattern,
+    cache_directory: str = DEFAULT_CACHE_DIRECTORY,
+) -> bytes:
+    """
+    Reads a pattern database from the on-disk cache, building it on a miss.
+
+    Args:
+        goal_state_tuple: The goal configuration.
+        pattern: The tiles tracked by the database.
+        cache_directory: Directory holding one file per (goal, pattern).
+
+    Returns:
+        The database, indexed by rank_positions() of the pattern tiles' cells.
+
+    Raises:
+        ValueError: If a cached file does not hold one byte per placement.
+    """
+    file_name = "pdb_{}_{}.bin".format(
+        "-".join(str(tile) for tile in goal_state_tuple),
+        "-".join(str(tile) for tile in pattern),
+    )
+    path = os.path.join(cache_directory, file_name)
+
+    if not os.path.exists(path):
+        table = build_pattern_database(goal_state_tuple, pattern)
+        os.makedirs(cache_directory, exist_ok=True)
+        # Write to a temporary name first so readers never see a partial file.
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as database_file:
+            database_file.write(table)
+        os.replace(temporary_path, path)
+
+    with open(path, "rb") as database_file:
+        table = database_file.read()
+
+    expected_size = partial_permutation_count(len(pattern), len(goal_state_tuple))
+    if len(table) != expected_size:
+        raise ValueError(
+            f"{path} holds {len(table)} bytes, expected one per placement ({expected_size})."
+        )
+    return table
@@ -0,0 +1,186 @@
+from math import factorial
+from typing import List, Sequence, Tuple
+
+from packed_state import (
+    BLANK_MASK,
+    CELL_SHIFTS,
+    NO_MOVE,
+    NUM_CELLS,
+    TILE_BITS,
+    TILE_MASK,
+    PackedState,
+    undo_move,
+)
+
+# Only half of the orderings of the tiles are reachable from any given board:
+# sliding the blank sideways leaves the row-major order of the tiles unchanged,
+# and sliding it up or down moves one tile past two others, which never changes
+# the parity of that order. A board is therefore ranked as
+#
+#     blank index * (8! / 2) + (Lehmer rank of the tile order) // 2
+#
+# Orders that differ only by swapping their last two tiles have consecutive
+# Lehmer ranks and opposite parities, so halving the rank is a bijection onto
+# each parity class and every reachable board gets a dense index.
+NUM_TILES = NUM_CELLS - 1
+HALF_TILE_ORDERS = factorial(NUM_TILES) // 2
+STATE_COUNT = NUM_CELLS * HALF_TILE_ORDERS  # 9! / 2 = 181,440
+
+# Ranks fit comfortably in 18 bits.
+RANK_BITS = STATE_COUNT.bit_length()
+RANK_MASK = (1 << RANK_BITS) - 1
+
+# Sliding the blank sideways keeps the tile order, so only the blank index part
+# of the rank changes. Indexed by move; 0 means the neighbor must be re-ranked.
+SIDEWAYS_RANK_DELTAS: Tuple[int, ...] = (0, 0, -HALF_TILE_ORDERS, HALF_TILE_ORDERS)
+
+
+# Shifts of the eight tile cells in row-major order, skipping the blank.
+_TILE_SHIFTS_BY_BLANK: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(shift for index, shift in enumerate(CELL_SHIFTS) if index != blank)
+    for blank in range(NUM_CELLS)
+)
+
+
+def rank(packed: PackedState) -> int:
+    """
+    Maps a packed board to its dense index in [0, STATE_COUNT).
+
+    Boards from the two parity classes share the same index range, so an index
+    is only meaningful together with the parity class of the search it came from.
+
+    Args:
+        packed: A packed board (see packed_state.py).
+
+    Returns:
+        The dense index of the board.
+    """
+    blank = packed & BLANK_MASK
+    s0, s1, s2, s3, s4, s5, s6, _ = _TILE_SHIFTS_BY_BLANK[blank]
+
+    # Lehmer digits in Horner form: each digit is the number of smaller tiles
+    # that have not been placed yet. The last digit is always 0 and the one
+    # before it is dropped by the halving, so the eighth tile is never read.
+    # Unrolled because this runs for every generated neighbor.
+    tile = (packed >> s0) & TILE_MASK
+    lehmer_rank = tile - 1
+    used = 1 << tile
+    tile = (packed >> s1) & TILE_MASK
+    lehmer_rank = lehmer_rank * 7 + tile - 1 - (used & ((1 << tile) - 1)).bit_count()
+    used |= 1 << tile
+    tile = (packed >> s2) & TILE_MASK
+    lehmer_rank = lehmer_rank * 6 + tile - 1 - (used & ((1 << tile) - 1)).bit_count()
+    used |= 1 << tile
+    tile = (packed >> s3) & TILE_MASK
+    lehmer_rank = lehmer_rank * 5 + tile - 1 - (used & ((1 << tile) - 1)).bit_count()
+    used |= 1 << tile
+    tile = (packed >> s4) & TILE_MASK
+    lehmer_rank = lehmer_rank * 4 + tile - 1 - (used & ((1 << tile) - 1)).bit_count()
+    used |= 1 << tile
+    tile = (packed >> s5) & TILE_MASK
+    lehmer_rank = lehmer_rank * 3 + tile - 1 - (used & ((1 << tile) - 1)).bit_count()
+    used |= 1 << tile
+    tile = (packed >> s6) & TILE_MASK
+    lehmer_rank = lehmer_rank * 2 + tile - 1 - (used & ((1 << tile) - 1)).bit_count()
+    return blank * HALF_TILE_ORDERS + (lehmer_rank >> 1)
+
+
+def tile_parity(packed: PackedState) -> int:
+    """
+    Returns the parity (0 or 1) of the row-major tile order of a packed board.
+
+    Every board reachable from a given start shares the start's tile parity.
+    """
+    inversions = 0
+    seen = 0
+    for shift in CELL_SHIFTS:
+        tile = (packed >> shift) & TILE_MASK
+        if tile:
+            inversions += (seen >> tile).bit_count()
+            seen |= 1 << tile
+    return inversions & 1
+
+
+def unrank(index: int, parity: int) -> PackedState:
+    """
+    Maps a dense index back to the packed board with the given tile parity.
+
+    Args:
+        index: A dense index produced by rank().
+        parity: The tile parity class of the board (see tile_parity()).
+
+    Returns:
+        The packed board.
+    """
+    blank, half_rank = divmod(index, HALF_TILE_ORDERS)
+    lehmer_rank = half_rank << 1
+
+    digits: List[int] = []
+    for remaining in range(1, NUM_TILES + 1):
+        lehmer_rank, digit = divmod(lehmer_rank, remaining)
+        digits.append(digit)
+    digits.reverse()
+
+    # The Lehmer digits sum to the number of inversions, so their parity tells
+    # us whether the order with the last two tiles swapped is the one we want.
+    if sum(digits) & 1 != parity:
+        digits[-2] = 1
+
+    unused = list(range(1, NUM_CELLS))
+    tiles = [unused.pop(digit) for digit in digits]
+    tiles.insert(blank, 0)
+
+    packed = 0
+    for tile in tiles:
+        packed = (packed << TILE_BITS) | tile
+    return (packed << TILE_BITS) | blank
+
+
+def trace_to_root(state: PackedState, parent_map: Sequence[int]) -> List[int]:
+    """
+    Follows recorded moves back from a state to the root of its search.
+
+    Args:
+        state: A packed state reached by the search that filled parent_map.
+        parent_map: Rank-indexed moves, with NO_MOVE at the root.
+
+    Returns:
+        The moves that led from the root to state, last move first.
+    """
+    moves: List[int] = []
+    move = parent_map[rank(state)]
+    while move != NO_MOVE:
+        moves.append(move)
+        state = undo_move(state, move)
+        move = parent_map[rank(state)]
+    return moves
+
+def partial_permutation_count(length: int, num_cells: int = NUM_CELLS) -> int:
+    """Returns the number of ways to place length distinct tiles on num_cells cells."""
+    return factorial(num_cells) // factorial(num_cells - length)
+
+
+def rank_positions(positions: Sequence[int], num_cells: int = NUM_CELLS) -> int:
+    """
+    Maps distinct cell positions of a fixed sequence of tiles to a dense index.
+
+    This is the Lehmer rank truncated after len(positions) digits, so the result
+    lies in [0, partial_permutation_count(len(positions), num_cells)).
+
+    Args:
+        positions: The cell of each tile, in a fixed tile order.
+        num_cells: The number of cells on the board.
+
+    Returns:
+        The dense index of the placement.
+    """
+    position_rank = 0
+    remaining = num_cells
+    used = 0
+    for position in positions:
+        position_rank = position_rank * remaining + (
+            position - (used & ((1 << position) - 1)).bit_count()
+        )
+        remaining -= 1
+        used |= 1 << position
+    return position_rank
@@ -0,0 +1,126 @@
+import time
+from typing import Optional
+
+# Values of SearchResult.cutoff_reason.
+MAX_EXPANSIONS = "max_expansions"
+TIME_LIMIT = "time_limit"
+MAX_OPEN_SIZE = "max_open_size"
+MAX_OPEN_BYTES = "max_open_bytes"
+
+# Rough size of one open-list entry: a (f, state, h) tuple, its ints and the
+# list slot that holds it. Used to turn a byte budget into an entry budget.
+ESTIMATED_OPEN_ENTRY_BYTES = 112
+
+# Expansions between two reads of the clock.
+CHECK_INTERVAL = 1024
+
+_NO_LIMIT = float("inf")
+
+
+class SearchBudget:
+    """
+    Limits on a single search, checked cheaply from its main loop.
+
+    A solver holds the expansion count at which to check next. Only when its
+    own counter reaches it does the solver call check(), which reads the clock
+    and compares the limits, then next_check() to get the next count. So the
+    loop pays one integer comparison per expansion. Checks are spaced so that
+    the expansion limit is exact and the open list overshoots its limit by at
+    most the branching factor.
+
+    A budget holds no state of its own and can be shared by any number of
+    searches, including across processes.
+    """
+
+    def __init__(
+        self,
+        max_expansions: Optional[int] = None,
+        time_limit: Optional[float] = None,
+        max_open_size: Optional[int] = None,
+        max_open_bytes: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_expansions: Most states to expand.
+            time_limit: Most wall-clock seconds to search.
+            max_open_size: Most entries the open list (or IDA* stack) may hold.
+            max_open_bytes: Most estimated bytes the open list may use.
+
+        Raises:
+            ValueError: If a limit is not positive.
+        """
+        for name, limit in (
+            ("max_expansions", max_expansions),
+            ("time_limit", time_limit),
+            ("max_open_size", max_open_size),
+            ("max_open_bytes", max_open_bytes),
+        ):
+            if limit is not None and limit <= 0:
+                raise ValueError(f"{name} must be positive.")
+
+        self.max_expansions: Optional[int] = max_expansions
+        self.time_limit: Optional[float] = time_limit
+        self.max_open_size: Optional[int] = max_open_size
+        self.max_open_bytes: Optional[int] = max_open_bytes
+
+        # The open-list limits as one entry count.
+        open_limit = _NO_LIMIT
+        if max_open_size is not None:
+            open_limit = max_open_size
+        if max_open_bytes is not None:
+            open_limit = min(
+                open_limit, max_open_bytes // ESTIMATED_OPEN_ENTRY_BYTES
+            )
+        self._open_limit = open_limit
+
+    def __repr__(self) -> str:
+        return (
+            f"SearchBudget(max_expansions={self.max_expansions}, "
+            f"time_limit={self.time_limit}, max_open_size={self.max_open_size}, "
+            f"max_open_bytes={self.max_open_bytes})"
+        )
+
+    def check(
+        self, num_expanded_nodes: int, open_size: int, start_time: float
+    ) -> Optional[str]:
+        """
+        Tells whether a search has used up its budget.
+
+        Args:
+            num_expanded_nodes: States expanded so far.
+            open_size: Entries currently in the open list.
+            start_time: time.perf_counter() when the search started.
+
+        Returns:
+            The name of the exhausted limit (MAX_EXPANSIONS, TIME_LIMIT,
+            MAX_OPEN_SIZE or MAX_OPEN_BYTES), or None to keep searching.
+        """
+        max_expansions = self.max_expansions
+        if max_expansions is not None and num_expanded_nodes >= max_expansions:
+            return MAX_EXPANSIONS
+        if open_size >= self._open_limit:
+            if self.max_open_size is not None and open_size >= self.max_open_size:
+                return MAX_OPEN_SIZE
+            return MAX_OPEN_BYTES
+        if (
+            self.time_limit is not None
+            and time.perf_counter() - start_time >= self.time_limit
+        ):
+            return TIME_LIMIT
+        return None
+
+    def next_check(self, num_expanded_nodes: int, open_size: int) -> float:
+        """
+        Returns the expansion count at which check() should be called next.
+
+        Each expansion adds at most three entries to the open list, one per
+        child other than the parent, so the open list cannot pass its limit
+        before then.
+        """
+        next_count = num_expanded_nodes + CHECK_INTERVAL
+        if self.max_expansions is not None:
+            next_count = min(next_count, self.max_expansions)
+        if self._open_limit != _NO_LIMIT:
+            room = self._open_limit - open_size
+            next_count = min(next_count, num_expanded_nodes + max(1, room // 3))
+        return next_count
@@ -0,0 +1,125 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from solution_path import SolutionPath
+
+GridStateTuple = Tuple[int, ...]
+
+# Values of SearchResult.status.
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"  # The goal cannot be reached from the start
+CUTOFF = "cutoff"  # The search ran out of its SearchBudget first
+
+# Tuple layouts the solvers used to return, kept for unpacking.
+UCS_SHAPE = "ucs"  # (path, depth, max_queue_size, num_expanded_nodes)
+ASTAR_SHAPE = "astar"  # The UCS fields plus (time_cost, gh_map, g values, h values)
+
+
+class SearchResult:
+    """
+    The outcome of a single solve() call.
+
+    Iterating over a result yields the tuple its solver used to return, so
+    existing code such as `path, depth, max_queue, expanded = solver.solve()`
+    keeps working. New code should read the attributes instead: timings are
+    numeric, and the explored-state map is only present when it was requested.
+    """
+
+    __slots__ = (
+        "status",
+        "path",
+        "depth",
+        "max_queue_size",
+        "num_expanded_nodes",
+        "elapsed_seconds",
+        "g_values",
+        "h_values",
+        "explored",
+        "shape",
+        "suboptimality_bound",
+        "cutoff_reason",
+        "f_bound",
+    )
+
+    def __init__(
+        self,
+        status: str,
+        path: Optional[SolutionPath] = None,
+        max_queue_size: int = 0,
+        num_expanded_nodes: int = 0,
+        elapsed_seconds: float = 0.0,
+        g_values: Optional[List[int]] = None,
+        h_values: Optional[List[int]] = None,
+        explored: Optional[Dict[GridStateTuple, Tuple[int, int]]] = None,
+        shape: str = UCS_SHAPE,
+        suboptimality_bound: float = 1.0,
+        cutoff_reason: Optional[str] = None,
+        f_bound: Optional[int] = None,
+    ):
+        """
+        Args:
+            status: SOLVED, UNSOLVABLE or CUTOFF.
+            path: The solution, or None if there is none.
+            max_queue_size: The largest the open list or stack grew.
+            num_expanded_nodes: The number of states expanded.
+            elapsed_seconds: Wall-clock time spent in solve().
+            g_values: g(n) of every state on the path (empty without a path).
+            h_values: h(n) of every state on the path (empty without a path).
+            explored: (g, h) of every explored state, if the caller asked for it.
+            shape: The legacy tuple layout, UCS_SHAPE or ASTAR_SHAPE.
+            suboptimality_bound: A proven bound on depth / optimal depth; 1.0
+                for optimal solutions.
+            cutoff_reason: Which limit of the search's budget ran out (see
+                search_budget.py), for CUTOFF results.
+            f_bound: For CUTOFF results, the best proven lower bound on the
+                solution depth that the search reached, or None if it has none.
+        """
+        self.status: str = status
+        self.path: Optional[SolutionPath] = path
+        self.depth: Optional[int] = len(path) - 1 if path is not None else None
+        self.max_queue_size: int = max_queue_size
+        self.num_expanded_nodes: int = num_expanded_nodes
+        self.elapsed_seconds: float = elapsed_seconds
+        self.g_values: List[int] = g_values if g_values is not None else []
+        self.h_values: List[int] = h_values if h_values is not None else []
+        self.explored: Optional[Dict[GridStateTuple, Tuple[int, int]]] = explored
+        self.shape: str = shape
+        self.suboptimality_bound: float = suboptimality_bound
+        self.cutoff_reason: Optional[str] = cutoff_reason
+        self.f_bound: Optional[int] = f_bound
+
+    @property
+    def solved(self) -> bool:
+        return self.status == SOLVED
+
+    def as_tuple(self) -> Tuple[Any, ...]:
+        """Returns the tuple the solver used to return (see UCS_SHAPE and ASTAR_SHAPE)."""
+        fields = (self.path, self.depth, self.max_queue_size, self.num_expanded_nodes)
+        if self.shape == UCS_SHAPE:
+            return fields
+        return fields + (
+            f"{self.elapsed_seconds:.4f}",
+            self.explored if self.explored is not None else {},
+            self.g_values,
+            self.h_values,
+        )
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.as_tuple())
+
+    def __len__(self) -> int:
+        return len(self.as_tuple())
+
+    def __getitem__(self, index):
+        return self.as_tuple()[index]
+
+    def __repr__(self) -> str:
+        cutoff = ""
+        if self.status == CUTOFF:
+            cutoff = f"cutoff_reason={self.cutoff_reason!r}, f_bound={self.f_bound}, "
+        return (
+            f"SearchResult(status={self.status!r}, {cutoff}depth={self.depth}, "
+            f"moves={self.path.moves if self.path is not None else None!r}, "
+            f"max_queue_size={self.max_queue_size}, "
+            f"num_expanded_nodes={self.num_expanded_nodes}, "
+            f"elapsed_seconds={self.elapsed_seconds:.4f})"
+        )
@@ -0,0 +1,220 @@
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from packed_state import PackedState
+from search_result import SearchResult
+
+# Keys of SearchStats.phase_seconds.
+EXPAND_PHASE = "expand"  # Everything in a search but the two phases below
+HEURISTIC_PHASE = "heuristic"
+QUEUE_PHASE = "queue"  # Open-list pushes and pops
+PHASES = (EXPAND_PHASE, HEURISTIC_PHASE, QUEUE_PHASE)
+
+# on_expand(state, g, h): the packed state (in the search's canonical frame,
+# see goal_relabeling.py) and its g and h, None where the solver has none.
+ExpandCallback = Callable[[PackedState, Optional[int], Optional[int]], None]
+# on_improvement(depth, num_expanded_nodes): a better solution was found.
+ImprovementCallback = Callable[[int, int], None]
+
+
+class SearchStats:
+    """
+    Opt-in counters, per-phase timers and callbacks for the searching solvers.
+
+    Pass one as `stats=` to UniformCostSearch, ManhattanMisplacedHandler (solve()
+    and solve_anytime()), IDAStarSearch, LayerBFSSearch or FrontierSearch.
+    Without one, a solver runs the code it always ran plus one `is not None`
+    test per expansion. With one, it counts in its expansion step and swaps its
+    heuristic and open-list functions for counting wrappers, so nothing is
+    added per generated neighbor. Breadth-first layer searches count a whole
+    layer at a time.
+
+    Counters add up over every search the object is passed to. A counter that
+    does not apply to a solver stays 0 (UCS has no heuristic, and IDA* keeps no
+    open list, so it never prunes duplicates or reopens states).
+
+    Phase timers read the clock around every heuristic call and open-list
+    operation, which makes a timed search noticeably slower. Compare phases
+    within a timed run, not with untimed ones.
+    """
+
+    def __init__(
+        self,
+        timers: bool = False,
+        on_expand: Optional[ExpandCallback] = None,
+        on_improvement: Optional[ImprovementCallback] = None,
+    ):
+        """
+        Args:
+            timers: Also time the expand, heuristic and queue phases.
+            on_expand: Called for every expanded state (see ExpandCallback).
+            on_improvement: Called whenever a search finds a solution better
+                            than any it found before: once per solve() for the
+                            optimal searches, more often for solution-cache
+                            incumbents and ARA* (see ImprovementCallback).
+        """
+        self.timers: bool = timers
+        self.on_expand: Optional[ExpandCallback] = on_expand
+        self.on_improvement: Optional[ImprovementCallback] = on_improvement
+
+        self.searches: int = 0
+        self.expanded: int = 0  # States whose neighbors were generated
+        self.generated: int = 0  # Neighbors of the expanded states
+        self.pushed: int = 0  # Neighbors added to the open list or queue
+        self.stale_pops: int = 0  # Entries superseded by a cheaper path, popped
+        self.reopened: int = 0  # Expansions of an already expanded state
+        # Partially expanded states put back in the open list (EPEA*)
+        self.requeued: int = 0
+        self.heuristic_calls: int = 0
+        self.phase_seconds: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self._timed_seconds: float = 0.0
+
+    @property
+    def duplicates(self) -> int:
+        """Neighbors dropped because the search had reached them as cheaply."""
+        return self.generated - self.pushed
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value}" for name, value in self.as_dict().items())
+        return f"SearchStats({fields})"
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the counters, and the phase times if timed, as plain values."""
+        values: Dict[str, Any] = {
+            "searches": self.searches,
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "duplicates": self.duplicates,
+            "stale_pops": self.stale_pops,
+            "reopened": self.reopened,
+            "requeued": self.requeued,
+            "heuristic_calls": self.heuristic_calls,
+        }
+        if self.timers:
+            for phase, seconds in self.phase_seconds.items():
+                values[f"{phase}_seconds"] = round(seconds, 6)
+        return values
+
+    def measure(self, search: Callable[[], SearchResult]) -> SearchResult:
+        """
+        Runs one search for a solver, counting it and timing its expand phase.
+
+        The expand phase is the search's elapsed time minus what the wrapped
+        heuristic and open-list functions measured during it.
+        """
+        self.searches += 1
+        timed_before = self._timed_seconds
+        result = search()
+        self._add_expand_time(result.elapsed_seconds, timed_before)
+        return result
+
+    def measure_anytime(
+        self, results: Iterator[SearchResult]
+    ) -> Iterator[SearchResult]:
+        """
+        Passes on the results of an anytime search, like measure() does for one.
+
+        Their elapsed_seconds must be cumulative, as ARA*'s are.
+        """
+        self.searches += 1
+        timed_before = self._timed_seconds
+        elapsed_before = 0.0
+        for result in results:
+            self._add_expand_time(result.elapsed_seconds - elapsed_before, timed_before)
+            timed_before = self._timed_seconds
+            elapsed_before = result.elapsed_seconds
+            yield result
+
+    def _add_expand_time(self, elapsed_seconds: float, timed_before: float) -> None:
+        if self.timers:
+            self.phase_seconds[EXPAND_PHASE] += max(
+                0.0, elapsed_seconds - (self._timed_seconds - timed_before)
+            )
+
+    def record_expansion(
+        self,
+        state: PackedState,
+        g: Optional[int],
+        h: Optional[int],
+        num_children: int,
+    ) -> None:
+        """Counts one expansion and its generated neighbors."""
+        self.expanded += 1
+        self.generated += num_children
+        if self.on_expand is not None:
+            self.on_expand(state, g, h)
+
+    def record_layer(
+        self, states: Iterable[PackedState], num_generated: int, num_new: int
+    ) -> None:
+        """
+        Counts the expansion of a whole breadth-first layer at once.
+
+        Args:
+            states: The packed states of the layer (a set, list or NumPy array).
+            num_generated: Neighbors generated from them, duplicates included.
+            num_new: Neighbors kept for the next layer.
+        """
+        states = list(states) if self.on_expand is not None else states
+        self.expanded += len(states)
+        self.generated += num_generated
+        self.pushed += num_new
+        if self.on_expand is not None:
+            for state in states:
+                self.on_expand(int(state), None, None)
+
+    def record_improvement(self, depth: int, num_expanded_nodes: int) -> None:
+        """Reports a solution better than the search's previous best."""
+        if self.on_improvement is not None:
+            self.on_improvement(depth, num_expanded_nodes)
+
+    def wrap_heuristic(self, function: Optional[Callable]) -> Optional[Callable]:
+        """Wraps a heuristic (or its incremental update) to count its calls."""
+        if function is None:
+            return None
+        if self.timers:
+            return self._timed(function, HEURISTIC_PHASE, "heuristic_calls")
+
+        def counted(*args):
+            self.heuristic_calls += 1
+            return function(*args)
+
+        return counted
+
+    def wrap_push(self, function: Callable, counter: str = "pushed") -> Callable:
+        """
+        Wraps an open-list push (or queue append) to count neighbors pushed, or
+        the pushes of another counter, such as "requeued".
+        """
+        if self.timers:
+            return self._timed(function, QUEUE_PHASE, counter)
+
+        def counted(*args):
+            setattr(self, counter, getattr(self, counter) + 1)
+            return function(*args)
+
+        return counted
+
+    def wrap_pop(self, function: Callable) -> Callable:
+        """Wraps an open-list pop to time it; pops are not counted."""
+        if self.timers:
+            return self._timed(function, QUEUE_PHASE, None)
+        return function
+
+    def _timed(
+        self, function: Callable, phase: str, counter: Optional[str]
+    ) -> Callable:
+        clock = time.perf_counter
+        phase_seconds = self.phase_seconds
+
+        def timed(*args):
+            started = clock()
+            value = function(*args)
+            seconds = clock() - started
+            phase_seconds[phase] += seconds
+            self._timed_seconds += seconds
+            if counter is not None:
+                setattr(self, counter, getattr(self, counter) + 1)
+            return value
+
+        return timed
@@ -0,0 +1,140 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from packed_state import NO_MOVE, BoardGeometry, GridState, PackedState, geometry_for
+from solution_path import MOVE_LETTERS, SolutionPath, decode_moves
+
+CacheKey = Tuple[PackedState, PackedState]  # (packed goal, packed state)
+CacheEntry = Tuple[int, int]  # (distance to the goal, next blank move)
+
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+
+class SolutionCache:
+    """
+    Remembers the exact distance to the goal of every state on solved paths.
+
+    Each state on an optimal path is stored with its remaining distance and the
+    blank move that continues the path, so any later query that reaches one of
+    these states can finish by following the stored moves. The cache can be
+    shared by any number of solvers and goals, holds at most max_entries states,
+    and evicts the least recently used ones first.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries: The most states to keep.
+
+        Raises:
+            ValueError: If max_entries is smaller than 1.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+
+        self.max_entries: int = max_entries
+        # (goal, state) -> (distance, next move), least recently used first.
+        # Solvers probe it with entries.get() while searching.
+        self.entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self.hits: int = 0  # lookup() calls answered from the cache
+        self.misses: int = 0  # lookup() calls that were not
+        self.joins: int = 0  # Searches that finished along a cached path
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self) -> None:
+        """Drops every entry and resets the counters."""
+        self.entries.clear()
+        self.hits = self.misses = self.joins = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the size and counters of the cache."""
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "joins": self.joins,
+        }
+
+    def record(self, path: SolutionPath, goal_state: GridState) -> None:
+        """
+        Stores every state of an optimal solution.
+
+        Only pass paths that are known to be shortest: the stored distances are
+        used as exact values by later searches.
+
+        Args:
+            path: A shortest path ending at goal_state.
+            goal_state: The goal the path was solved for.
+        """
+        geometry = geometry_for(len(goal_state))
+        goal = geometry.pack(goal_state)
+        entries = self.entries
+        states = list(path.packed_states())
+        moves = decode_moves(path.moves) + [NO_MOVE]
+        distance = len(states) - 1
+        # Record the goal end first so the start ends up most recently used.
+        for index in range(distance, -1, -1):
+            key = (goal, states[index])
+            entries[key] = (distance - index, moves[index])
+            entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def suffix_moves(
+        self, state: PackedState, goal: PackedState, geometry: BoardGeometry
+    ) -> Optional[str]:
+        """
+        Follows the stored moves from a state to the goal.
+
+        Args:
+            state: A packed state.
+            goal: The packed goal.
+            geometry: The layout both were packed with.
+
+        Returns:
+            The move string from state to the goal, or None if state is not
+            cached or part of its path has since been evicted.
+        """
+        entries = self.entries
+        entry = entries.get((goal, state))
+        if entry is None:
+            return None
+        letters = []
+        distance, move = entry
+        while distance:
+            entries.move_to_end((goal, state))
+            letters.append(MOVE_LETTERS[move])
+            state = geometry.move_blank(
+                state, (state & geometry.blank_mask) + geometry.move_deltas[move]
+            )
+            entry = entries.get((goal, state))
+            if entry is None or entry[0] != distance - 1:
+                return None
+            distance, move = entry
+        entries.move_to_end((goal, state))
+        return "".join(letters)
+
+    def lookup(
+        self, start_state: GridState, goal_state: GridState
+    ) -> Optional[SolutionPath]:
+        """
+        Answers a query from the cache if its start state was seen on a solved path.
+
+        Args:
+            start_state: The initial configuration of the puzzle.
+            goal_state: The target configuration of the puzzle.
+
+        Returns:
+            A shortest path from start_state to goal_state, or None on a miss.
+        """
+        geometry = geometry_for(len(goal_state))
+        moves = self.suffix_moves(
+            geometry.pack(start_state), geometry.pack(goal_state), geometry
+        )
+        if moves is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return SolutionPath(start_state, moves)
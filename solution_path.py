@@ -0,0 +1,114 @@
+from collections.abc import Sequence
+from typing import Iterable, Iterator, List, Union
+
+from packed_state import BoardGeometry, GridState, PackedState, geometry_for
+
+# One letter per blank move, indexed by MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT.
+# The letter names the direction the blank slides.
+MOVE_LETTERS = "UDLR"
+_MOVE_CODES = {letter: move for move, letter in enumerate(MOVE_LETTERS)}
+
+
+def encode_moves(moves: Iterable[int]) -> str:
+    """Converts blank moves (MOVE_UP..MOVE_RIGHT) into a move string such as 'RDLU'."""
+    return "".join(MOVE_LETTERS[move] for move in moves)
+
+
+def decode_moves(move_string: str) -> List[int]:
+    """
+    Converts a move string back into blank moves.
+
+    Raises:
+        ValueError: If the string contains a letter other than U, D, L or R.
+    """
+    try:
+        return [_MOVE_CODES[letter] for letter in move_string]
+    except KeyError as error:
+        raise ValueError(f"Invalid move letter {error}; use {MOVE_LETTERS}.") from None
+
+
+class SolutionPath(Sequence):
+    """
+    A solution stored as its start board and a move string.
+
+    It behaves like the list of boards from start to goal that the solvers used
+    to return (len(), indexing, iteration, slicing), but a board is only built
+    when it is read. Reading boards in order replays one move per board.
+    """
+
+    __slots__ = ("start_state", "moves", "_geometry", "_cursor_index", "_cursor_state")
+
+    def __init__(self, start_state: GridState, moves: str):
+        """
+        Args:
+            start_state: The board the moves start from.
+            moves: The blank moves of the solution, one letter each (see MOVE_LETTERS).
+
+        Raises:
+            ValueError: If start_state is not a square board.
+        """
+        self.start_state: GridState = list(start_state)
+        self.moves: str = moves
+        self._geometry: BoardGeometry = geometry_for(len(start_state))
+        # Last board read by index, so reading boards in order stays O(1) each.
+        self._cursor_index: int = 0
+        self._cursor_state: PackedState = self._geometry.pack(self.start_state)
+
+    def __len__(self) -> int:
+        return len(self.moves) + 1
+
+    def _apply(self, state: PackedState, letter: str) -> PackedState:
+        geometry = self._geometry
+        return geometry.move_blank(
+            state,
+            (state & geometry.blank_mask) + geometry.move_deltas[_MOVE_CODES[letter]],
+        )
+
+    def packed_states(self) -> Iterator[PackedState]:
+        """Yields the packed boards of the path, from start to goal."""
+        state = self._geometry.pack(self.start_state)
+        yield state
+        for letter in self.moves:
+            state = self._apply(state, letter)
+            yield state
+
+    def __iter__(self) -> Iterator[GridState]:
+        unpack = self._geometry.unpack
+        for state in self.packed_states():
+            yield unpack(state)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SolutionPath index out of range")
+
+        if index < self._cursor_index:
+            self._cursor_index = 0
+            self._cursor_state = self._geometry.pack(self.start_state)
+        state = self._cursor_state
+        for letter in self.moves[self._cursor_index : index]:
+            state = self._apply(state, letter)
+        self._cursor_index = index
+        self._cursor_state = state
+        return self._geometry.unpack(state)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SolutionPath):
+            return self.start_state == other.start_state and self.moves == other.moves
+        if isinstance(other, list):
+            return len(other) == len(self) and all(
+                board == other_board for board, other_board in zip(self, other)
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SolutionPath({self.start_state!r}, {self.moves!r})"
+
+    def __getstate__(self):
+        return (self.start_state, self.moves)
+
+    def __setstate__(self, state) -> None:
+        self.__init__(*state)
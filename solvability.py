@@ -0,0 +1,93 @@
+from typing import Any, Optional
+
+from packed_state import GridState, geometry_for
+
+
+def validate_board(state: Any, name: str, num_cells: Optional[int] = None) -> None:
+    """
+    Checks that a value is a well-formed board.
+
+    A board is a list holding each of 0 .. num_cells - 1 exactly once, where
+    num_cells is the size of a square board (9 for the 8-puzzle).
+
+    Args:
+        state: The value to check.
+        name: How to refer to the value in error messages, e.g. 'start_state'.
+        num_cells: The required size, or None to accept any square size.
+
+    Raises:
+        ValueError: If state is not a board of the required size.
+    """
+    if num_cells is None:
+        num_cells = len(state) if isinstance(state, list) else 0
+    if not isinstance(state, list) or len(state) != num_cells:
+        raise ValueError(f"{name} must be a list of {num_cells} integers.")
+    geometry_for(num_cells)  # Raises for sizes that are not square boards
+    seen = bytearray(num_cells)
+    for tile in state:
+        if type(tile) is not int or not 0 <= tile < num_cells or seen[tile]:
+            raise ValueError(
+                f"{name} must contain each of 0 to {num_cells - 1} exactly once."
+            )
+        seen[tile] = 1
+
+
+def validate_puzzle(
+    start_state: Any, goal_state: Any, num_cells: Optional[int] = None
+) -> None:
+    """
+    Checks that a start and goal are well-formed boards of the same size.
+
+    Args:
+        start_state: The initial configuration of the puzzle.
+        goal_state: The target configuration of the puzzle.
+        num_cells: The required size, or None to accept any square size.
+
+    Raises:
+        ValueError: If either board is malformed or their sizes differ.
+    """
+    validate_board(goal_state, "goal_state", num_cells)
+    validate_board(start_state, "start_state", len(goal_state))
+
+
+def is_solvable(start_state: GridState, goal_state: GridState) -> bool:
+    """
+    Tells whether the goal can be reached from the start, in O(number of cells).
+
+    Every move swaps the blank with a neighbouring tile: it flips the parity of
+    the board's permutation (blank included) and moves the blank one cell. So
+    the permutation parity from start to goal must equal the parity of the
+    blank's taxicab distance between them. On square boards the converse holds
+    too, for odd and even widths alike.
+
+    Args:
+        start_state: A well-formed board (see validate_puzzle()).
+        goal_state: A well-formed board of the same size.
+
+    Returns:
+        True if a sequence of moves leads from start_state to goal_state.
+    """
+    num_cells = len(goal_state)
+    width = geometry_for(num_cells).width
+
+    # Permutation taking each cell of the start to where its tile is in the goal.
+    goal_index = [0] * num_cells
+    for index, tile in enumerate(goal_state):
+        goal_index[tile] = index
+    destination = [goal_index[tile] for tile in start_state]
+
+    # A permutation's parity is that of (number of cells - number of cycles).
+    visited = bytearray(num_cells)
+    cycles = 0
+    for index in range(num_cells):
+        if not visited[index]:
+            cycles += 1
+            while not visited[index]:
+                visited[index] = 1
+                index = destination[index]
+    permutation_parity = (num_cells - cycles) & 1
+
+    start_row, start_col = divmod(start_state.index(0), width)
+    goal_row, goal_col = divmod(goal_index[0], width)
+    blank_distance = abs(start_row - goal_row) + abs(start_col - goal_col)
+    return permutation_parity == blank_distance & 1
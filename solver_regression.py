@@ -0,0 +1,152 @@
+import argparse
+import sys
+from typing import List, Optional, Sequence
+
+from batch_solver import make_solver
+from benchmark import generate_instances
+from layer_bfs_handler import NUMPY_AVAILABLE
+from packed_state import geometry_for
+from search_result import SOLVED, UNSOLVABLE, SearchResult
+from solvability import is_solvable
+
+# Every solver family, run towards goals that need relabeling (see
+# goal_relabeling.py), so a regression in the canonical frame shows up here.
+DEFAULT_ALGORITHMS = [
+    "ucs",
+    "bidirectional",
+    "database",
+    "astar:misplaced",
+    "astar:manhattan",
+    "astar:pdb_4_4",
+    "epea:manhattan",
+    "idastar:manhattan",
+    "frontier_bfs",
+    "frontier:manhattan",
+] + (["layer_bfs"] if NUMPY_AVAILABLE else [])
+
+# One goal per canonical class (blank in a corner, on an edge, in the centre),
+# none of them a canonical goal itself.
+DEFAULT_GOALS = [
+    [0, 1, 2, 3, 4, 5, 6, 7, 8],
+    [1, 0, 2, 3, 4, 5, 6, 7, 8],
+    [8, 7, 6, 5, 0, 4, 3, 2, 1],
+]
+DEFAULT_DEPTHS = [0, 1, 2, 3, 7, 12, 17, 22, 27, 30, 31]
+DEFAULT_SEED = 15
+
+
+def path_error(
+    result: SearchResult, start_state: List[int], goal_state: List[int]
+) -> Optional[str]:
+    """
+    Checks that a result's path is a legal walk from start_state to goal_state.
+
+    Returns:
+        What is wrong with the path, or None if it is valid.
+    """
+    path = [list(board) for board in result.path]
+    if path[0] != list(start_state):
+        return "the path does not start at the start state"
+    if path[-1] != list(goal_state):
+        return "the path does not end at the goal"
+    width = geometry_for(len(goal_state)).width
+    for board, next_board in zip(path, path[1:]):
+        blank, next_blank = board.index(0), next_board.index(0)
+        (row, col), (next_row, next_col) = divmod(blank, width), divmod(
+            next_blank, width
+        )
+        swapped = list(board)
+        swapped[blank], swapped[next_blank] = swapped[next_blank], 0
+        if abs(row - next_row) + abs(col - next_col) != 1 or swapped != next_board:
+            return f"{board} -> {next_board} is not a single move"
+    return None
+
+
+def run_regression(
+    algorithms: Sequence[str] = DEFAULT_ALGORITHMS,
+    goals: Sequence[List[int]] = DEFAULT_GOALS,
+    depths: Sequence[int] = DEFAULT_DEPTHS,
+    seed: int = DEFAULT_SEED,
+    progress: Optional[object] = None,
+) -> List[str]:
+    """
+    Solves instances of known optimal depth with every algorithm and goal.
+
+    Instances come from benchmark.generate_instances(), which draws them from
+    an exhaustive BFS distance table and verifies that table state by state.
+    Every solver must return a valid path of exactly the oracle depth, and
+    UNSOLVABLE for a start of the other parity class.
+
+    Args:
+        algorithms: Names accepted by batch_solver.make_solver().
+        goals: The goals to solve towards.
+        depths: The optimal depths to draw one instance each from.
+        seed: Seed of the instance draw.
+        progress: A stream to report each algorithm and goal on, or None.
+
+    Returns:
+        A description of every failure; empty if all runs were correct.
+    """
+    failures: List[str] = []
+    for goal_state in goals:
+        instances = generate_instances(1, seed, goal_state, depths)
+        # Swapping two tiles changes the parity class.
+        unsolvable_start = list(goal_state)
+        first, second = [i for i, tile in enumerate(goal_state) if tile][:2]
+        unsolvable_start[first], unsolvable_start[second] = (
+            goal_state[second],
+            goal_state[first],
+        )
+        assert not is_solvable(unsolvable_start, goal_state)
+
+        for algorithm in algorithms:
+            label = f"{algorithm} towards {goal_state}"
+            for depth, start_state in instances:
+                result = make_solver(algorithm, start_state, goal_state).solve()
+                if result.status != SOLVED:
+                    error = f"status {result.status}"
+                elif result.depth != depth:
+                    error = f"depth {result.depth}, expected {depth}"
+                else:
+                    error = path_error(result, start_state, goal_state)
+                if error is not None:
+                    failures.append(f"{label} from {start_state}: {error}")
+
+            result = make_solver(algorithm, unsolvable_start, goal_state).solve()
+            if result.status != UNSOLVABLE:
+                failures.append(
+                    f"{label} from {unsolvable_start}: status {result.status}, "
+                    "expected unsolvable"
+                )
+            if progress is not None:
+                print(f"{label}: {len(instances) + 1} runs", file=progress, flush=True)
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check every solver against an exhaustive BFS oracle."
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithms",
+        default=",".join(DEFAULT_ALGORITHMS),
+        help="Comma-separated algorithm names (default: all of them).",
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    try:
+        failures = run_regression(
+            args.algorithms.split(","), seed=args.seed, progress=sys.stderr
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(failures)} failures", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,387 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from batch_solver import (
+    DEFAULT_GOAL_STATE,
+    check_stats_support,
+    make_solver,
+    prepare_algorithm,
+    unsolvable_result,
+)
+from search_budget import SearchBudget
+from search_result import CUTOFF, SearchResult
+from search_stats import SearchStats
+from solvability import is_solvable, validate_board, validate_puzzle
+
+GridState = List[int]
+Record = Dict[str, Any]
+
+DEFAULT_WINDOW = 256  # Puzzles in flight per worker process
+DEFAULT_FLUSH_LINES = 1000
+DEFAULT_STATS_INTERVAL = 5.0  # Seconds between throughput reports
+
+
+def read_puzzles(lines: Iterable[str]) -> Iterator[Tuple[Any, Any]]:
+    """
+    Parses JSON Lines input one line at a time.
+
+    Each line is either a bare list of tiles or an object with a "start" list and
+    an optional "id". Lines without an id are numbered from 0. Blank lines are
+    skipped.
+
+    Yields:
+        (id, start state) pairs. Lines that cannot be parsed yield the error
+        message in place of the start state, so they are reported, not dropped.
+    """
+    for line_number, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        record_id: Any = line_number
+        try:
+            record = json.loads(line)
+            if isinstance(record, dict):
+                record_id = record.get("id", line_number)
+                record = record["start"]
+            if not isinstance(record, list):
+                raise ValueError("start must be a list of integers.")
+            yield record_id, record
+        except KeyError:
+            yield record_id, ValueError("missing start")
+        except ValueError as error:
+            yield record_id, error
+
+
+# Set in every worker process by _initialize_worker.
+_worker_algorithm: Optional[str] = None
+_worker_goal_state: Optional[GridState] = None
+_worker_budget: Optional[SearchBudget] = None
+_worker_search_stats: bool = False
+_worker_phase_timers: bool = False
+
+
+def _initialize_worker(
+    algorithm: str,
+    goal_state: GridState,
+    budget: Optional[SearchBudget] = None,
+    search_stats: bool = False,
+    phase_timers: bool = False,
+) -> None:
+    global _worker_algorithm, _worker_goal_state, _worker_budget
+    global _worker_search_stats, _worker_phase_timers
+    _worker_algorithm = algorithm
+    _worker_goal_state = goal_state
+    _worker_budget = budget
+    _worker_search_stats = search_stats or phase_timers
+    _worker_phase_timers = phase_timers
+    prepare_algorithm(algorithm, goal_state)
+
+
+def _result_record(result: SearchResult) -> Record:
+    record = {
+        "status": result.status,
+        "depth": result.depth,
+        "moves": result.path.moves if result.path is not None else None,
+        "expanded_nodes": result.num_expanded_nodes,
+        "max_queue_size": result.max_queue_size,
+        "seconds": round(result.elapsed_seconds, 6),
+    }
+    if result.status == CUTOFF:
+        record["cutoff_reason"] = result.cutoff_reason
+        record["f_bound"] = result.f_bound
+    return record
+
+
+def _solve_record(start_state: GridState) -> Tuple[Record, float]:
+    """Solves one puzzle and returns its result record and the seconds it took."""
+    start_time = time.perf_counter()
+    stats = SearchStats(_worker_phase_timers) if _worker_search_stats else None
+    try:
+        result = make_solver(
+            _worker_algorithm, start_state, _worker_goal_state, _worker_budget, stats
+        ).solve()
+    except ValueError as error:
+        return {"error": str(error)}, time.perf_counter() - start_time
+    record = _result_record(result)
+    if stats is not None:
+        record["search_stats"] = stats.as_dict()
+    return record, time.perf_counter() - start_time
+
+
+def _precheck(
+    start_state: Any, goal_state: GridState, algorithm: str
+) -> Optional[Tuple[Record, Optional[float]]]:
+    """
+    Answers puzzles that need no search, in the calling process.
+
+    Returns:
+        The (result record, latency) pair of a malformed or unsolvable puzzle,
+        or None if the puzzle has to be solved.
+    """
+    if isinstance(start_state, ValueError):
+        return {"error": str(start_state)}, None
+    start_time = time.perf_counter()
+    try:
+        validate_puzzle(start_state, goal_state)
+    except ValueError as error:
+        return {"error": str(error)}, None
+    if is_solvable(start_state, goal_state):
+        return None
+    latency = time.perf_counter() - start_time
+    result = unsolvable_result(algorithm)
+    result.elapsed_seconds = latency
+    return _result_record(result), latency
+
+
+def stream_solve(
+    puzzles: Iterable[Tuple[Any, Any]],
+    algorithm: str,
+    goal_state: GridState = DEFAULT_GOAL_STATE,
+    workers: int = 1,
+    window: int = DEFAULT_WINDOW,
+    budget: Optional[SearchBudget] = None,
+    search_stats: bool = False,
+    phase_timers: bool = False,
+) -> Iterator[Tuple[Record, Optional[float]]]:
+    """
+    Solves puzzles as they are read and yields each result as soon as it is ready.
+
+    At most `window` puzzles are read ahead of the results, so memory does not
+    grow with the length of the input. Malformed and unsolvable puzzles are
+    answered before submission and never reach a worker.
+
+    Args:
+        puzzles: (id, start state) pairs, as produced by read_puzzles().
+        algorithm: Any name accepted by batch_solver.make_solver().
+        goal_state: The target configuration of every puzzle.
+        workers: Number of worker processes; 1 solves in the calling process.
+        window: Maximum number of puzzles submitted but not yet yielded.
+        budget: Limits on each puzzle's search; puzzles that exceed it are
+                reported with status "cutoff", the limit and the f-bound reached.
+        search_stats: Add each search's counters (see search_stats.py) to its
+                      record, under "search_stats".
+        phase_timers: Also time the expand, heuristic and queue phases of
+                      each search. Implies search_stats, and slows searches.
+
+    Yields:
+        (result record, solve latency in seconds) pairs, in completion order.
+        The latency is None for records that are malformed.
+
+    Raises:
+        ValueError: If search stats are requested for an algorithm that does
+            not search (see batch_solver.check_stats_support()).
+    """
+    if search_stats or phase_timers:
+        check_stats_support(algorithm)
+    puzzles = iter(puzzles)
+
+    if workers == 1:
+        _initialize_worker(algorithm, goal_state, budget, search_stats, phase_timers)
+        for record_id, start_state in puzzles:
+            answered = _precheck(start_state, goal_state, algorithm)
+            if answered is not None:
+                record, latency = answered
+            else:
+                record, latency = _solve_record(start_state)
+            yield {"id": record_id, **record}, latency
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_initialize_worker,
+        initargs=(algorithm, goal_state, budget, search_stats, phase_timers),
+    ) as executor:
+        in_flight = {}
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < window:
+                try:
+                    record_id, start_state = next(puzzles)
+                except StopIteration:
+                    exhausted = True
+                    break
+                answered = _precheck(start_state, goal_state, algorithm)
+                if answered is not None:
+                    record, latency = answered
+                    yield {"id": record_id, **record}, latency
+                    continue
+                in_flight[executor.submit(_solve_record, start_state)] = record_id
+
+            if not in_flight:
+                continue
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                record_id = in_flight.pop(future)
+                record, latency = future.result()
+                yield {"id": record_id, **record}, latency
+
+
+class ThroughputStats:
+    """
+    Tracks solved puzzles and their latencies for periodic reports.
+
+    Latencies are kept per reporting interval only, so memory stays bounded.
+    """
+
+    def __init__(self, stream: TextIO, interval: float):
+        self.stream: TextIO = stream
+        self.interval: float = interval
+        self.started: float = time.perf_counter()
+        self.last_report: float = self.started
+        self.total: int = 0
+        self.latencies: List[float] = []
+
+    def record(self, latency: Optional[float]) -> None:
+        self.total += 1
+        if latency is not None:
+            self.latencies.append(latency)
+        if time.perf_counter() - self.last_report >= self.interval:
+            self.report()
+
+    def report(self, final: bool = False) -> None:
+        now = time.perf_counter()
+        rate = self.total / max(now - self.started, 1e-9)
+        latencies = sorted(self.latencies)
+        if latencies:
+            p50 = latencies[(len(latencies) - 1) // 2]
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            latency_text = f"p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms"
+        else:
+            latency_text = "no latencies"
+        label = "done" if final else "progress"
+        print(
+            f"[{label}] {self.total} puzzles, {rate:.1f} puzzles/s, {latency_text}",
+            file=self.stream,
+            flush=True,
+        )
+        self.last_report = now
+        self.latencies = []
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Solve 8-puzzles read as JSON Lines, writing one result per line."
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="Input JSONL file, or - for stdin."
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="Output JSONL file, or - for stdout."
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm",
+        default="astar:manhattan",
+        help=(
+            "ucs, bidirectional, layer_bfs, database, frontier_bfs, "
+            "astar:<heuristic>, epea:<heuristic>, idastar:<heuristic> or "
+            "frontier:<heuristic>."
+        ),
+    )
+    parser.add_argument(
+        "--goal",
+        type=json.loads,
+        default=DEFAULT_GOAL_STATE,
+        help="Goal state as a JSON list (default: [1,2,3,4,5,6,7,8,0]).",
+    )
+    parser.add_argument("-w", "--workers", type=int, default=1)
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=None,
+        help=f"Puzzles in flight (default: {DEFAULT_WINDOW} per worker).",
+    )
+    parser.add_argument("--flush-lines", type=int, default=DEFAULT_FLUSH_LINES)
+    parser.add_argument(
+        "--stats-interval", type=float, default=DEFAULT_STATS_INTERVAL
+    )
+    parser.add_argument(
+        "--max-expansions", type=int, help="Expansions allowed per puzzle."
+    )
+    parser.add_argument(
+        "--time-limit", type=float, help="Seconds of search allowed per puzzle."
+    )
+    parser.add_argument(
+        "--max-open-size", type=int, help="Open-list entries allowed per puzzle."
+    )
+    parser.add_argument(
+        "--max-open-bytes",
+        type=int,
+        help="Estimated open-list bytes allowed per puzzle.",
+    )
+    parser.add_argument(
+        "--search-stats",
+        action="store_true",
+        help="Add each search's counters (expanded, generated, ...) to its result.",
+    )
+    parser.add_argument(
+        "--phase-timers",
+        action="store_true",
+        help="Also time the expand, heuristic and queue phases (slows searches).",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        validate_board(args.goal, "goal_state")
+        prepare_algorithm(args.algorithm, args.goal)  # Validate before reading
+        if args.search_stats or args.phase_timers:
+            check_stats_support(args.algorithm)
+        budget = None
+        if any(
+            limit is not None
+            for limit in (
+                args.max_expansions,
+                args.time_limit,
+                args.max_open_size,
+                args.max_open_bytes,
+            )
+        ):
+            budget = SearchBudget(
+                args.max_expansions,
+                args.time_limit,
+                args.max_open_size,
+                args.max_open_bytes,
+            )
+    except ValueError as error:
+        parser.error(str(error))
+    window = args.window or DEFAULT_WINDOW * args.workers
+
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w")
+    stats = ThroughputStats(sys.stderr, args.stats_interval)
+    buffer: List[str] = []
+    try:
+        for record, latency in stream_solve(
+            read_puzzles(input_file),
+            args.algorithm,
+            args.goal,
+            args.workers,
+            window,
+            budget,
+            args.search_stats,
+            args.phase_timers,
+        ):
+            buffer.append(json.dumps(record))
+            if len(buffer) >= args.flush_lines:
+                output_file.write("\n".join(buffer) + "\n")
+                output_file.flush()
+                buffer = []
+            stats.record(latency)
+        if buffer:
+            output_file.write("\n".join(buffer) + "\n")
+        output_file.flush()
+        stats.report(final=True)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
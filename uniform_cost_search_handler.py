@@ -1,9 +1,31 @@
+import time
 from collections import deque
-from typing import List, Tuple, Optional, Set, Dict, Deque
-
-# Type aliases for clarity
-GridState = List[int]
-GridStateTuple = Tuple[int, ...]
+from typing import List, Optional, Deque
+
+from goal_relabeling import GoalRelabeling, goal_relabeling
+from packed_state import (
+    BLANK_MASK,
+    CHILD_MOVE_TABLE,
+    NO_MOVE,
+    TILE_MASK,
+    GridState,
+    PackedState,
+    pack,
+)
+from permutation_rank import (
+    RANK_BITS,
+    RANK_MASK,
+    SIDEWAYS_RANK_DELTAS,
+    STATE_COUNT,
+    rank,
+    trace_to_root,
+)
+from search_budget import SearchBudget
+from search_result import CUTOFF, SOLVED, UNSOLVABLE, SearchResult
+from search_stats import SearchStats
+from solution_cache import SolutionCache
+from solution_path import SolutionPath, encode_moves
+from solvability import is_solvable, validate_puzzle
 
 
 class UniformCostSearch:
@@ -14,143 +36,389 @@ class UniformCostSearch:
     uses Breadth-First Search (BFS), which is equivalent to UCS in this specific case.
 
     It finds the shortest path in terms of the number of moves from a start
-    state to a goal state.
+    state to a goal state. In bidirectional mode it grows one BFS frontier from
+    each end and stops where they meet.
     """
 
-    def __init__(self, start_state: GridState, goal_state: GridState):
+    def __init__(
+        self,
+        start_state: GridState,
+        goal_state: GridState,
+        bidirectional: bool = False,
+        solution_cache: Optional[SolutionCache] = None,
+        budget: Optional[SearchBudget] = None,
+        stats: Optional[SearchStats] = None,
+    ):
         """
         Initializes the search problem.
 
         Args:
             start_state: The initial configuration of the puzzle (list of 9 ints, 0 represents blank).
             goal_state: The target configuration of the puzzle (list of 9 ints).
+            bidirectional: Search from both ends at once instead of from the start only.
+            solution_cache: A SolutionCache shared across queries. Cached starts
+                            are answered without searching, and every solution
+                            is recorded.
+            budget: Limits on the search. When one runs out, solve() returns
+                    a CUTOFF result instead of searching on.
+            stats: Counters, phase timers and callbacks to report the search
+                   to (see search_stats.py). Expanded states are passed to
+                   on_expand without g or h.
 
         Raises:
-            ValueError: If start_state or goal_state are not lists of 9 integers.
+            ValueError: If start_state or goal_state are not boards of 9 cells
+                holding 0 to 8 once each.
         """
-        if not isinstance(start_state, list) or len(start_state) != 9:
-            raise ValueError("start_state must be a list of 9 integers.")
-        if not isinstance(goal_state, list) or len(goal_state) != 9:
-            raise ValueError("goal_state must be a list of 9 integers.")
+        validate_puzzle(start_state, goal_state, 9)
 
         self.start_state: GridState = start_state
         self.goal_state: GridState = goal_state
-        self.goal_state_tuple: GridStateTuple = tuple(goal_state)
-
-        self.queue: Deque[GridState] = deque()
-        self.visited_states: Set[GridStateTuple] = set()
-
-        self.parent_map: Dict[GridStateTuple, Optional[GridState]] = {}
-
-        self.solution_path: Optional[List[GridState]] = None
+        # The search runs towards a canonical goal (see goal_relabeling.py), so
+        # every goal in the same class shares cache entries; the solution is
+        # mapped back to the original boards at the end.
+        self.relabeling: GoalRelabeling = goal_relabeling(tuple(goal_state))
+        self.canonical_start_state: GridState = self.relabeling.to_canonical(
+            start_state
+        )
+        self.canonical_goal_state: GridState = self.relabeling.canonical_goal
+        self.goal_state_packed: PackedState = pack(self.canonical_goal_state)
+
+        # The search runs entirely on packed ints (see packed_state.py);
+        # the solution is returned as a move string (see solution_path.py).
+        self.queue: Deque[PackedState] = deque()
+        # Both tables are indexed by permutation rank (see permutation_rank.py).
+        # parent_map holds the blank move that first reached each state.
+        self.visited_states: bytearray = bytearray(STATE_COUNT)
+        self.parent_map: bytearray = bytearray(STATE_COUNT)
+
+        # Tables of the search growing from the goal, in bidirectional mode.
+        self.bidirectional: bool = bidirectional
+        if bidirectional:
+            self.backward_visited_states: bytearray = bytearray(STATE_COUNT)
+            self.backward_parent_map: bytearray = bytearray(STATE_COUNT)
+
+        self.solution_cache: Optional[SolutionCache] = solution_cache
+        self.budget: Optional[SearchBudget] = budget
+        self.stats: Optional[SearchStats] = stats
+
+        self.solution_path: Optional[SolutionPath] = None
         self.solution_depth: Optional[int] = None
         self.max_queue_size: int = 0
         self.num_expanded_nodes: int = 0
         # self.elapsed_time: float = 0.0
 
-    def _get_neighbors(self, state: GridState) -> List[GridState]:
-        """
-        Generates valid neighbor states by moving the blank tile (0).
-
-        Args:
-            state: The current state list.
-
-        Returns:
-            A list of valid neighbor state lists.
-        """
-        neighbors: List[GridState] = []
-        try:
-            zero_index = state.index(0)
-        except ValueError:
-            return []
-
-        row, col = divmod(zero_index, 3)  # 3x3 grid assumed
-
-        potential_moves = [
-            (-3, row > 0),  # Move Up
-            (3, row < 2),  # Move Down
-            (-1, col > 0),  # Move Left
-            (1, col < 2),  # Move Right
-        ]
-
-        for delta_index, is_valid_move in potential_moves:
-            if is_valid_move:
-                neighbor_index = zero_index + delta_index
-                next_state = list(state)
-                next_state[zero_index], next_state[neighbor_index] = (
-                    next_state[neighbor_index],
-                    next_state[zero_index],
-                )
-                neighbors.append(next_state)
-
-        return neighbors
-
-    def _reconstruct_path(self, current_state: GridState) -> List[GridState]:
+    def _reconstruct_path(self, current_state: PackedState) -> SolutionPath:
         """
         Backtracks from the goal state to the start state using the parent map.
 
         Args:
-            current_state: The goal state list that was found.
+            current_state: The packed goal state that was found.
 
         Returns:
-            The path from the start state to the goal state as a list of states.
+            The path from the start state to the goal state.
         """
-        path: List[GridState] = []
-        state_list: Optional[GridState] = current_state
-        while state_list is not None:
-            path.append(state_list)
-            state_tuple = tuple(state_list)
-            state_list = self.parent_map.get(state_tuple)
-        return path[::-1]
-
-    def solve(self) -> Tuple[Optional[List[GridState]], Optional[int], int, int, str]:
+        moves = trace_to_root(current_state, self.parent_map)[::-1]
+        return SolutionPath(self.canonical_start_state, encode_moves(moves))
+
+    def _result(
+        self,
+        status: str,
+        start_time: float,
+        cutoff_reason: Optional[str] = None,
+        f_bound: Optional[int] = None,
+    ) -> SearchResult:
+        """Packs the search's outcome and counters into a SearchResult."""
+        if status == SOLVED:
+            if self.stats is not None:
+                self.stats.record_improvement(
+                    len(self.solution_path) - 1, self.num_expanded_nodes
+                )
+            if self.solution_cache is not None:
+                self.solution_cache.record(
+                    self.solution_path, self.canonical_goal_state
+                )
+            self.solution_path = self.relabeling.path_from_canonical(
+                self.start_state, self.solution_path
+            )
+        return SearchResult(
+            status,
+            path=self.solution_path,
+            max_queue_size=self.max_queue_size,
+            num_expanded_nodes=self.num_expanded_nodes,
+            elapsed_seconds=time.perf_counter() - start_time,
+            cutoff_reason=cutoff_reason,
+            f_bound=f_bound,
+        )
+
+    def solve(self) -> SearchResult:
         """
         Executes the Breadth-First Search algorithm to find the shortest path.
 
         Returns:
-            A tuple containing:
-            - The solution path (list of states from start to goal) or None if no solution.
+            A SearchResult that unpacks as the tuple:
+            - The solution path (a SolutionPath of states from start to goal) or None if no solution.
             - The depth of the solution (number of moves) or None.
             - The maximum size the queue reached during the search.
             - The total number of nodes expanded (popped from queue and neighbors generated).
+            If the budget runs out first, the status is CUTOFF and f_bound is
+            the depth the search had reached.
         """
-
-        start_state_tuple = tuple(self.start_state)
-
-        self.queue.append(self.start_state)
-        self.visited_states.add(start_state_tuple)
-        self.parent_map[start_state_tuple] = None
+        if self.stats is not None:
+            return self.stats.measure(self._solve)
+        return self._solve()
+
+    def _solve(self) -> SearchResult:
+        """Runs the search that solve() reports on."""
+        start_time = time.perf_counter()
+        if not is_solvable(self.start_state, self.goal_state):
+            # Rejected in microseconds instead of exhausting the reachable half
+            # of the state space. Bidirectional mode also relies on this: its
+            # two rank tables would otherwise index different parity classes.
+            return self._result(UNSOLVABLE, start_time)
+
+        if self.solution_cache is not None:
+            cached_path = self.solution_cache.lookup(
+                self.canonical_start_state, self.canonical_goal_state
+            )
+            if cached_path is not None:
+                self.solution_path = cached_path
+                return self._result(SOLVED, start_time)
+
+        if self.bidirectional:
+            return self._solve_bidirectional(start_time)
+
+        start_state = pack(self.canonical_start_state)
+        goal_state = self.goal_state_packed
+        queue = self.queue
+        visited_states = self.visited_states
+        parent_map = self.parent_map
+
+        # Queue entries carry the state's rank in their low bits so that
+        # sideways moves can derive the neighbor's rank without re-ranking.
+        start_rank = rank(start_state)
+        queue.append((start_state << RANK_BITS) | start_rank)
+        visited_states[start_rank] = 1
+        parent_map[start_rank] = NO_MOVE
         self.max_queue_size = 1  # Initial queue size
-
-        while self.queue:
-            self.max_queue_size = max(len(self.queue), self.max_queue_size)
-
-            current_state: GridState = self.queue.popleft()
-            current_state_tuple: GridStateTuple = tuple(current_state)
-
-            if current_state_tuple == self.goal_state_tuple:
+        budget = self.budget
+        # num_expanded_nodes only counts pops that add a child, which can stall
+        # for long stretches once most neighbors are visited, so the budget is
+        # checked on a pop count. It cannot outrun the expansions, and each pop
+        # adds at most three entries, so next_check()'s interval still holds.
+        num_pops = 0
+        next_check = budget.next_check(0, 1) if budget is not None else float("inf")
+        stats = self.stats
+        append, popleft = queue.append, queue.popleft
+        if stats is not None:
+            append, popleft = stats.wrap_push(append), stats.wrap_pop(popleft)
+
+        while queue:
+            self.max_queue_size = max(len(queue), self.max_queue_size)
+
+            current_entry = popleft()
+            current_state: PackedState = current_entry >> RANK_BITS
+
+            if current_state == goal_state:
                 self.solution_path = self._reconstruct_path(current_state)
                 self.solution_depth = len(self.solution_path) - 1
-                return (
-                    self.solution_path,
-                    self.solution_depth,
-                    self.max_queue_size,
-                    self.num_expanded_nodes,
+                return self._result(SOLVED, start_time)
+
+            num_pops += 1
+            if num_pops >= next_check:
+                cutoff_reason = budget.check(
+                    self.num_expanded_nodes, len(queue), start_time
+                )
+                if cutoff_reason is not None:
+                    # Every shallower state has been dequeued without the goal.
+                    depth = len(trace_to_root(current_state, parent_map))
+                    return self._result(CUTOFF, start_time, cutoff_reason, depth)
+                next_check = num_pops + (
+                    budget.next_check(self.num_expanded_nodes, len(queue))
+                    - self.num_expanded_nodes
                 )
 
-            neighbors = self._get_neighbors(current_state)
+            blank = current_state & BLANK_MASK
             node_was_expanded = False
+            # The parent is always visited, so the move back to it is skipped.
+            child_moves = CHILD_MOVE_TABLE[blank][
+                parent_map[current_entry & RANK_MASK]
+            ]
+            if stats is not None:
+                stats.record_expansion(current_state, None, None, len(child_moves))
+
+            for move, target_index, blank_shift, target_shift in child_moves:
+                tile = (current_state >> target_shift) & TILE_MASK
+                neighbor_state = (
+                    current_state
+                    + (tile << blank_shift)
+                    - (tile << target_shift)
+                    - blank
+                    + target_index
+                )
 
-            for neighbor_state in neighbors:
-                neighbor_state_tuple = tuple(neighbor_state)
+                rank_delta = SIDEWAYS_RANK_DELTAS[move]
+                if rank_delta:
+                    neighbor_rank = (current_entry & RANK_MASK) + rank_delta
+                else:
+                    neighbor_rank = rank(neighbor_state)
 
-                if neighbor_state_tuple not in self.visited_states:
-                    self.visited_states.add(neighbor_state_tuple)
-                    self.parent_map[neighbor_state_tuple] = current_state
-                    self.queue.append(neighbor_state)
+                if not visited_states[neighbor_rank]:
+                    visited_states[neighbor_rank] = 1
+                    parent_map[neighbor_rank] = move
+                    append((neighbor_state << RANK_BITS) | neighbor_rank)
                     node_was_expanded = True
 
             if node_was_expanded:
                 self.num_expanded_nodes += 1
 
-        return (None, None, None, None)
+        return self._result(UNSOLVABLE, start_time)
+
+    def _solve_bidirectional(self, start_time: float) -> SearchResult:
+        """
+        Runs one BFS from the start and one from the goal until their frontiers meet.
+
+        Each round expands a whole layer of whichever frontier is smaller. A
+        meeting found while expanding a full layer is met at the other side's
+        deepest layer, so the first one found gives a shortest path.
+
+        Args:
+            start_time: When solve() was called.
+
+        Returns:
+            The same SearchResult as solve().
+        """
+        start_state = pack(self.canonical_start_state)
+        goal_state = self.goal_state_packed
+
+        start_rank = rank(start_state)
+        self.visited_states[start_rank] = 1
+        self.parent_map[start_rank] = NO_MOVE
+        goal_rank = rank(goal_state)
+        self.backward_visited_states[goal_rank] = 1
+        self.backward_parent_map[goal_rank] = NO_MOVE
+        self.max_queue_size = 1
+
+        if start_state == goal_state:
+            self.solution_path = SolutionPath(self.canonical_start_state, "")
+            self.solution_depth = 0
+            return self._result(SOLVED, start_time)
+
+        # Frontier entries carry the state's rank in their low bits, as in solve().
+        forward_frontier: List[int] = [(start_state << RANK_BITS) | start_rank]
+        backward_frontier: List[int] = [(goal_state << RANK_BITS) | goal_rank]
+        forward_depth = backward_depth = 0
+        budget = self.budget
+        num_pops = 0  # Budget checks run on this, as in _solve()
+        next_check = budget.next_check(0, 2) if budget is not None else float("inf")
+        stats = self.stats
+
+        while forward_frontier and backward_frontier:
+            self.max_queue_size = max(
+                len(forward_frontier) + len(backward_frontier), self.max_queue_size
+            )
+
+            expand_forward = len(forward_frontier) <= len(backward_frontier)
+            if expand_forward:
+                frontier = forward_frontier
+                visited_states, parent_map = self.visited_states, self.parent_map
+                other_visited_states = self.backward_visited_states
+            else:
+                frontier = backward_frontier
+                visited_states = self.backward_visited_states
+                parent_map = self.backward_parent_map
+                other_visited_states = self.visited_states
+
+            next_frontier: List[int] = []
+            append = next_frontier.append
+            if stats is not None:
+                append = stats.wrap_push(append)
+            meeting_state: Optional[PackedState] = None
+
+            for current_entry in frontier:
+                num_pops += 1
+                if num_pops >= next_check:
+                    open_size = (
+                        len(forward_frontier)
+                        + len(backward_frontier)
+                        + len(next_frontier)
+                    )
+                    cutoff_reason = budget.check(
+                        self.num_expanded_nodes, open_size, start_time
+                    )
+                    if cutoff_reason is not None:
+                        # The frontiers have not met, so the two searches'
+                        # depths add up to less than the solution's.
+                        return self._result(
+                            CUTOFF,
+                            start_time,
+                            cutoff_reason,
+                            forward_depth + backward_depth + 1,
+                        )
+                    next_check = num_pops + (
+                        budget.next_check(self.num_expanded_nodes, open_size)
+                        - self.num_expanded_nodes
+                    )
+
+                current_state = current_entry >> RANK_BITS
+                blank = current_state & BLANK_MASK
+                node_was_expanded = False
+                child_moves = CHILD_MOVE_TABLE[blank][
+                    parent_map[current_entry & RANK_MASK]
+                ]
+                if stats is not None:
+                    stats.record_expansion(
+                        current_state, None, None, len(child_moves)
+                    )
+
+                for move, target_index, blank_shift, target_shift in child_moves:
+                    tile = (current_state >> target_shift) & TILE_MASK
+                    neighbor_state = (
+                        current_state
+                        + (tile << blank_shift)
+                        - (tile << target_shift)
+                        - blank
+                        + target_index
+                    )
+                    rank_delta = SIDEWAYS_RANK_DELTAS[move]
+                    if rank_delta:
+                        neighbor_rank = (current_entry & RANK_MASK) + rank_delta
+                    else:
+                        neighbor_rank = rank(neighbor_state)
+
+                    if not visited_states[neighbor_rank]:
+                        visited_states[neighbor_rank] = 1
+                        parent_map[neighbor_rank] = move
+                        append((neighbor_state << RANK_BITS) | neighbor_rank)
+                        node_was_expanded = True
+                        if other_visited_states[neighbor_rank]:
+                            meeting_state = neighbor_state
+                            break
+
+                if node_was_expanded:
+                    self.num_expanded_nodes += 1
+                if meeting_state is not None:
+                    break
+
+            if expand_forward:
+                forward_frontier = next_frontier
+                forward_depth += 1
+            else:
+                backward_frontier = next_frontier
+                backward_depth += 1
+
+            if meeting_state is not None:
+                # Splice start -> meeting state -> goal. The backward search's
+                # moves are undone, in the order they are traced, to reach the goal.
+                forward_moves = trace_to_root(meeting_state, self.parent_map)
+                backward_moves = trace_to_root(
+                    meeting_state, self.backward_parent_map
+                )
+                self.solution_path = SolutionPath(
+                    self.canonical_start_state,
+                    encode_moves(forward_moves[::-1])
+                    + encode_moves(move ^ 1 for move in backward_moves),
+                )
+                self.solution_depth = forward_depth + backward_depth
+                return self._result(SOLVED, start_time)
+
+        return self._result(UNSOLVABLE, start_time)
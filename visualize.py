@@ -1,132 +1,233 @@
+import argparse
+import sqlite3
+
 import pandas as pd
 import matplotlib.pyplot as plt
-import io  # Required to read string data as a file
-
-# CSV data provided by the user
-csv_data = """Search Type,Depth,Nodes Expanded,Max Queue Size
-Manhattan,2,3,5
-Manhattan,3,4,4
-Manhattan,18,145,101
-Manhattan,26,2521,1409
-Manhattan,31,7132,3573
-Misplaced,2,3,5
-Misplaced,3,4,4
-Misplaced,18,1093,664
-Misplaced,26,28016,12620
-Misplaced,31,124658,24434
-UCS,2,8,8
-UCS,3,12,14
-UCS,18,23130,11644
-UCS,26,119826,24054
-UCS,31,127788,25134
-"""
-
-
-def create_plots_from_data(data):
+
+DEFAULT_RESULTS_PATH = "benchmark_results.csv"
+
+# Metrics plotted across the runs of a benchmark history: (column, label, file).
+TREND_METRICS = [
+    ("expansions", "Mean Nodes Expanded", "expansions_trend_plot.png"),
+    ("wall_seconds_median", "Mean Wall Time (s)", "wall_time_trend_plot.png"),
+    ("peak_memory_bytes", "Mean Peak Memory (bytes)", "peak_memory_trend_plot.png"),
+]
+
+# Column names of the hand-written result.csv, mapped to benchmark.py's.
+LEGACY_COLUMNS = {
+    "Search Type": "algorithm",
+    "Depth": "depth",
+    "Nodes Expanded": "expansions",
+    "Max Queue Size": "max_queue_size",
+}
+
+
+def load_results(path):
     """
-    Generates and saves two plots from the provided puzzle solver data:
-    1. Nodes Expanded vs. Depth
-    2. Max Queue Size vs. Depth
+    Reads a results file written by benchmark.py (or the older result.csv) and
+    averages the instances of each algorithm at each depth.
 
     Args:
-        data (str): A string containing the CSV data.
+        path (str): Location of the CSV results file.
+
+    Returns:
+        A DataFrame with one row per (algorithm, depth), or None on error.
     """
     try:
-        # Use io.StringIO to treat the string data as a file
-        df = pd.read_csv(io.StringIO(data))
+        df = pd.read_csv(path)
     except Exception as e:
-        print(f"Error reading CSV data: {e}")
-        return
+        print(f"Error reading results file '{path}': {e}")
+        return None
 
-    # Ensure required columns are present
-    required_columns = {"Search Type", "Depth", "Nodes Expanded", "Max Queue Size"}
+    df = df.rename(columns=LEGACY_COLUMNS)
+    required_columns = {"algorithm", "depth", "expansions", "max_queue_size"}
     if not required_columns.issubset(df.columns):
-        print(
-            f"Error: CSV data must contain the columns: {', '.join(required_columns)}"
-        )
+        columns = ", ".join(sorted(required_columns))
+        print(f"Error: the results file must contain the columns: {columns}")
         print(f"Found columns: {', '.join(df.columns)}")
-        return
+        return None
+
+    if "status" in df.columns:
+        df = df[df["status"] == "solved"]
+    numeric_columns = [
+        column
+        for column in ("expansions", "max_queue_size", "wall_seconds_median")
+        if column in df.columns
+    ]
+    return df.groupby(["algorithm", "depth"], as_index=False)[numeric_columns].mean()
 
-    # Get unique search types for iterating and labeling
-    search_types = df["Search Type"].unique()
 
-    # --- Plot 1: Nodes Expanded vs. Depth ---
+def plot_metric(df, column, ylabel, title, path, marker="o", linestyle="-"):
+    """
+    Plots one metric against solution depth, one line per algorithm, and saves it.
+
+    Args:
+        df (DataFrame): Averaged results, as returned by load_results().
+        column (str): The column to plot.
+        ylabel (str): Label of the y axis.
+        title (str): Title of the plot.
+        path (str): Where to save the image.
+    """
     plt.figure(figsize=(10, 6))  # Define figure size
 
-    for search_type in search_types:
-        # Filter data for the current search type
-        subset = df[df["Search Type"] == search_type].sort_values(by="Depth")
-        if not subset.empty:
-            plt.plot(
-                subset["Depth"],
-                subset["Nodes Expanded"],
-                marker="o",
-                linestyle="-",
-                label=search_type,
-            )
-        else:
-            print(
-                f"Warning: No data found for search type '{search_type}' for Nodes Expanded plot."
-            )
+    for algorithm in df["algorithm"].unique():
+        subset = df[df["algorithm"] == algorithm].sort_values(by="depth")
+        plt.plot(
+            subset["depth"],
+            subset[column],
+            marker=marker,
+            linestyle=linestyle,
+            label=algorithm,
+        )
 
-    plt.title("Nodes Expanded vs. Solution Depth", fontsize=16)
+    plt.title(title, fontsize=16)
     plt.xlabel("Solution Depth", fontsize=12)
-    plt.ylabel("Number of Nodes Expanded", fontsize=12)
-    plt.xticks(
-        sorted(df["Depth"].unique())
-    )  # Ensure all depth points are marked on x-axis
+    plt.ylabel(ylabel, fontsize=12)
+    plt.xticks(sorted(df["depth"].unique()))  # Mark every depth on the x-axis
     plt.legend(fontsize=10)
     plt.grid(True, linestyle="--", alpha=0.7)
     plt.tight_layout()  # Adjust layout
 
-    # Save the first plot
-    nodes_expanded_plot_path = "nodes_expanded_vs_depth_plot.png"
     try:
-        plt.savefig(nodes_expanded_plot_path)
-        print(f"Plot 1: Nodes Expanded vs. Depth saved as '{nodes_expanded_plot_path}'")
+        plt.savefig(path)
+        print(f"{title} saved as '{path}'")
     except Exception as e:
-        print(f"Error saving Nodes Expanded plot: {e}")
-    # plt.show() # Uncomment to display plot interactively
-
-    # --- Plot 2: Max Queue Size vs. Depth ---
-    plt.figure(figsize=(10, 6))  # Define figure size for the second plot
-
-    for search_type in search_types:
-        # Filter data for the current search type
-        subset = df[df["Search Type"] == search_type].sort_values(by="Depth")
-        if not subset.empty:
-            plt.plot(
-                subset["Depth"],
-                subset["Max Queue Size"],
-                marker="s",
-                linestyle="--",
-                label=search_type,
-            )  # Different marker/linestyle
-        else:
-            print(
-                f"Warning: No data found for search type '{search_type}' for Max Queue Size plot."
-            )
+        print(f"Error saving plot '{path}': {e}")
+    plt.close()
 
-    plt.title("Maximum Queue Size vs. Solution Depth", fontsize=16)
-    plt.xlabel("Solution Depth", fontsize=12)
-    plt.ylabel("Maximum Queue Size", fontsize=12)
-    plt.xticks(
-        sorted(df["Depth"].unique())
-    )  # Ensure all depth points are marked on x-axis
-    plt.legend(fontsize=10)
-    plt.grid(True, linestyle="--", alpha=0.7)
-    plt.tight_layout()  # Adjust layout
 
-    # Save the second plot
-    max_queue_plot_path = "max_queue_size_vs_depth_plot.png"
+def create_plots_from_results(path):
+    """
+    Generates and saves plots from a results file:
+    1. Nodes Expanded vs. Depth
+    2. Max Queue Size vs. Depth
+    3. Wall Time vs. Depth (for benchmark.py results)
+
+    Args:
+        path (str): Location of the CSV results file.
+    """
+    df = load_results(path)
+    if df is None or df.empty:
+        return
+
+    plot_metric(
+        df,
+        "expansions",
+        "Number of Nodes Expanded",
+        "Nodes Expanded vs. Solution Depth",
+        "nodes_expanded_vs_depth_plot.png",
+    )
+    plot_metric(
+        df,
+        "max_queue_size",
+        "Maximum Queue Size",
+        "Maximum Queue Size vs. Solution Depth",
+        "max_queue_size_vs_depth_plot.png",
+        marker="s",
+        linestyle="--",
+    )
+    if "wall_seconds_median" in df.columns:
+        plot_metric(
+            df,
+            "wall_seconds_median",
+            "Median Wall Time (s)",
+            "Wall Time vs. Solution Depth",
+            "wall_time_vs_depth_plot.png",
+        )
+
+
+def load_history(path):
+    """
+    Reads a benchmark_history.py database and averages the solved instances of
+    each algorithm in each run.
+
+    Runs are only comparable when they used the same instances (same seed and
+    depths); benchmark_history.py compare checks that per instance.
+
+    Args:
+        path (str): Location of the SQLite history database.
+
+    Returns:
+        A DataFrame with one row per (run, algorithm), or None on error.
+    """
     try:
-        plt.savefig(max_queue_plot_path)
-        print(f"Plot 2: Max Queue Size vs. Depth saved as '{max_queue_plot_path}'")
+        with sqlite3.connect(path) as connection:
+            df = pd.read_sql_query(
+                "SELECT runs.run_id, runs.commit_hash, runs.dirty, "
+                "measurements.algorithm, measurements.heuristic, "
+                "measurements.expansions, measurements.wall_seconds_median, "
+                "measurements.peak_memory_bytes "
+                "FROM measurements JOIN runs USING (run_id) "
+                "WHERE measurements.status = 'solved'",
+                connection,
+            )
     except Exception as e:
-        print(f"Error saving Max Queue Size plot: {e}")
-    # plt.show() # Uncomment to display plot interactively
+        print(f"Error reading history '{path}': {e}")
+        return None
+
+    df["algorithm"] = df["algorithm"].where(
+        df["heuristic"] == "", df["algorithm"] + ":" + df["heuristic"]
+    )
+    df["run"] = df["commit_hash"].str[:7] + df["dirty"].map({0: "", 1: "+"})
+    df["run"] = df["run_id"].astype(str) + " " + df["run"]
+    return df.groupby(["run_id", "run", "algorithm"], as_index=False)[
+        [column for column, _, _ in TREND_METRICS]
+    ].mean()
+
+
+def create_trend_plots(path):
+    """
+    Plots each metric across the runs of a benchmark history, one line per
+    algorithm, so that a slowdown shows up as a step at the commit that caused it.
+
+    Args:
+        path (str): Location of the SQLite history database.
+    """
+    df = load_history(path)
+    if df is None or df.empty:
+        return
+
+    runs = df[["run_id", "run"]].drop_duplicates().sort_values(by="run_id")
+    for column, ylabel, plot_path in TREND_METRICS:
+        if df[column].isna().all():
+            continue  # e.g. peak memory, when every run skipped it
+        plt.figure(figsize=(10, 6))
+        for algorithm in df["algorithm"].unique():
+            subset = df[df["algorithm"] == algorithm].sort_values(by="run_id")
+            plt.plot(subset["run_id"], subset[column], marker="o", label=algorithm)
+
+        title = f"{ylabel} by Benchmark Run"
+        plt.title(title, fontsize=16)
+        plt.xlabel("Run (id and commit)", fontsize=12)
+        plt.ylabel(ylabel, fontsize=12)
+        plt.xticks(runs["run_id"], runs["run"], rotation=45, ha="right")
+        plt.yscale("log")  # Algorithms differ by orders of magnitude
+        plt.legend(fontsize=10)
+        plt.grid(True, linestyle="--", alpha=0.7)
+        plt.tight_layout()
+
+        try:
+            plt.savefig(plot_path)
+            print(f"{title} saved as '{plot_path}'")
+        except Exception as e:
+            print(f"Error saving plot '{plot_path}': {e}")
+        plt.close()
 
 
 if __name__ == "__main__":
-    # Call the function with the CSV data string
-    create_plots_from_data(csv_data)
+    parser = argparse.ArgumentParser(description="Plot benchmark results by depth.")
+    parser.add_argument(
+        "results",
+        nargs="?",
+        default=DEFAULT_RESULTS_PATH,
+        help=f"Results CSV written by benchmark.py (default: {DEFAULT_RESULTS_PATH}).",
+    )
+    parser.add_argument(
+        "--history",
+        default=None,
+        help="Also plot trends across the runs of a benchmark_history.py database.",
+    )
+    args = parser.parse_args()
+    create_plots_from_results(args.results)
+    if args.history:
+        create_trend_plots(args.history)